@@ -95,3 +95,47 @@ example_create_task = Body(
         },
     }
 )
+
+example_update_task = Body(
+    openapi_examples={
+        "reschedule": {
+            "summary": "Перенос срока",
+            "description": "Изменяется только крайний срок, остальные поля остаются прежними",
+            "value": {
+                "due_date": (date.today() + timedelta(days=14)).strftime("%Y-%m-%d"),
+            },
+        },
+        "detach": {
+            "summary": "Отвязать задачу от проекта",
+            "description": "Явно переданный `null` очищает поле `project`",
+            "value": {
+                "project": None,
+            },
+        },
+        "invalid": {
+            "summary": "Пустая сложность, возвращается ошибка 422",
+            "value": {
+                "complexity": None,
+            },
+        },
+    }
+)
+
+example_update_tasks = Body(
+    openapi_examples={
+        "reassign": {
+            "summary": "Переназначить задачи",
+            "value": {
+                "ids": [1, 2, 3],
+                "changes": {"assignee": 2},
+            },
+        },
+        "close": {
+            "summary": "Закрыть задачи",
+            "value": {
+                "ids": [4, 5],
+                "changes": {"is_completed": True},
+            },
+        },
+    }
+)
@@ -5,26 +5,36 @@ import jwt
 from jwt.exceptions import InvalidTokenError
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
-from passlib.context import CryptContext
-from sqlmodel import Session, select
+from sqlalchemy.ext.asyncio import AsyncSession
 
+from app import queries
 from app.config import settings
-from app.db import get_session
-from app.schemas import task as schema_task
+from app.db import get_async_session
+from .hashing import HashingPool
+from .user_cache import user_cache
 
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+hashing_pool = HashingPool(
+    workers=settings.hash_workers,
+    queue_size=settings.hash_queue_size,
+    rounds=settings.bcrypt_rounds,
+)
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="auth/login")
 
 
-def get_password_hash(password):
+async def get_password_hash(password):
     """Hash the given password."""
-    return pwd_context.hash(password)
+    return await hashing_pool.hash(password)
 
 
-def verify_password(plain_password, hashed_password):
-    """Verify the given password against the hashed password."""
-    return pwd_context.verify(plain_password, hashed_password)
+async def verify_password(plain_password, hashed_password):
+    """
+    Verify the given password against the hashed password.
+
+    Returns a pair of the verification result and a new hash, which is not
+    ``None`` when the stored hash uses an outdated work factor.
+    """
+    return await hashing_pool.verify(plain_password, hashed_password)
 
 
 def create_access_token(data: dict, expires_delta: timedelta | None = None):
@@ -45,9 +55,9 @@ def create_access_token(data: dict, expires_delta: timedelta | None = None):
     return encoded_jwt
 
 
-def get_current_user(
+async def get_current_user(
     token: Annotated[str, Depends(oauth2_scheme)],
-    db_session: Session = Depends(get_session),
+    db_session: AsyncSession = Depends(get_async_session),
 ):
     """Retrieve the current user based on the provided token."""
     credentials_exception = HTTPException(
@@ -63,12 +73,14 @@ def get_current_user(
     except InvalidTokenError:
         raise credentials_exception
 
-    statement = select(schema_task.User).where(
-        schema_task.User.email == username,
-    )
+    user = await user_cache.get(username)
+    if user is not None:
+        return user
 
-    user = db_session.exec(statement).first()
+    result = await db_session.execute(queries.user_by_email(username))
+    user = result.scalars().first()
 
     if user is None:
         raise credentials_exception
+    await user_cache.set(user)
     return user
@@ -0,0 +1,134 @@
+"""
+Password hashing in a bounded pool of worker processes.
+
+bcrypt is CPU bound and holds the GIL, so running it in the event loop or
+in the default threadpool stalls every other request of the worker. The
+functions here run it in a separate process pool and reject new work with
+503 when the pool and its queue are full. A pool broken by a crashed
+worker process is replaced by a new one.
+"""
+
+import asyncio
+import logging
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from functools import lru_cache, partial
+from typing import Optional, Tuple
+
+from fastapi import HTTPException, status
+from passlib.context import CryptContext
+
+logger = logging.getLogger(__name__)
+
+
+@lru_cache
+def crypt_context(rounds: int) -> CryptContext:
+    """Return the passlib context for the given bcrypt work factor."""
+    return CryptContext(
+        schemes=["bcrypt"], deprecated="auto", bcrypt__rounds=rounds
+    )
+
+
+def hash_sync(password: str, rounds: int) -> str:
+    """Hash a password in the current process."""
+    return crypt_context(rounds).hash(password)
+
+
+def verify_and_update_sync(
+    password: str, hashed_password: str, rounds: int
+) -> Tuple[bool, Optional[str]]:
+    """
+    Verify a password in the current process.
+
+    Returns:
+        Tuple[bool, Optional[str]]: Whether the password matches and a new
+        hash if the stored one was made with a different work factor.
+    """
+    return crypt_context(rounds).verify_and_update(password, hashed_password)
+
+
+class HashingPool:
+    """
+    Process pool for password hashing with a bounded queue.
+
+    Args:
+        workers (int): Number of worker processes. ``0`` hashes inline in
+            the event loop, which is only suitable for tests and scripts.
+        queue_size (int): How many calls may wait for a free worker before
+            new calls are rejected.
+        rounds (int): bcrypt work factor for new hashes.
+    """
+
+    def __init__(self, workers: int, queue_size: int, rounds: int):
+        self.workers = workers
+        self.queue_size = queue_size
+        self.rounds = rounds
+        self.in_flight = 0
+        self._executor = None
+
+    async def hash(self, password: str) -> str:
+        """Hash a password."""
+        return await self._run(hash_sync, password, self.rounds)
+
+    async def verify(
+        self, password: str, hashed_password: str
+    ) -> Tuple[bool, Optional[str]]:
+        """Verify a password and rehash it if the work factor changed."""
+        return await self._run(
+            verify_and_update_sync, password, hashed_password, self.rounds
+        )
+
+    def shutdown(self):
+        """
+        Stop the worker processes without waiting for them, so that the
+        event loop is not blocked; calls still waiting are cancelled.
+        """
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    async def _run(self, func, *args):
+        if self.workers <= 0:
+            return func(*args)
+        if self.in_flight >= self.workers + self.queue_size:
+            raise busy()
+        self.in_flight += 1
+        try:
+            loop = asyncio.get_running_loop()
+            # One retry, on a new pool, if a worker process died.
+            for _ in range(2):
+                executor = self._get_executor()
+                try:
+                    return await loop.run_in_executor(
+                        executor, partial(func, *args)
+                    )
+                except BrokenProcessPool:
+                    self._discard(executor)
+            raise busy()
+        finally:
+            self.in_flight -= 1
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+        return self._executor
+
+    def _discard(self, executor: ProcessPoolExecutor):
+        """Drop a broken pool; the next call starts a new one."""
+        if self._executor is executor:
+            logger.warning("Password hashing pool is broken, restarting it")
+            executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+
+def busy() -> HTTPException:
+    """The error of a call that the pool cannot take now."""
+    return HTTPException(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        detail="Authentication service is busy, try again later.",
+        headers={"Retry-After": "1"},
+    )
@@ -0,0 +1,182 @@
+"""Cache of authenticated users, keyed by the token subject (email)."""
+
+import asyncio
+import json
+import time
+from collections import OrderedDict
+from datetime import timedelta
+from typing import Optional, Union
+
+from sqlalchemy import event, inspect
+
+from app.config import settings
+from app.schemas.task import User
+
+
+class MemoryBackend:
+    """
+    In-process stand-in for a Redis-compatible store.
+
+    Implements the subset of the ``redis.asyncio.Redis`` interface used by
+    ``UserCache``, so tests and single-process deployments do not need a
+    Redis server.
+    """
+
+    def __init__(self):
+        self._data = {}
+
+    async def get(self, key: str) -> Optional[bytes]:
+        value, expires_at = self._data.get(key, (None, 0.0))
+        if value is not None and expires_at <= time.monotonic():
+            del self._data[key]
+            return None
+        return value
+
+    async def set(
+        self, key: str, value: bytes,
+        ex: Optional[Union[int, timedelta]] = None,
+    ):
+        # Like redis-py, accept whole seconds or a timedelta only.
+        if isinstance(ex, timedelta):
+            ex = int(ex.total_seconds())
+        elif ex is not None and type(ex) is not int:
+            raise TypeError("ex must be datetime.timedelta or int")
+        expires_at = time.monotonic() + ex if ex else float("inf")
+        self._data[key] = (value, expires_at)
+
+    async def delete(self, key: str):
+        self._data.pop(key, None)
+
+
+def redis_backend(url: str):
+    """
+    Create a shared Redis-compatible backend.
+
+    Args:
+        url (str): Connection URL, e.g. ``redis://localhost:6379/0``.
+
+    Returns:
+        redis.asyncio.Redis: The client.
+    """
+    try:
+        from redis import asyncio as redis
+    except ImportError as exc:
+        raise RuntimeError(
+            "USER_CACHE_URL is set, but the 'redis' package is not installed"
+        ) from exc
+    return redis.from_url(url)
+
+
+class UserCache:
+    """
+    Bounded LRU cache of users with a time-to-live.
+
+    Lookups go to the in-process LRU first and then to the optional shared
+    backend. Entries are dropped when the user row is updated or deleted
+    through the ORM; other worker processes keep their local copy for at
+    most ``ttl`` seconds. The shared backend keeps entries for whole
+    seconds, at least one.
+    """
+
+    prefix = "user:"
+
+    def __init__(self, maxsize: int, ttl: float, backend=None):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.backend = backend
+        self.hits = 0
+        self.misses = 0
+        self._local = OrderedDict()
+        self._pending = set()
+
+    async def get(self, email: str) -> Optional[User]:
+        """
+        Return the cached user or ``None`` on a miss.
+        """
+        entry = self._local.get(email)
+        if entry is not None and entry[0] > time.monotonic():
+            self._local.move_to_end(email)
+            self.hits += 1
+            return User(**entry[1])
+        if entry is not None:
+            del self._local[email]
+
+        if self.backend is not None:
+            raw = await self.backend.get(self.prefix + email)
+            if raw is not None:
+                data = json.loads(raw)
+                self._remember(email, data)
+                self.hits += 1
+                return User(**data)
+
+        self.misses += 1
+        return None
+
+    async def set(self, user: User):
+        """
+        Store a user. The password hash is never cached.
+        """
+        if self.maxsize <= 0:
+            return
+        data = user.model_dump(exclude={"password"})
+        self._remember(user.email, data)
+        if self.backend is not None:
+            await self.backend.set(
+                self.prefix + user.email, json.dumps(data),
+                ex=max(1, int(self.ttl)),
+            )
+
+    def invalidate(self, email: str):
+        """
+        Drop a user from the local cache and, in the background, from the
+        shared backend.
+        """
+        self._local.pop(email, None)
+        if self.backend is None:
+            return
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return
+        task = loop.create_task(self.backend.delete(self.prefix + email))
+        self._pending.add(task)
+        task.add_done_callback(self._pending.discard)
+
+    def stats(self) -> dict:
+        """
+        Report cache effectiveness counters.
+        """
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "size": len(self._local),
+            "maxsize": self.maxsize,
+        }
+
+    def _remember(self, email: str, data: dict):
+        if self.maxsize <= 0:
+            return
+        self._local[email] = (time.monotonic() + self.ttl, data)
+        self._local.move_to_end(email)
+        while len(self._local) > self.maxsize:
+            self._local.popitem(last=False)
+
+
+user_cache = UserCache(
+    maxsize=settings.user_cache_size,
+    ttl=settings.user_cache_ttl,
+    backend=(
+        redis_backend(settings.user_cache_url)
+        if settings.user_cache_url else None
+    ),
+)
+
+
+@event.listens_for(User, "after_update")
+@event.listens_for(User, "after_delete")
+def _invalidate_user(mapper, connection, target: User):
+    """Forget the user under both the old and the new email."""
+    history = inspect(target).attrs.email.history
+    for email in {target.email, *history.deleted}:
+        if email:
+            user_cache.invalidate(email)
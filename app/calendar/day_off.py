@@ -0,0 +1,340 @@
+"""
+Day-off lookups against the production calendar service (isdayoff.ru).
+
+An answer for a date never changes, so every answer is kept in a bounded
+in-process LRU and in the ``dayoff`` table shared by all worker processes.
+Concurrent lookups of the same date share one upstream call, a whole year
+can be loaded with one call, and a circuit breaker stops calling the
+service while it is failing.
+"""
+
+import asyncio
+import time
+from collections import OrderedDict
+from datetime import date, timedelta
+from typing import TYPE_CHECKING, Callable, Dict, Optional
+
+from sqlalchemy import func, select
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import settings
+from app.db import async_session
+from app.schemas.day_off import DayOff
+
+if TYPE_CHECKING:
+    import httpx
+
+
+class DayOffUnavailable(Exception):
+    """The production calendar service cannot answer right now."""
+
+
+class CircuitBreaker:
+    """
+    Stop calling a failing dependency for a while.
+
+    After ``failure_threshold`` failures in a row the breaker opens and
+    ``allow`` refuses calls for ``reset_timeout`` seconds. Then one trial
+    call is let through: success closes the breaker, failure opens it again.
+    """
+
+    def __init__(self, failure_threshold: int, reset_timeout: float):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self._opened_at: Optional[float] = None
+
+    @property
+    def state(self) -> str:
+        if self._opened_at is None:
+            return "closed"
+        if time.monotonic() - self._opened_at >= self.reset_timeout:
+            return "half-open"
+        return "open"
+
+    def allow(self) -> bool:
+        """Whether a call may be made now."""
+        state = self.state
+        if state == "half-open":
+            # Only one trial call; the others wait for another timeout.
+            self._opened_at = time.monotonic()
+            return True
+        return state == "closed"
+
+    def record_success(self):
+        self.failures = 0
+        self._opened_at = None
+
+    def record_failure(self):
+        self.failures += 1
+        if self.failures >= self.failure_threshold:
+            self._opened_at = time.monotonic()
+
+
+def parse_days(text: str, start: date, end: date) -> Dict[date, bool]:
+    """
+    Parse a ``getdata`` answer: one digit per day from ``start`` to ``end``,
+    where ``1`` marks a day off.
+
+    Raises:
+        ValueError: The answer is an error code or does not cover the range.
+    """
+    text = text.strip()
+    count = (end - start).days + 1
+    if len(text) != count or not text.isdigit():
+        raise ValueError(f"Unexpected calendar answer: {text[:20]!r}")
+    return {
+        start + timedelta(days=offset): flag == "1"
+        for offset, flag in enumerate(text)
+    }
+
+
+class DayOffService:
+    """
+    Cached client of the production calendar service.
+
+    Args:
+        base_url (str): Service URL; point it at a local stub in tests.
+        timeout (float): Seconds one upstream call may take in total.
+        max_connections (int): Size of the HTTP connection pool.
+        cache_size (int): Number of dates kept in the in-process LRU.
+        failure_threshold (int): Failures in a row that open the breaker.
+        reset_timeout (float): Seconds the breaker stays open.
+        session_factory: Factory of ``AsyncSession`` objects.
+        transport (Optional[httpx.AsyncBaseTransport]): Custom transport of
+            the HTTP client, e.g. ``httpx.MockTransport``.
+    """
+
+    def __init__(
+        self,
+        base_url: str,
+        timeout: float,
+        max_connections: int,
+        cache_size: int,
+        failure_threshold: int,
+        reset_timeout: float,
+        session_factory: Callable[[], AsyncSession],
+        transport: Optional["httpx.AsyncBaseTransport"] = None,
+    ):
+        self.base_url = base_url
+        self.timeout = timeout
+        self.max_connections = max_connections
+        self.cache_size = cache_size
+        self.session_factory = session_factory
+        self.transport = transport
+        self.breaker = CircuitBreaker(failure_threshold, reset_timeout)
+        self.hits = 0
+        self.db_hits = 0
+        self.upstream_calls = 0
+        self._client: Optional["httpx.AsyncClient"] = None
+        self._local = OrderedDict()
+        self._inflight: Dict[date, asyncio.Future] = {}
+
+    async def start(self):
+        """
+        Open the pooled HTTP client. Upstream calls open it when needed,
+        so httpx is only imported by processes that call the service.
+        """
+        if self._client is None:
+            import httpx
+
+            self._client = httpx.AsyncClient(
+                base_url=self.base_url,
+                timeout=httpx.Timeout(self.timeout),
+                limits=httpx.Limits(
+                    max_connections=self.max_connections,
+                    max_keepalive_connections=self.max_connections,
+                ),
+                transport=self.transport,
+            )
+
+    async def stop(self):
+        """Close the HTTP client and its connections."""
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    async def is_day_off(self, day: date) -> Optional[bool]:
+        """
+        Whether a date is a day off.
+
+        Returns:
+            Optional[bool]: The answer, or ``None`` if it is not cached and
+            the service is unavailable.
+        """
+        cached = self._local.get(day)
+        if cached is not None:
+            self._local.move_to_end(day)
+            self.hits += 1
+            return cached
+
+        future = self._inflight.get(day)
+        if future is None:
+            future = asyncio.ensure_future(self._load(day))
+            self._inflight[day] = future
+            future.add_done_callback(lambda _: self._inflight.pop(day, None))
+        try:
+            # Shielded, so a cancelled request does not cancel the others.
+            return await asyncio.shield(future)
+        except DayOffUnavailable:
+            return None
+
+    async def days_off(
+        self, start: date, end: date
+    ) -> Dict[date, Optional[bool]]:
+        """
+        Whether each date from ``start`` to ``end`` is a day off.
+
+        Dates missing from the LRU are read with one range query, and dates
+        missing from the table are loaded with one upstream call.
+
+        Returns:
+            Dict[date, Optional[bool]]: The answer for every date, ``None``
+            where it is not cached and the service is unavailable.
+        """
+        days = [
+            start + timedelta(days=offset)
+            for offset in range((end - start).days + 1)
+        ]
+        answers = {}
+        missing = []
+        for day in days:
+            cached = self._local.get(day)
+            if cached is None:
+                missing.append(day)
+                continue
+            self._local.move_to_end(day)
+            self.hits += 1
+            answers[day] = cached
+
+        if missing:
+            statement = select(DayOff.day, DayOff.is_day_off).where(
+                DayOff.day.between(missing[0], missing[-1])
+            )
+            async with self.session_factory() as session:
+                rows = (await session.execute(statement)).all()
+            found = {row.day: row.is_day_off for row in rows}
+            self.db_hits += len(found)
+            self._remember(found)
+            answers.update(found)
+            missing = [day for day in missing if day not in found]
+
+        if missing:
+            try:
+                fetched = await self._fetch(
+                    {
+                        "date1": missing[0].strftime("%Y%m%d"),
+                        "date2": missing[-1].strftime("%Y%m%d"),
+                    },
+                    missing[0], missing[-1],
+                )
+            except DayOffUnavailable:
+                fetched = {}
+            if fetched:
+                await self._store(fetched)
+            answers.update(fetched)
+
+        return {day: answers.get(day) for day in days}
+
+    async def prefill(self, year: int) -> int:
+        """
+        Load and store a whole year with one upstream call.
+
+        Returns:
+            int: The number of dates stored.
+
+        Raises:
+            DayOffUnavailable: The service did not answer.
+        """
+        days = await self._fetch(
+            {"year": year}, date(year, 1, 1), date(year, 12, 31)
+        )
+        await self._store(days)
+        return len(days)
+
+    def stats(self) -> dict:
+        """
+        Report cache and upstream counters.
+        """
+        return {
+            "hits": self.hits,
+            "db_hits": self.db_hits,
+            "upstream_calls": self.upstream_calls,
+            "size": len(self._local),
+            "maxsize": self.cache_size,
+            "breaker": self.breaker.state,
+        }
+
+    async def _load(self, day: date) -> bool:
+        async with self.session_factory() as session:
+            row = await session.get(DayOff, day)
+        if row is not None:
+            self.db_hits += 1
+            self._remember({day: row.is_day_off})
+            return row.is_day_off
+        days = await self._fetch(
+            {"date1": day.strftime("%Y%m%d"), "date2": day.strftime("%Y%m%d")},
+            day, day,
+        )
+        await self._store(days)
+        return days[day]
+
+    async def _fetch(
+        self, params: dict, start: date, end: date
+    ) -> Dict[date, bool]:
+        if not self.breaker.allow():
+            raise DayOffUnavailable("The calendar service is failing")
+        await self.start()
+        import httpx
+
+        self.upstream_calls += 1
+        try:
+            response = await asyncio.wait_for(
+                self._client.get("/api/getdata", params=params),
+                timeout=self.timeout,
+            )
+            response.raise_for_status()
+            days = parse_days(response.text, start, end)
+        except (httpx.HTTPError, asyncio.TimeoutError, ValueError) as exc:
+            self.breaker.record_failure()
+            raise DayOffUnavailable(str(exc) or type(exc).__name__) from exc
+        self.breaker.record_success()
+        return days
+
+    async def _store(self, days: Dict[date, bool]):
+        self._remember(days)
+        statement = insert(DayOff).values([
+            {"day": day, "is_day_off": flag, "fetched_at": func.localtimestamp()}
+            for day, flag in days.items()
+        ])
+        statement = statement.on_conflict_do_update(
+            index_elements=[DayOff.day],
+            set_={
+                "is_day_off": statement.excluded.is_day_off,
+                "fetched_at": statement.excluded.fetched_at,
+            },
+        )
+        async with self.session_factory() as session:
+            await session.execute(statement)
+            await session.commit()
+
+    def _remember(self, days: Dict[date, bool]):
+        if self.cache_size <= 0:
+            return
+        for day, flag in days.items():
+            self._local[day] = flag
+            self._local.move_to_end(day)
+        while len(self._local) > self.cache_size:
+            self._local.popitem(last=False)
+
+
+day_off_service = DayOffService(
+    base_url=settings.day_off_url,
+    timeout=settings.day_off_timeout,
+    max_connections=settings.day_off_max_connections,
+    cache_size=settings.day_off_cache_size,
+    failure_threshold=settings.day_off_failure_threshold,
+    reset_timeout=settings.day_off_reset_timeout,
+    session_factory=async_session,
+)
@@ -12,5 +12,81 @@ class Settings(BaseSettings):
     algo: str
     access_token_expire_minutes: int
 
+    # Connection pool of each engine, per worker process.
+    db_pool_size: int = 5
+    db_max_overflow: int = 10
+    db_pool_timeout: float = 30.0
+    db_pool_recycle: int = 1800
+    db_pool_pre_ping: bool = False
+    db_echo: bool = False
+    # Connections of the async pool opened when the application starts.
+    db_pool_warm_up: int = 2
+    # SQL compiled from statements, cached per engine, and prepared
+    # statements, cached per asyncpg connection. Set DB_PGBOUNCER=true
+    # behind PgBouncer in transaction pooling mode: prepared statements
+    # are then not cached and get unique names, since consecutive
+    # transactions may run on different server connections.
+    db_query_cache_size: int = 500
+    db_statement_cache_size: int = 100
+    db_pgbouncer: bool = False
+
+    # Authenticated user cache. Leave the URL empty to keep it in-process.
+    user_cache_size: int = 1024
+    user_cache_ttl: int = 60
+    user_cache_url: str = ""
+
+    # Password hashing. HASH_WORKERS=0 hashes inline in the event loop.
+    bcrypt_rounds: int = 12
+    hash_workers: int = 2
+    hash_queue_size: int = 32
+
+    # Rows per INSERT statement and transaction in POST /tasks/bulk.
+    bulk_batch_size: int = 1000
+    # Rows fetched from the server-side cursor per chunk of GET /tasks/export.
+    export_chunk_size: int = 1000
+
+    # Background jobs. JOB_WORKERS is the number of jobs run at once by
+    # each application process; 0 disables the worker.
+    job_workers: int = 16
+    job_poll_interval: float = 1.0
+    job_retry_delay: float = 5.0
+    job_max_attempts: int = 3
+    job_timeout: float = 300.0
+
+    # Production calendar service used by the day-off lookups. The timeout
+    # bounds a whole upstream call; after DAY_OFF_FAILURE_THRESHOLD failures
+    # in a row the service is not called for DAY_OFF_RESET_TIMEOUT seconds.
+    day_off_url: str = "https://isdayoff.ru"
+    day_off_timeout: float = 2.0
+    day_off_max_connections: int = 10
+    day_off_cache_size: int = 4096
+    day_off_failure_threshold: int = 5
+    day_off_reset_timeout: float = 30.0
+
+    # Completed tasks older than ARCHIVE_AFTER_DAYS are moved to task_archive
+    # by chunks of ARCHIVE_CHUNK_SIZE rows, one transaction per chunk.
+    archive_after_days: int = 90
+    archive_chunk_size: int = 1000
+
+    # Conditional GET of the read routes. Clients may reuse a response for
+    # HTTP_CACHE_MAX_AGE seconds without revalidating it; HTTP_CACHE_SIZE
+    # serialized pages are kept per worker process, 0 disables that cache.
+    http_cache_max_age: int = 0
+    http_cache_size: int = 0
+
+    # Monthly partitions of the task table are created this many months
+    # ahead of the current one when the application starts.
+    task_partition_months_ahead: int = 12
+
+    # Add a Server-Timing header with the total and the database time of
+    # every request, for browser developer tools.
+    server_timing: bool = False
+    # Log the statements that one request runs QUERY_REPEAT_THRESHOLD times
+    # or more (N+1 patterns), and statements slower than SLOW_QUERY_MS
+    # milliseconds with the types of their parameters; 0 logs none.
+    query_debug: bool = False
+    query_repeat_threshold: int = 5
+    slow_query_ms: float = 0
+
 
 settings = Settings()
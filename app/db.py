@@ -1,20 +1,88 @@
+"""
+Database engines and sessions.
+
+The engines are created on first use rather than on import, so that
+importing the application does not load the database drivers, and
+processes that never touch the sync engine do not create it at all.
+``engine`` and ``async_engine`` are still importable from this module;
+importing them creates the engine.
+"""
+
+import asyncio
+from uuid import uuid4
+
 from app.config import settings as cnf
 from sqlmodel import create_engine, Session, SQLModel
-from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession
+from sqlalchemy import Engine
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, create_async_engine
+
+from app.metrics import instrument_engine
 
 DB_URL = f"postgresql://{cnf.db_username}:{cnf.db_password}@{cnf.db_host}:{cnf.db_port}/{cnf.db_name}"
 ASYNC_DB_URL = f"postgresql+asyncpg://{cnf.db_username}:{cnf.db_password}@{cnf.db_host}:{cnf.db_port}/{cnf.db_name}"
-engine = create_engine(DB_URL, echo=True)
-async_engine = create_async_engine(ASYNC_DB_URL, echo=True)
+POOL_OPTIONS = {
+    "echo": cnf.db_echo,
+    "pool_size": cnf.db_pool_size,
+    "max_overflow": cnf.db_max_overflow,
+    "pool_timeout": cnf.db_pool_timeout,
+    "pool_recycle": cnf.db_pool_recycle,
+    "pool_pre_ping": cnf.db_pool_pre_ping,
+    "query_cache_size": cnf.db_query_cache_size,
+}
+# Engines created so far, by the name of their metrics label.
+engines: dict = {}
+
+
+def get_engine() -> Engine:
+    """The sync engine, created on first use."""
+    if "sync" not in engines:
+        engines["sync"] = create_engine(DB_URL, **POOL_OPTIONS)
+        instrument_engine(engines["sync"], "sync", cnf.slow_query_ms)
+    return engines["sync"]
+
+
+def get_async_engine() -> AsyncEngine:
+    """The async engine, created on first use."""
+    if "async" not in engines:
+        engines["async"] = create_async_engine(
+            ASYNC_DB_URL, connect_args=asyncpg_options(), **POOL_OPTIONS
+        )
+        instrument_engine(
+            engines["async"].sync_engine, "async", cnf.slow_query_ms
+        )
+    return engines["async"]
+
+
+def asyncpg_options() -> dict:
+    """Prepared statement options of the asyncpg connections."""
+    if cnf.db_pgbouncer:
+        return {
+            "statement_cache_size": 0,
+            "prepared_statement_cache_size": 0,
+            "prepared_statement_name_func": lambda: f"__asyncpg_{uuid4()}__",
+        }
+    return {
+        "statement_cache_size": cnf.db_statement_cache_size,
+        "prepared_statement_cache_size": cnf.db_statement_cache_size,
+    }
+
+
+def __getattr__(name: str):
+    if name == "engine":
+        return get_engine()
+    if name == "async_engine":
+        return get_async_engine()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
 
 def get_session():
-    with Session(engine) as session:
+    with Session(get_engine()) as session:
         yield session
 
 
-async_session = async_sessionmaker(
-    async_engine, class_=AsyncSession, expire_on_commit=False
-)
+def async_session() -> AsyncSession:
+    """Open a new session of the async engine."""
+    return AsyncSession(get_async_engine(), expire_on_commit=False)
 
 
 async def get_async_session() -> AsyncSession:
@@ -26,5 +94,47 @@ async def get_async_session() -> AsyncSession:
         yield session
 
 
-def init_database():
-    SQLModel.metadata.create_all(engine)
+async def init_database():
+    async with get_async_engine().begin() as conn:
+        await conn.run_sync(SQLModel.metadata.create_all)
+
+
+async def warm_up_pool(connections: int):
+    """
+    Open up to ``connections`` connections of the async pool at once and
+    return them to the pool, so that the first requests after a start do
+    not wait for them.
+    """
+    conns = [
+        get_async_engine().connect()
+        for _ in range(min(connections, cnf.db_pool_size))
+    ]
+    try:
+        await asyncio.gather(*(conn.start() for conn in conns))
+    finally:
+        await asyncio.gather(*(
+            conn.close() for conn in conns if conn.sync_connection is not None
+        ))
+
+
+async def dispose_engines():
+    """Close the connections of every engine created so far."""
+    for db_engine in engines.values():
+        if isinstance(db_engine, AsyncEngine):
+            await db_engine.dispose()
+        else:
+            db_engine.dispose()
+
+
+def pool_stats(db_engine: Engine) -> dict:
+    """
+    Report the connection usage of an engine's pool in this worker process.
+    """
+    pool = db_engine.pool
+    return {
+        "size": pool.size(),
+        "checked_out": pool.checkedout(),
+        "idle": pool.checkedin(),
+        "overflow": max(pool.overflow(), 0),
+        "max_overflow": cnf.db_max_overflow,
+    }
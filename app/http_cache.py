@@ -0,0 +1,180 @@
+"""
+Conditional GET for read routes.
+
+Every cacheable resource (the project list, the tasks of a project or of
+a user, a productivity log) has a version in ``resource_version`` that is
+changed in the transaction of every write to it. A read first looks up
+the versions of its resources and derives the ``ETag`` from them, so a
+matching ``If-None-Match`` is answered with 304 without reading any task
+rows. Serialized bodies can also be kept in a bounded per-process LRU
+keyed by URL and ETag.
+"""
+
+from collections import OrderedDict
+from typing import Iterable, List, Optional, Tuple
+
+from fastapi import HTTPException, Request, Response, status
+from sqlalchemy import func, select, tuple_
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import settings
+from app.responses import json_response
+from app.schemas.cache import ResourceVersion, resource_version_seq
+
+Resource = Tuple[str, int]
+
+# Response headers that are part of a cached page.
+CACHED_HEADERS = ("x-next-cursor",)
+
+
+async def bump_versions(session: AsyncSession, resources: Iterable[Resource]):
+    """
+    Give resources new versions. The caller commits.
+
+    Rows are upserted in key order, so concurrent writers cannot deadlock.
+    """
+    resources = sorted(set(resources))
+    if not resources:
+        return
+    statement = insert(ResourceVersion).values([
+        {
+            "resource": resource,
+            "key": key,
+            "version": func.nextval(resource_version_seq.name),
+        }
+        for resource, key in resources
+    ])
+    statement = statement.on_conflict_do_update(
+        index_elements=[ResourceVersion.resource, ResourceVersion.key],
+        set_={"version": statement.excluded.version},
+    )
+    await session.execute(statement)
+
+
+def etag_matches(etag: str, if_none_match: Optional[str]) -> bool:
+    """Weak comparison of an ETag with an ``If-None-Match`` header."""
+    if not if_none_match:
+        return False
+    candidates = [tag.strip() for tag in if_none_match.split(",")]
+    return "*" in candidates or etag.removeprefix("W/") in (
+        tag.removeprefix("W/") for tag in candidates
+    )
+
+
+class ResponseCache:
+    """
+    ETag validation and an optional LRU of serialized responses.
+
+    Args:
+        maxsize (int): Number of responses kept; ``0`` disables the LRU.
+        max_age (int): ``max-age`` of the ``Cache-Control`` header.
+    """
+
+    def __init__(self, maxsize: int, max_age: int):
+        self.maxsize = maxsize
+        self.max_age = max_age
+        self.hits = 0
+        self.not_modified = 0
+        self._bodies = OrderedDict()
+
+    async def etag(
+        self, session: AsyncSession, resources: List[Resource]
+    ) -> str:
+        """Derive the ETag of a response from its resource versions."""
+        result = await session.execute(
+            select(
+                ResourceVersion.resource,
+                ResourceVersion.key,
+                ResourceVersion.version,
+            ).where(
+                tuple_(ResourceVersion.resource, ResourceVersion.key)
+                .in_(resources)
+            )
+        )
+        versions = {(row.resource, row.key): row.version for row in result}
+        return 'W/"' + ".".join(
+            f"{resource}{key}v{versions.get((resource, key), 0)}"
+            for resource, key in resources
+        ) + '"'
+
+    async def lookup(
+        self,
+        request: Request,
+        response: Response,
+        session: AsyncSession,
+        resources: List[Resource],
+    ) -> Optional[Response]:
+        """
+        Validate a read before it touches the data.
+
+        Sets ``ETag`` and ``Cache-Control`` on the response.
+
+        Returns:
+            Optional[Response]: The cached response, or ``None`` if the
+            route has to build it.
+
+        Raises:
+            HTTPException: 304 if the client's copy is current.
+        """
+        etag = await self.etag(session, resources)
+        headers = {"ETag": etag, "Cache-Control": self.cache_control()}
+        if etag_matches(etag, request.headers.get("if-none-match")):
+            self.not_modified += 1
+            raise HTTPException(
+                status_code=status.HTTP_304_NOT_MODIFIED, headers=headers
+            )
+        response.headers.update(headers)
+        request.state.cache_key = (str(request.url), etag)
+
+        cached = self._bodies.get(request.state.cache_key)
+        if cached is None:
+            return None
+        self._bodies.move_to_end(request.state.cache_key)
+        self.hits += 1
+        body, extra = cached
+        return Response(
+            content=body,
+            media_type="application/json",
+            headers={**extra, **headers},
+        )
+
+    def store(
+        self, request: Request, response: Response, body: bytes
+    ) -> Response:
+        """
+        Remember the JSON body built by a route after ``lookup``.
+
+        Returns:
+            Response: The response to return from the route.
+        """
+        if self.maxsize > 0:
+            extra = {
+                name: response.headers[name]
+                for name in CACHED_HEADERS if name in response.headers
+            }
+            self._bodies[request.state.cache_key] = (body, extra)
+            while len(self._bodies) > self.maxsize:
+                self._bodies.popitem(last=False)
+        return json_response(body, response)
+
+    def cache_control(self) -> str:
+        if self.max_age > 0:
+            return f"private, max-age={self.max_age}"
+        return "private, no-cache"
+
+    def stats(self) -> dict:
+        """
+        Report cache effectiveness counters.
+        """
+        return {
+            "hits": self.hits,
+            "not_modified": self.not_modified,
+            "size": len(self._bodies),
+            "maxsize": self.maxsize,
+        }
+
+
+response_cache = ResponseCache(
+    maxsize=settings.http_cache_size, max_age=settings.http_cache_max_age
+)
@@ -0,0 +1,283 @@
+"""
+Durable background jobs stored in Postgres.
+
+Jobs are rows of the ``job`` table. Every application process runs a
+``JobWorker`` that claims due jobs with ``SELECT ... FOR UPDATE SKIP
+LOCKED``, so any number of workers can share the table without handing
+the same job out twice, and runs them as asyncio tasks up to a fixed
+concurrency. Handlers are coroutines registered with ``job_handler``.
+"""
+
+import asyncio
+import logging
+import traceback
+from datetime import timedelta
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+import shortuuid
+from sqlalchemy import event, func, insert, or_, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import settings
+from app.db import async_session
+from app.schemas.job import Job
+
+logger = logging.getLogger(__name__)
+
+JobHandler = Callable[..., Awaitable[Any]]
+handlers: Dict[str, JobHandler] = {}
+
+
+def job_handler(kind: str):
+    """
+    Register a coroutine as the handler of a job kind.
+
+    The handler is called with the job ID as ``job_id`` and the job payload
+    as keyword arguments; its return value must be JSON serializable.
+    """
+    def register(func: JobHandler) -> JobHandler:
+        handlers[kind] = func
+        return func
+    return register
+
+
+async def enqueue(
+    session: AsyncSession,
+    kind: str,
+    payload: Optional[dict] = None,
+    max_attempts: Optional[int] = None,
+    timeout: Optional[float] = None,
+) -> str:
+    """
+    Add a job to the queue. The caller commits the session; the worker of
+    this process is woken up once the job is committed, so that it does
+    not look for the job before it is visible.
+
+    Args:
+        session (AsyncSession): The database session.
+        kind (str): The registered job kind.
+        payload (Optional[dict]): Keyword arguments for the handler.
+        max_attempts (Optional[int]): How many times to try the job.
+        timeout (Optional[float]): Seconds one attempt may take.
+
+    Returns:
+        str: The job ID.
+    """
+    if kind not in handlers:
+        raise ValueError(f"Unknown job kind: {kind}")
+    job_id = shortuuid.uuid()
+    await session.execute(insert(Job).values(
+        id=job_id,
+        kind=kind,
+        payload=payload or {},
+        status="pending",
+        attempts=0,
+        max_attempts=max_attempts or settings.job_max_attempts,
+        timeout=timeout or settings.job_timeout,
+        run_after=func.localtimestamp(),
+        created_at=func.localtimestamp(),
+    ))
+    event.listen(
+        session.sync_session, "after_commit",
+        lambda _: job_worker.wake(), once=True,
+    )
+    return job_id
+
+
+class JobWorker:
+    """
+    Claims and runs jobs with bounded concurrency.
+
+    Args:
+        session_factory: Factory of ``AsyncSession`` objects.
+        concurrency (int): Maximum number of jobs running at once.
+        poll_interval (float): Seconds to wait when there is nothing to do.
+        retry_delay (float): Base delay before a failed job is retried;
+            doubled with every attempt.
+        kinds (Optional[List[str]]): Only claim jobs of these kinds, e.g.
+            to give slow jobs their own worker. All kinds by default.
+    """
+
+    def __init__(
+        self,
+        session_factory: Callable[[], AsyncSession],
+        concurrency: int,
+        poll_interval: float,
+        retry_delay: float,
+        kinds: Optional[List[str]] = None,
+    ):
+        self.session_factory = session_factory
+        self.concurrency = concurrency
+        self.poll_interval = poll_interval
+        self.retry_delay = retry_delay
+        self.kinds = kinds
+        self._running = set()
+        self._loop_task: Optional[asyncio.Task] = None
+        self._wakeup = asyncio.Event()
+
+    def wake(self):
+        """Make the worker look for new jobs without waiting for the poll."""
+        self._wakeup.set()
+
+    async def start(self):
+        """Start claiming jobs in the background."""
+        if self._loop_task is None and self.concurrency > 0:
+            self._wakeup = asyncio.Event()
+            self._loop_task = asyncio.create_task(self._loop())
+
+    async def stop(self):
+        """
+        Stop claiming jobs and cancel the running ones. Their leases expire
+        and another worker picks them up.
+        """
+        if self._loop_task is not None:
+            self._loop_task.cancel()
+            await asyncio.gather(self._loop_task, return_exceptions=True)
+            self._loop_task = None
+        for task in list(self._running):
+            task.cancel()
+        await asyncio.gather(*self._running, return_exceptions=True)
+
+    async def run_pending(self) -> int:
+        """
+        Run due jobs until none is left, in the calling task.
+
+        Returns:
+            int: The number of jobs run.
+        """
+        count = 0
+        while jobs := await self.claim(self.concurrency or 1):
+            await asyncio.gather(*(self.run(job) for job in jobs))
+            count += len(jobs)
+        return count
+
+    async def claim(self, limit: int) -> List[Job]:
+        """
+        Lock up to ``limit`` due jobs for this worker.
+
+        A running job whose lease expired, because its worker died, hung
+        or was stopped, is claimed again while it has attempts left and
+        marked failed otherwise.
+        """
+        now = func.localtimestamp()
+        expired = (Job.status == "running") & (Job.locked_until < now)
+        exhausted = (
+            update(Job)
+            .where(expired, Job.attempts >= Job.max_attempts)
+            .values(
+                status="failed",
+                error="Lease expired, no attempts left",
+                locked_until=None,
+                finished_at=now,
+            )
+        )
+        due = (
+            select(Job.id)
+            .where(or_(
+                (Job.status == "pending") & (Job.run_after <= now),
+                expired & (Job.attempts < Job.max_attempts),
+            ))
+            .order_by(Job.run_after)
+            .limit(limit)
+            .with_for_update(skip_locked=True)
+        )
+        if self.kinds is not None:
+            exhausted = exhausted.where(Job.kind.in_(self.kinds))
+            due = due.where(Job.kind.in_(self.kinds))
+        statement = (
+            update(Job)
+            .where(Job.id.in_(due.scalar_subquery()))
+            .values(
+                status="running",
+                attempts=Job.attempts + 1,
+                locked_until=now + Job.timeout * timedelta(seconds=1),
+            )
+            .returning(Job)
+        )
+        async with self.session_factory() as session:
+            await session.execute(exhausted)
+            jobs = (await session.execute(statement)).scalars().all()
+            await session.commit()
+        return list(jobs)
+
+    async def run(self, job: Job):
+        """
+        Run one claimed job and record its outcome.
+        """
+        try:
+            handler = handlers[job.kind]
+            result = await asyncio.wait_for(
+                handler(job_id=job.id, **job.payload), timeout=job.timeout
+            )
+            values = {"status": "done", "result": result, "error": None}
+        except asyncio.CancelledError:
+            raise
+        except Exception as exc:
+            if isinstance(exc, asyncio.TimeoutError):
+                error = f"Timed out after {job.timeout} s"
+            else:
+                error = "".join(traceback.format_exception_only(exc)).strip()
+            logger.warning("Job %s (%s) failed: %s", job.id, job.kind, error)
+            if job.attempts < job.max_attempts:
+                delay = self.retry_delay * 2 ** (job.attempts - 1)
+                values = {
+                    "status": "pending",
+                    "error": error,
+                    "run_after": (
+                        func.localtimestamp() + timedelta(seconds=delay)
+                    ),
+                }
+            else:
+                values = {"status": "failed", "error": error}
+        if values["status"] != "pending":
+            values["finished_at"] = func.localtimestamp()
+        # Every claim counts an attempt, so a job claimed again after this
+        # claim went stale has more attempts and is left to its new runner.
+        async with self.session_factory() as session:
+            result = await session.execute(
+                update(Job)
+                .where(
+                    Job.id == job.id,
+                    Job.status == "running",
+                    Job.attempts == job.attempts,
+                )
+                .values(locked_until=None, **values)
+            )
+            await session.commit()
+        if result.rowcount == 0:
+            logger.warning(
+                "Job %s (%s) was claimed again, its outcome is dropped",
+                job.id, job.kind,
+            )
+
+    async def _loop(self):
+        while True:
+            free = self.concurrency - len(self._running)
+            jobs = []
+            if free > 0:
+                try:
+                    jobs = await self.claim(free)
+                except Exception:
+                    logger.exception("Could not claim jobs")
+            for job in jobs:
+                task = asyncio.create_task(self.run(job))
+                self._running.add(task)
+                task.add_done_callback(self._running.discard)
+                task.add_done_callback(lambda _: self.wake())
+            if jobs and len(jobs) == free:
+                continue
+            self._wakeup.clear()
+            try:
+                await asyncio.wait_for(
+                    self._wakeup.wait(), timeout=self.poll_interval
+                )
+            except asyncio.TimeoutError:
+                pass
+
+
+job_worker = JobWorker(
+    session_factory=async_session,
+    concurrency=settings.job_workers,
+    poll_interval=settings.job_poll_interval,
+    retry_delay=settings.job_retry_delay,
+)
@@ -0,0 +1,160 @@
+"""
+Module for archiving completed tasks and deleting tasks in bulk.
+
+Tasks are removed in chunks. Each chunk locks, deletes and, when
+archiving, copies at most ``chunk_size`` tasks to ``task_archive`` with
+one ``DELETE ... RETURNING`` feeding an ``INSERT``, and is committed on
+its own, so locks are short and the task table shrinks gradually. The
+task counters are updated in the transaction of every chunk.
+
+Run ``python -m app.logging.archive_handler`` to archive from a shell;
+``POST /tasks/archive`` runs the same as a background job.
+"""
+
+import argparse
+import asyncio
+from datetime import datetime, timedelta
+
+from sqlalchemy import Select, delete, func, insert, literal, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import settings
+from app.db import async_session, dispose_engines
+from app.jobs.worker import job_handler
+from app.logging.stats_handler import STATE_FIELDS, apply_task_changes
+from app.schemas.task import Task, TaskArchive
+
+ARCHIVE_FIELDS = (
+    "id", "description", "assignee", "due_date", "project", "complexity",
+    "completed_at",
+)
+
+
+def completed_before(cutoff: datetime) -> Select:
+    """Select IDs of tasks completed before ``cutoff``, skipping locked ones."""
+    return (
+        select(Task.id)
+        .where(Task.is_completed.is_(True), Task.completed_at < cutoff)
+        .order_by(Task.completed_at)
+        .with_for_update(skip_locked=True)
+    )
+
+
+def insert_archive(moved):
+    """Copy rows of a ``DELETE ... RETURNING`` CTE to the archive."""
+    return insert(TaskArchive).from_select(
+        [*ARCHIVE_FIELDS, "archived_at"],
+        select(
+            *(moved.c[name] for name in ARCHIVE_FIELDS),
+            func.localtimestamp(),
+        ),
+    ).returning(
+        TaskArchive.assignee,
+        TaskArchive.project,
+        TaskArchive.complexity,
+        literal(True).label("is_completed"),
+    )
+
+
+async def remove_chunk(
+    session: AsyncSession, chosen: Select, archive: bool
+) -> int:
+    """
+    Delete the tasks whose IDs ``chosen`` selects. The caller commits.
+
+    Args:
+        session (AsyncSession): The database session.
+        chosen (Select): A limited, locking SELECT of task IDs.
+        archive (bool): Copy the tasks to ``task_archive`` first.
+
+    Returns:
+        int: The number of tasks removed.
+    """
+    removed = (
+        delete(Task)
+        .where(Task.id.in_(chosen.scalar_subquery()))
+        .execution_options(synchronize_session=False)
+    )
+    if archive:
+        moved = removed.returning(
+            *(getattr(Task, name) for name in ARCHIVE_FIELDS)
+        ).cte("moved")
+        statement = insert_archive(moved)
+    else:
+        statement = removed.returning(
+            *(getattr(Task, name) for name in STATE_FIELDS)
+        )
+    rows = (await session.execute(statement)).all()
+    await apply_task_changes(
+        session, [(dict(row._mapping), None) for row in rows]
+    )
+    return len(rows)
+
+
+async def remove_tasks(
+    session: AsyncSession, chosen: Select, chunk_size: int, archive: bool
+) -> int:
+    """
+    Remove all tasks ``chosen`` selects, one committed chunk at a time.
+
+    Returns:
+        int: The number of tasks removed.
+    """
+    total = 0
+    while True:
+        count = await remove_chunk(session, chosen.limit(chunk_size), archive)
+        await session.commit()
+        total += count
+        if count < chunk_size:
+            return total
+
+
+async def archive_completed(
+    session: AsyncSession, older_than_days: int, chunk_size: int
+) -> int:
+    """
+    Move tasks completed more than ``older_than_days`` days ago to the
+    archive.
+
+    Returns:
+        int: The number of tasks archived.
+    """
+    cutoff = datetime.now() - timedelta(days=older_than_days)
+    return await remove_tasks(
+        session, completed_before(cutoff), chunk_size, archive=True
+    )
+
+
+@job_handler("archive-tasks")
+async def archive_job(job_id: str, older_than_days: int, chunk_size: int):
+    """
+    Archive completed tasks in the background. Chunks committed before
+    a failure or a timeout stay archived; a retry continues from there.
+    """
+    async with async_session() as session:
+        archived = await archive_completed(session, older_than_days, chunk_size)
+    return {"archived": archived}
+
+
+async def main():
+    parser = argparse.ArgumentParser(
+        description="Move old completed tasks to task_archive."
+    )
+    parser.add_argument(
+        "--older-than-days", type=int, default=settings.archive_after_days
+    )
+    parser.add_argument(
+        "--chunk-size", type=int, default=settings.archive_chunk_size
+    )
+    args = parser.parse_args()
+
+    async with async_session() as session:
+        archived = await archive_completed(
+            session, args.older_than_days, args.chunk_size
+        )
+    await dispose_engines()
+    print(f"Archived {archived} tasks")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -2,54 +2,92 @@
 """Module for handling productivity logs."""
 
 from datetime import datetime
-from sqlalchemy import select
+from typing import Optional
+
+from sqlalchemy import Float, Row, case, cast, func, literal, select, true, update
+from sqlalchemy.dialects.postgresql import insert
 from sqlalchemy.ext.asyncio import AsyncSession
-from app.schemas.task import ProductivityLog
+from app.schemas.task import ProductivityLog, Task
 
 
-async def get_or_create_log(session: AsyncSession, user_id: int) -> ProductivityLog:
+async def record_completion(
+    session: AsyncSession, task_id: int, user_id: int
+) -> Optional[Row]:
     """
-    Get or create a productivity log for a user.
+    Mark a task as completed and count it in the user's productivity log.
+
+    Both changes are made by one statement: a conditional UPDATE of the
+    task feeds an INSERT ... ON CONFLICT (user_id) DO UPDATE of the log,
+    so concurrent completions neither lose increments nor create duplicate
+    logs. The monthly counters are reset in SQL when the previous activity
+    was in another month.
 
     Args:
         session (AsyncSession): The database session.
-        user_id (int): The ID of the user.
+        task_id (int): The ID of the task.
+        user_id (int): The ID of the user completing the task.
 
     Returns:
-        ProductivityLog: The productivity log for the user.
+        Optional[Row]: The updated ``tasks_completed``,
+        ``tasks_completed_month`` and ``mean_complexity_month`` of the log
+        with the ``assignee``, ``project`` and ``complexity`` of the task,
+        or ``None`` if the task does not exist or is already completed.
     """
-    result = await session.execute(
-        select(ProductivityLog).where(ProductivityLog.user_id == user_id)
+    done = (
+        update(Task)
+        .where(Task.id == task_id, Task.is_completed.is_(False))
+        .values(is_completed=True, completed_at=func.localtimestamp())
+        .returning(Task.assignee, Task.project, Task.complexity)
+        .cte("done")
     )
-    log = result.scalars().first()
-    if not log:
-        new_log = ProductivityLog(user_id=user_id)
-        session.add(new_log)
-        await session.commit()
-        return new_log
-    
-    if log.last_activity.month != datetime.now().month:
-        log.tasks_completed_month = 0
-        log.mean_complexity_month = 0.0
-    log.last_activity = datetime.now()
-
-    return log
-
-
-async def update_mean_complexity(log: ProductivityLog, complexity: int) -> float:
-    """
-    Calculate the focus score based on simple rules.
-
-    Args:
-        log (ProductivityLog): The productivity log.
-        complexity (int): The complexity of the task.
-
-    Returns:
-        float: The calculated focus score.
-    """
-    log.tasks_completed += 1
-    log.tasks_completed_month += 1
-    log.mean_complexity_month = (
-        log.mean_complexity_month * (log.tasks_completed_month - 1) + complexity
-    ) / log.tasks_completed_month
-    return log
\ No newline at end of file
+    now = datetime.now()
+    statement = insert(ProductivityLog).from_select(
+        [
+            "user_id", "log_date", "tasks_completed",
+            "tasks_completed_month", "mean_complexity_month", "last_activity",
+        ],
+        select(
+            literal(user_id), literal(now.date()), literal(1), literal(1),
+            cast(done.c.complexity, Float), literal(now),
+        ).select_from(done),
+    )
+    same_month = (
+        func.date_trunc("month", ProductivityLog.last_activity)
+        == func.date_trunc("month", statement.excluded.last_activity)
+    )
+    statement = statement.on_conflict_do_update(
+        index_elements=[ProductivityLog.user_id],
+        set_={
+            "tasks_completed": ProductivityLog.tasks_completed + 1,
+            "tasks_completed_month": case(
+                (same_month, ProductivityLog.tasks_completed_month + 1),
+                else_=1,
+            ),
+            "mean_complexity_month": case(
+                (
+                    same_month,
+                    (
+                        ProductivityLog.mean_complexity_month
+                        * ProductivityLog.tasks_completed_month
+                        + statement.excluded.mean_complexity_month
+                    ) / (ProductivityLog.tasks_completed_month + 1),
+                ),
+                else_=statement.excluded.mean_complexity_month,
+            ),
+            "last_activity": statement.excluded.last_activity,
+        },
+    ).returning(
+        ProductivityLog.tasks_completed,
+        ProductivityLog.tasks_completed_month,
+        ProductivityLog.mean_complexity_month,
+    ).cte("log")
+    statement = select(
+        statement.c.tasks_completed,
+        statement.c.tasks_completed_month,
+        statement.c.mean_complexity_month,
+        done.c.assignee,
+        done.c.project,
+        done.c.complexity,
+    ).select_from(statement.join(done, true()))
+    result = await session.execute(statement)
+    return result.first()
@@ -0,0 +1,70 @@
+"""
+Module for maintaining the monthly partitions of the task table.
+
+The task table is partitioned by range of ``due_date``. Partitions are
+created by the ``create_task_partitions`` database function, which moves
+the rows of a new month out of the default partition, so running it late
+costs a copy but loses nothing. The application creates the partitions
+for the next ``TASK_PARTITION_MONTHS_AHEAD`` months on start; run
+``python -m app.logging.partition_handler`` from cron for processes that
+live longer than that.
+"""
+
+import argparse
+import asyncio
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import settings
+from app.db import async_session, dispose_engines
+
+
+async def create_task_partitions(
+    session: AsyncSession, months_ahead: int
+) -> int:
+    """
+    Create the missing partitions from the current month up to
+    ``months_ahead`` months ahead. The caller commits.
+
+    Returns:
+        int: The number of partitions created.
+    """
+    result = await session.execute(
+        text(
+            "SELECT create_task_partitions(current_date, "
+            "(current_date + make_interval(months => :months))::date)"
+        ),
+        {"months": months_ahead},
+    )
+    return result.scalar_one()
+
+
+async def ensure_task_partitions():
+    """Create the partitions of the coming months on application start."""
+    async with async_session() as session:
+        await create_task_partitions(
+            session, settings.task_partition_months_ahead
+        )
+        await session.commit()
+
+
+async def main():
+    parser = argparse.ArgumentParser(
+        description="Create the monthly partitions of the task table."
+    )
+    parser.add_argument(
+        "--months-ahead", type=int,
+        default=settings.task_partition_months_ahead,
+    )
+    args = parser.parse_args()
+
+    async with async_session() as session:
+        created = await create_task_partitions(session, args.months_ahead)
+        await session.commit()
+    await dispose_engines()
+    print(f"Created {created} partitions")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,155 @@
+"""
+Module for maintaining the task counters in ``task_stats``.
+
+Write routes describe each change of a task as a pair of its states
+before and after the change, with ``None`` for a task that did not exist
+before or does not exist after. ``apply_task_changes`` turns the pairs
+into counter deltas and applies them with one upsert, in the transaction
+of the change itself. The same projects and users are the resources of
+the conditional GET routes, so their versions are changed too.
+
+Run ``python -m app.logging.stats_handler`` to rebuild the counters from
+scratch.
+"""
+
+import asyncio
+from collections import defaultdict
+from typing import Dict, Iterable, List, Mapping, Optional, Tuple
+
+from sqlalchemy import delete, func, literal, select, text, union_all
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.http_cache import bump_versions
+from app.schemas.task import Task, TaskStats
+
+NO_PROJECT = 0
+STATE_FIELDS = ("assignee", "project", "complexity", "is_completed")
+COUNTERS = ("tasks_open", "tasks_completed", "total_complexity")
+
+TaskState = Optional[Mapping]
+
+
+def task_state(task) -> dict:
+    """Take the fields of a task that the counters depend on."""
+    return {field: getattr(task, field) for field in STATE_FIELDS}
+
+
+def task_keys(state: Mapping) -> Tuple[Tuple[str, int], ...]:
+    """The ``(scope, key)`` pairs a task state is counted in."""
+    return (
+        ("project", state["project"] or NO_PROJECT),
+        ("user", state["assignee"]),
+    )
+
+
+def stats_deltas(
+    changes: Iterable[Tuple[TaskState, TaskState]]
+) -> Dict[Tuple[str, int], List[int]]:
+    """
+    Sum up counter deltas of task changes per ``(scope, key)``.
+
+    Returns:
+        Dict[Tuple[str, int], List[int]]: Non-zero deltas of ``COUNTERS``.
+    """
+    deltas = defaultdict(lambda: [0, 0, 0])
+    for old, new in changes:
+        for state, sign in ((old, -1), (new, 1)):
+            if state is None:
+                continue
+            completed = bool(state["is_completed"])
+            for key in task_keys(state):
+                delta = deltas[key]
+                delta[0] += sign * (not completed)
+                delta[1] += sign * completed
+                delta[2] += sign * state["complexity"]
+    return {key: delta for key, delta in deltas.items() if any(delta)}
+
+
+async def apply_task_changes(
+    session: AsyncSession, changes: Iterable[Tuple[TaskState, TaskState]]
+):
+    """
+    Update the counters and the versions of all projects and assignees
+    touched by changes.
+
+    Rows are upserted in key order, so concurrent writers lock them in the
+    same order and cannot deadlock each other. The caller commits.
+
+    Args:
+        session (AsyncSession): The database session.
+        changes: Pairs of task states before and after each change.
+    """
+    changes = list(changes)
+    await bump_versions(session, (
+        key
+        for change in changes
+        for state in change if state is not None
+        for key in task_keys(state)
+    ))
+    deltas = stats_deltas(changes)
+    if not deltas:
+        return
+    statement = insert(TaskStats).values([
+        {"scope": scope, "key": key, **dict(zip(COUNTERS, delta))}
+        for (scope, key), delta in sorted(deltas.items())
+    ])
+    statement = statement.on_conflict_do_update(
+        index_elements=[TaskStats.scope, TaskStats.key],
+        set_={
+            name: getattr(TaskStats, name) + statement.excluded[name]
+            for name in COUNTERS
+        },
+    )
+    await session.execute(statement)
+
+
+async def rebuild_task_stats(session: AsyncSession) -> int:
+    """
+    Recompute all counters from the task table in one set-based pass.
+
+    The counters table is locked against writers for the duration of the
+    transaction, so changes made meanwhile are applied after the rebuild.
+    The caller commits.
+
+    Returns:
+        int: The number of counter rows.
+    """
+    open_tasks = func.count().filter(Task.is_completed.is_(False))
+    completed_tasks = func.count().filter(Task.is_completed.is_(True))
+    complexity = func.coalesce(func.sum(Task.complexity), 0)
+
+    def rollup(scope: str, key):
+        return (
+            select(
+                literal(scope), key, open_tasks, completed_tasks, complexity
+            )
+            .group_by(key)
+        )
+
+    project = func.coalesce(Task.project, NO_PROJECT)
+    await session.execute(
+        text("LOCK TABLE task_stats IN SHARE ROW EXCLUSIVE MODE")
+    )
+    await session.execute(delete(TaskStats))
+    result = await session.execute(
+        insert(TaskStats).from_select(
+            ["scope", "key", *COUNTERS],
+            union_all(rollup("project", project), rollup("user", Task.assignee)),
+        )
+    )
+    return result.rowcount
+
+
+async def main():
+    from app.db import async_session, dispose_engines
+
+    async with async_session() as session:
+        rows = await rebuild_task_stats(session)
+        await session.commit()
+    await dispose_engines()
+    print(f"Rebuilt {rows} task_stats rows")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
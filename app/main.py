@@ -1,17 +1,38 @@
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
-from app.routes import (task, utils, async_routes, auth)
+from sqlalchemy.orm import configure_mappers
+from app.auth.auth_handler import hashing_pool
+from app.calendar.day_off import day_off_service
+from app.config import settings
+from app.db import dispose_engines, warm_up_pool
+from app.jobs.worker import job_worker
+from app.logging.partition_handler import ensure_task_partitions
+from app.metrics import MetricsMiddleware
+from app.routes import (task, utils, async_routes, auth, metrics)
 from app.routes import task
-# from contextlib import asynccontextmanager  # Uncomment if you need to create tables on app start >>>
-# from app.db import init_database
+# from app.db import init_database  # Uncomment if you need to create tables on app start
+
 
-# @asynccontextmanager
-# async def lifespan(app: FastAPI):
-#    init_database()
-#    yield                                   # <<< Uncomment if you need to create tables on app start
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # await init_database()  # Uncomment if you need to create tables on app start
+    await ensure_task_partitions()
+    await warm_up_pool(settings.db_pool_warm_up)
+    # Otherwise the mappers are configured by the first query and the
+    # OpenAPI schema is built from the models by the first docs request.
+    configure_mappers()
+    app.openapi()
+    await job_worker.start()
+    yield
+    await job_worker.stop()
+    await day_off_service.stop()
+    hashing_pool.shutdown()
+    await dispose_engines()
 
 
 app = FastAPI(
-    # lifespan=lifespan,  # Uncomment if you need to create tables on app start
+    lifespan=lifespan,
     title="Система управления задачами",
     description="Простейшая система управления задачами, основанная на "
                 "фреймворке FastAPI.",
@@ -27,6 +48,15 @@ app = FastAPI(
     }
 )
 
+app.add_middleware(
+    MetricsMiddleware,
+    server_timing=settings.server_timing,
+    query_debug=settings.query_debug,
+    repeat_threshold=settings.query_repeat_threshold,
+)
+
 app.include_router(task.router)
 app.include_router(utils.router)
 app.include_router(auth.router)
+app.include_router(async_routes.router)
+app.include_router(metrics.router)
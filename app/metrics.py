@@ -0,0 +1,303 @@
+"""
+Request and database metrics in the Prometheus format.
+
+``MetricsMiddleware`` records the latency, status code and in-flight
+count of every request, labelled by the route template rather than the
+raw path. ``instrument_engine`` hooks the cursor events of an engine to
+time every query; queries issued while a request is served are also
+added up per request, so the number of queries and the database time of
+each route can be seen next to its latency.
+
+Query diagnostics are opt-in: with ``query_debug`` the middleware keeps
+the statements of every request and logs those run ``repeat_threshold``
+times or more, the usual sign of an N+1 pattern, and ``instrument_engine``
+can log statements slower than a threshold with the types of their
+parameters. ``query_budget`` lets tests assert how many queries the
+requests sent in a block of code run.
+
+With several worker processes, set ``PROMETHEUS_MULTIPROC_DIR`` to an
+empty directory before the workers start; every process then writes its
+samples there and ``/metrics`` aggregates all of them.
+"""
+
+import logging
+import os
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import Dict, Iterator, List, Optional
+
+from prometheus_client import (
+    REGISTRY,
+    CollectorRegistry,
+    Counter,
+    Gauge,
+    Histogram,
+    generate_latest,
+)
+from prometheus_client import multiprocess
+from sqlalchemy import Engine, event
+
+REQUESTS = Counter(
+    "http_requests_total",
+    "HTTP requests by route and status code.",
+    ["method", "route", "status"],
+)
+REQUEST_DURATION = Histogram(
+    "http_request_duration_seconds",
+    "Time from receiving a request to sending the response headers.",
+    ["method", "route"],
+)
+IN_PROGRESS = Gauge(
+    "http_requests_in_progress",
+    "HTTP requests being served.",
+    ["method"],
+    multiprocess_mode="livesum",
+)
+REQUEST_QUERIES = Histogram(
+    "http_request_db_queries",
+    "Database queries issued while serving a request.",
+    ["route"],
+    buckets=(0, 1, 2, 3, 5, 10, 20, 50, 100, 500),
+)
+REQUEST_DB_DURATION = Histogram(
+    "http_request_db_seconds",
+    "Database time spent while serving a request.",
+    ["route"],
+)
+QUERY_DURATION = Histogram(
+    "db_query_duration_seconds",
+    "Duration of database queries.",
+    ["engine"],
+    buckets=(0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 1.0),
+)
+QUERY_ERRORS = Counter(
+    "db_query_errors_total",
+    "Database queries that failed.",
+    ["engine"],
+)
+
+UNMATCHED_ROUTE = "unmatched"
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class RequestStats:
+    """Database usage of the request being served."""
+    queries: int = 0
+    db_time: float = 0.0
+    # Executions of every statement, kept in query debug mode only.
+    statements: Optional[Dict[str, int]] = None
+
+
+request_stats: ContextVar[Optional[RequestStats]] = ContextVar(
+    "request_stats", default=None
+)
+# Statement lists of the active ``record_queries`` blocks.
+recorders: List[List[str]] = []
+
+
+def instrument_engine(engine: Engine, name: str, slow_query_ms: float = 0):
+    """
+    Time the queries of an engine. Pass ``AsyncEngine.sync_engine`` for
+    an async engine.
+
+    Args:
+        engine (Engine): The engine to instrument.
+        name (str): The ``engine`` label of the metrics.
+        slow_query_ms (float): Log statements that take at least this
+            long; 0 logs none.
+    """
+    # The start time is kept on the execution context rather than on the
+    # connection, so that a failed statement leaves nothing behind.
+    @event.listens_for(engine, "before_cursor_execute")
+    def before_cursor_execute(
+        conn, cursor, statement, parameters, context, executemany
+    ):
+        context.query_started = time.perf_counter()
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def after_cursor_execute(
+        conn, cursor, statement, parameters, context, executemany
+    ):
+        record(context, statement, parameters, executemany)
+
+    @event.listens_for(engine, "handle_error")
+    def handle_error(exception_context):
+        context = exception_context.execution_context
+        if context is None or not hasattr(context, "query_started"):
+            return
+        QUERY_ERRORS.labels(name).inc()
+        record(
+            context, exception_context.statement,
+            exception_context.parameters, context.executemany,
+        )
+
+    def record(context, statement, parameters, executemany):
+        elapsed = time.perf_counter() - context.query_started
+        QUERY_DURATION.labels(name).observe(elapsed)
+        if slow_query_ms and elapsed * 1000 >= slow_query_ms:
+            logger.warning(
+                "Slow query on %s engine, %.1f ms: %s; parameters: %s",
+                name, elapsed * 1000, statement,
+                parameter_shape(parameters, executemany),
+            )
+        stats = request_stats.get()
+        if stats is not None:
+            stats.queries += 1
+            stats.db_time += elapsed
+            if stats.statements is not None:
+                stats.statements[statement] = (
+                    stats.statements.get(statement, 0) + 1
+                )
+            for statements in recorders:
+                statements.append(statement)
+
+
+def parameter_shape(parameters, executemany: bool = False) -> str:
+    """
+    Describe bound parameters by their types only, so that logs show the
+    shape of a statement without the values, e.g. ``(int, str)`` or
+    ``3 x {'id': int}`` for an executemany of three rows.
+    """
+    rows = parameters if executemany else [parameters]
+    first = rows[0] if rows else ()
+    if isinstance(first, dict):
+        shape = "{" + ", ".join(
+            f"{key!r}: {type(value).__name__}" for key, value in first.items()
+        ) + "}"
+    else:
+        shape = "(" + ", ".join(type(value).__name__ for value in first) + ")"
+    return f"{len(rows)} x {shape}" if executemany else shape
+
+
+@contextmanager
+def record_queries() -> Iterator[List[str]]:
+    """
+    Collect the statements that requests served by ``MetricsMiddleware``
+    run on the instrumented engines while the block runs, whichever task
+    or thread serves them. Background work such as the job worker is
+    left out.
+    """
+    statements: List[str] = []
+    recorders.append(statements)
+    try:
+        yield statements
+    finally:
+        recorders.remove(statements)
+
+
+@contextmanager
+def query_budget(limit: int) -> Iterator[List[str]]:
+    """
+    Fail with ``AssertionError`` if the requests sent in the block run
+    more than ``limit`` queries; for tests, e.g.::
+
+        with query_budget(3):
+            client.post("/tasks/new_task", json=task)
+    """
+    with record_queries() as statements:
+        yield statements
+    if len(statements) > limit:
+        raise AssertionError(
+            f"{len(statements)} queries, at most {limit} expected:\n"
+            + "\n".join(statements)
+        )
+
+
+class MetricsMiddleware:
+    """
+    ASGI middleware recording request metrics.
+
+    Args:
+        app: The wrapped ASGI application.
+        server_timing (bool): Add a ``Server-Timing`` header with the
+            total and the database time of the request.
+        query_debug (bool): Log the statements that one request runs
+            ``repeat_threshold`` times or more.
+        repeat_threshold (int): See ``query_debug``.
+    """
+
+    def __init__(
+        self,
+        app,
+        server_timing: bool = False,
+        query_debug: bool = False,
+        repeat_threshold: int = 5,
+    ):
+        self.app = app
+        self.server_timing = server_timing
+        self.query_debug = query_debug
+        self.repeat_threshold = repeat_threshold
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        method = scope["method"]
+        stats = RequestStats(statements={} if self.query_debug else None)
+        token = request_stats.set(stats)
+        started = time.perf_counter()
+        status_code = 500
+        duration = None
+
+        async def send_wrapper(message):
+            nonlocal status_code, duration
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                duration = time.perf_counter() - started
+                if self.server_timing:
+                    message["headers"] = [
+                        *message.get("headers", []),
+                        (b"server-timing", server_timing(duration, stats)),
+                    ]
+            await send(message)
+
+        IN_PROGRESS.labels(method).inc()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            IN_PROGRESS.labels(method).dec()
+            request_stats.reset(token)
+            if duration is None:
+                duration = time.perf_counter() - started
+            route = getattr(scope.get("route"), "path", UNMATCHED_ROUTE)
+            REQUESTS.labels(method, route, status_code).inc()
+            REQUEST_DURATION.labels(method, route).observe(duration)
+            REQUEST_QUERIES.labels(route).observe(stats.queries)
+            REQUEST_DB_DURATION.labels(route).observe(stats.db_time)
+            if stats.statements:
+                self.report_repeated(method, route, stats.statements)
+
+    def report_repeated(self, method: str, route: str, statements: dict):
+        """Log the statements of a request repeated too many times."""
+        for statement, count in statements.items():
+            if count >= self.repeat_threshold:
+                logger.warning(
+                    "Possible N+1 in %s %s, statement run %d times: %s",
+                    method, route, count, statement,
+                )
+
+
+def server_timing(duration: float, stats: RequestStats) -> bytes:
+    """Format the ``Server-Timing`` header value; durations are in ms."""
+    return (
+        f'db;dur={stats.db_time * 1000:.1f};desc="{stats.queries} queries", '
+        f"total;dur={duration * 1000:.1f}"
+    ).encode()
+
+
+def render_metrics() -> bytes:
+    """
+    Render the metrics of all worker processes, or of this process when
+    ``PROMETHEUS_MULTIPROC_DIR`` is not set.
+    """
+    if "PROMETHEUS_MULTIPROC_DIR" not in os.environ:
+        return generate_latest(REGISTRY)
+    registry = CollectorRegistry()
+    multiprocess.MultiProcessCollector(registry)
+    return generate_latest(registry)
+
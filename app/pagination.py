@@ -0,0 +1,232 @@
+"""Keyset (cursor-based) pagination helpers."""
+
+import base64
+import binascii
+import json
+import math
+from typing import Any, Callable, List, Optional, Sequence, Tuple
+
+from fastapi import HTTPException, Query, status
+from pydantic import Field
+from sqlalchemy import Select, and_, or_
+
+from app.schemas.task import Task, TaskFilter
+
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 1000
+# The range of the integer (int4) ID columns used as sort keys.
+MIN_ID = 1
+MAX_ID = 2**31 - 1
+
+PageLimit = Query(
+    default=DEFAULT_PAGE_SIZE,
+    ge=1,
+    le=MAX_PAGE_SIZE,
+    description="Максимальное количество элементов на странице",
+)
+PageCursor = Query(
+    default=None,
+    description="Курсор, полученный вместе с предыдущей страницей",
+)
+
+
+class TaskPageQuery(TaskFilter):
+    """
+    Filters and page of a task list, read as one query parameter model
+    without a dependency.
+    """
+    limit: int = Field(
+        default=DEFAULT_PAGE_SIZE,
+        ge=1,
+        le=MAX_PAGE_SIZE,
+        description="Максимальное количество элементов на странице",
+    )
+    after: Optional[str] = Field(
+        default=None,
+        description="Курсор, полученный вместе с предыдущей страницей",
+    )
+
+
+def encode_cursor(*values: Any) -> str:
+    """
+    Pack the sort key of the last returned row into an opaque string.
+
+    Args:
+        *values: Values of the ordering columns of the last row.
+
+    Returns:
+        str: URL-safe cursor.
+    """
+    raw = json.dumps(values, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, size: int = 1) -> List[Any]:
+    """
+    Unpack a cursor created by ``encode_cursor``.
+
+    Args:
+        cursor (str): The cursor received from the client.
+        size (int): Expected number of values in the cursor.
+
+    Returns:
+        List[Any]: Values of the ordering columns.
+
+    Raises:
+        HTTPException: 400 if the cursor is malformed.
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode()))
+    except (binascii.Error, ValueError, UnicodeDecodeError):
+        values = None
+    if not isinstance(values, list) or len(values) != size:
+        raise invalid_cursor()
+    return values
+
+
+def invalid_cursor() -> HTTPException:
+    """The error of a cursor that was not created by this module."""
+    return HTTPException(
+        status_code=status.HTTP_400_BAD_REQUEST,
+        detail="Invalid pagination cursor.",
+    )
+
+
+def keyset(statement: Select, column, limit: int, after: Optional[str]) -> Select:
+    """
+    Restrict a statement to one page ordered by a unique integer column.
+
+    One extra row is requested so that the caller can tell whether
+    there is a next page without running a separate COUNT query.
+
+    Args:
+        statement (Select): The base statement.
+        column: A unique, indexed column used as the sort key.
+        limit (int): The page size.
+        after (Optional[str]): The cursor of the previous page.
+
+    Returns:
+        Select: The paginated statement.
+    """
+    last_id = cursor_id(after)
+    if last_id is not None:
+        statement = statement.where(column > last_id)
+    return statement.order_by(column).limit(limit + 1)
+
+
+def cursor_id(after: Optional[str]) -> Optional[int]:
+    """
+    Unpack the ID of the last row of the previous page from a cursor of
+    ``keyset``.
+
+    Raises:
+        HTTPException: 400 if the cursor is malformed.
+    """
+    if after is None:
+        return None
+    (last_id,) = decode_cursor(after)
+    return checked_id(last_id)
+
+
+def checked_id(last_id: Any) -> int:
+    """
+    Check that a cursor value is an ID that fits the ID column.
+
+    ``bool`` is a subclass of ``int`` but not an ID, and an ID out of the
+    column's range would fail in the database rather than here.
+
+    Raises:
+        HTTPException: 400 if the value is not a valid ID.
+    """
+    if type(last_id) is not int or not MIN_ID <= last_id <= MAX_ID:
+        raise invalid_cursor()
+    return last_id
+
+
+def ranked_keyset(
+    statement: Select, rank, column, limit: int, after: Optional[str]
+) -> Select:
+    """
+    Restrict a statement to one page ordered by descending ``rank``, ties
+    broken by a unique integer column.
+
+    Args:
+        statement (Select): The base statement.
+        rank: A numeric expression; the cursor carries its value.
+        column: A unique column used as the tie-breaker.
+        limit (int): The page size.
+        after (Optional[str]): The cursor of the previous page.
+
+    Returns:
+        Select: The paginated statement.
+    """
+    if after is not None:
+        last_rank, last_id = decode_cursor(after, size=2)
+        last_id = checked_id(last_id)
+        if type(last_rank) not in (int, float) or not is_finite(last_rank):
+            raise invalid_cursor()
+        statement = statement.where(or_(
+            rank < last_rank, and_(rank == last_rank, column > last_id)
+        ))
+    return statement.order_by(rank.desc(), column).limit(limit + 1)
+
+
+def is_finite(value: float) -> bool:
+    """Whether a number converts to a finite float."""
+    try:
+        return math.isfinite(value)
+    except OverflowError:
+        return False
+
+
+def split_page(
+    rows: Sequence,
+    limit: int,
+    key: Callable[[Any], tuple] = lambda row: (row.id,),
+) -> Tuple[Sequence, Optional[str]]:
+    """
+    Cut the look-ahead row off a page fetched with ``keyset``.
+
+    Args:
+        rows (Sequence): Rows fetched with ``limit + 1``.
+        limit (int): The page size.
+        key (Callable): Returns the cursor values of a row; the task ID by
+            default, ``(row.rank, row.id)`` for ``ranked_keyset``.
+
+    Returns:
+        Tuple[Sequence, Optional[str]]: The page and the cursor of the
+        next page (``None`` if this is the last one).
+    """
+    if len(rows) <= limit:
+        return rows, None
+    rows = rows[:limit]
+    return rows, encode_cursor(*key(rows[-1]))
+
+
+def filter_tasks(statement: Select, filters: TaskFilter) -> Select:
+    """
+    Apply the task list filters to a statement.
+
+    Args:
+        statement (Select): The base statement.
+        filters (TaskFilter): The filters from the query string.
+
+    Returns:
+        Select: The filtered statement.
+    """
+    if filters.assignee is not None:
+        statement = statement.where(Task.assignee == filters.assignee)
+    if filters.no_project:
+        statement = statement.where(Task.project.is_(None))
+    elif filters.project is not None:
+        statement = statement.where(Task.project == filters.project)
+    if filters.is_completed is not None:
+        statement = statement.where(Task.is_completed == filters.is_completed)
+    if filters.due_from is not None:
+        statement = statement.where(Task.due_date >= filters.due_from)
+    if filters.due_to is not None:
+        statement = statement.where(Task.due_date <= filters.due_to)
+    if filters.complexity is not None:
+        statement = statement.where(Task.complexity == filters.complexity)
+    return statement
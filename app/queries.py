@@ -0,0 +1,95 @@
+"""
+Hot queries as cached lambda statements.
+
+The statements run by most requests are built with ``lambda_stmt``.
+SQLAlchemy builds such a statement and its cache key once per lambda, by
+its code location, and later calls only read the bound values from the
+closure variables, so neither the ``select()`` nor its cache key are
+rebuilt on every call. The SQL compiled from them is cached by the
+engine (``DB_QUERY_CACHE_SIZE``) and, with asyncpg, the prepared
+statement by every connection (``DB_STATEMENT_CACHE_SIZE``).
+
+Closure variables must be plain bound values: anything that changes the
+shape of the SQL, like an optional condition, is added with a separate
+lambda.
+"""
+
+from typing import Optional
+
+from sqlalchemy import StatementLambdaElement, delete, lambda_stmt, select
+
+from app.responses import TASK_COLUMNS
+from app.schemas.task import ProductivityLog, Task, User
+
+
+def user_by_email(email: str) -> StatementLambdaElement:
+    """Select the user with the given email."""
+    return lambda_stmt(lambda: select(User).where(User.email == email))
+
+
+def user_by_name(name: str) -> StatementLambdaElement:
+    """Select the first user with the given name."""
+    return lambda_stmt(lambda: select(User).where(User.name == name).limit(1))
+
+
+def task_id_by_id(task_id: int) -> StatementLambdaElement:
+    """Select the ID of a task, to tell whether it exists."""
+    return lambda_stmt(lambda: select(Task.id).where(Task.id == task_id))
+
+
+def delete_task(task_id: int) -> StatementLambdaElement:
+    """Delete a task, returning its ``TASK_COLUMNS``."""
+    return lambda_stmt(
+        lambda: delete(Task).where(Task.id == task_id).returning(*TASK_COLUMNS)
+    )
+
+
+def log_by_user_id(user_id: int) -> StatementLambdaElement:
+    """Select the productivity log of a user."""
+    return lambda_stmt(
+        lambda: select(ProductivityLog).where(ProductivityLog.user_id == user_id)
+    )
+
+
+def tasks_by_user(
+    user_id: int, limit: int, last_id: Optional[int]
+) -> StatementLambdaElement:
+    """Select one page of the ``TASK_COLUMNS`` of a user's tasks."""
+    statement = lambda_stmt(
+        lambda: select(*TASK_COLUMNS).where(Task.assignee == user_id)
+    )
+    return task_page(statement, limit, last_id)
+
+
+def tasks_by_project(
+    project_id: int, limit: int, last_id: Optional[int]
+) -> StatementLambdaElement:
+    """Select one page of the ``TASK_COLUMNS`` of a project's tasks."""
+    statement = lambda_stmt(
+        lambda: select(*TASK_COLUMNS).where(Task.project == project_id)
+    )
+    return task_page(statement, limit, last_id)
+
+
+def tasks_without_project(
+    limit: int, last_id: Optional[int]
+) -> StatementLambdaElement:
+    """Select one page of the ``TASK_COLUMNS`` of tasks without a project."""
+    statement = lambda_stmt(
+        lambda: select(*TASK_COLUMNS).where(Task.project.is_(None))
+    )
+    return task_page(statement, limit, last_id)
+
+
+def task_page(
+    statement: StatementLambdaElement, limit: int, last_id: Optional[int]
+) -> StatementLambdaElement:
+    """
+    Restrict a task statement to the page after ``last_id``, as
+    ``app.pagination.keyset`` does, with one look-ahead row.
+    """
+    if last_id is not None:
+        statement += lambda s: s.where(Task.id > last_id)
+    fetch = limit + 1
+    statement += lambda s: s.order_by(Task.id).limit(fetch)
+    return statement
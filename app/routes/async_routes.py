@@ -1,121 +1,323 @@
+"""
+Version 2 of the task API.
+
+The task routes mirror those of version 1 and share their handlers, so
+both versions behave the same while traffic is moved over route by
+route. Every dependency of this router is a coroutine: filters are read
+as a query parameter model rather than a class dependency, which FastAPI
+would call in the thread pool.
+"""
+
 import asyncio
-import threading
 import time
+from collections import defaultdict
 from datetime import date, datetime
-from typing import List
+from typing import Annotated, List, Optional
 
-import httpx
-import shortuuid
-from fastapi import APIRouter, Depends, HTTPException, Response, status
+import orjson
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.sql import text
-from sqlmodel import select
 
+from app.calendar.day_off import day_off_service
 from app.db import get_async_session
+from app.jobs.worker import enqueue, job_handler
+from app.schemas.job import Job
+from app.schemas.task import User
+from . import task as task_routes
+from ..api_docs import request_examples
+from ..auth.auth_handler import get_current_user
+from ..pagination import TaskPageQuery, filter_tasks, keyset, split_page
+from ..responses import dump_tasks, encode_tasks, json_response, select_task_rows
 from ..schemas import task as schema_task
 
 router = APIRouter(prefix="/v2/async", tags=["Асинхронные операции"])
 
+MAX_CALENDAR_DAYS = 366
+
+
+@router.post(
+    "/tasks",
+    status_code=status.HTTP_201_CREATED,
+    response_model=schema_task.TaskRead,
+    summary="Добавить задачу",
+)
+async def create_task_async(
+    task: Annotated[
+        schema_task.TaskCreate, request_examples.example_create_task
+    ],
+    session: AsyncSession = Depends(get_async_session),
+):
+    """
+    Create a new task and assign it to a user, as `POST /tasks/new_task`.
+    """
+    return await task_routes.create_task(task, session)
+
 
 @router.get(
     "/tasks",
     status_code=status.HTTP_200_OK,
     response_model=List[schema_task.TaskRead],
+    summary="Получить страницу задач с фильтрацией",
 )
-async def read_tasks_async(session: AsyncSession = Depends(get_async_session)):
+async def read_tasks_async(
+    response: Response,
+    page: Annotated[TaskPageQuery, Query()],
+    session: AsyncSession = Depends(get_async_session),
+):
     """
-    Fetch all tasks asynchronously.
+    Fetch tasks matching the given filters page by page.
+
+    The cursor of the next page is returned in the `X-Next-Cursor` header.
     """
-    result = await session.execute(select(schema_task.Task))
-    tasks = result.scalars().all()
+    statement = keyset(
+        filter_tasks(select_task_rows(), page),
+        schema_task.Task.id, page.limit, page.after,
+    )
+    result = await session.execute(statement)
+    tasks, next_cursor = split_page(result.all(), page.limit)
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
     if not tasks:
         raise HTTPException(
             status_code=status.HTTP_204_NO_CONTENT,
             detail="The task list is empty.",
         )
-    return tasks
+    return json_response(encode_tasks(tasks), response)
+
+
+@router.patch(
+    "/tasks",
+    status_code=status.HTTP_200_OK,
+    response_model=schema_task.TaskBatchUpdateResult,
+    summary="Обновить несколько задач",
+)
+async def update_tasks_batch_async(
+    batch: Annotated[
+        schema_task.TaskBatchUpdate, request_examples.example_update_tasks
+    ],
+    session: AsyncSession = Depends(get_async_session),
+):
+    """
+    Apply the same partial update to many tasks, as `PATCH /tasks`.
+    """
+    return await task_routes.update_tasks_batch(batch, session)
+
+
+@router.patch(
+    "/tasks/{task_id}",
+    status_code=status.HTTP_200_OK,
+    response_model=schema_task.TaskRead,
+    summary="Обновить задачу по ID",
+)
+async def update_task_async(
+    task_id: int,
+    changes: Annotated[
+        schema_task.TaskUpdate, request_examples.example_update_task
+    ],
+    session: AsyncSession = Depends(get_async_session),
+):
+    """
+    Update the fields of a task present in the request body, as
+    `PATCH /tasks/{task_id}`.
+    """
+    return await task_routes.update_task_by_id(task_id, changes, session)
+
+
+@router.post(
+    "/tasks/{task_id}/complete",
+    status_code=status.HTTP_200_OK,
+    summary="Завершить задачу",
+)
+async def complete_task_async(
+    task_id: int,
+    current_user: Annotated[User, Depends(get_current_user)],
+    session: AsyncSession = Depends(get_async_session),
+):
+    """
+    Mark a task as completed and update productivity logs, as
+    `POST /tasks/{task_id}/complete`.
+    """
+    return await task_routes.complete_task(task_id, session, current_user)
+
+
+@router.delete(
+    "/tasks/{task_id}",
+    status_code=status.HTTP_200_OK,
+    response_model=dict,
+    summary="Удалить задачу по ID",
+)
+async def delete_task_async(
+    task_id: int, session: AsyncSession = Depends(get_async_session)
+):
+    """
+    Delete a task by its ID, as `DELETE /tasks/{task_id}`.
+    """
+    return await task_routes.delete_task_by_id(task_id, session)
 
 
-@router.get("/tasks-for-day", status_code=status.HTTP_200_OK)
+@router.get(
+    "/tasks-for-day",
+    status_code=status.HTTP_200_OK,
+    summary="Задачи на день с отметкой о выходном",
+)
 async def read_tasks_for_day(
     response: Response,
     session: AsyncSession = Depends(get_async_session),
-    due_date: date = date.today(),
+    due_date: Optional[date] = Query(
+        default=None, description="День; по умолчанию сегодня"
+    ),
 ):
     """
     Fetch tasks for a specific day and check if it's a day off.
+
+    `is_day_off` is null when the production calendar service is unavailable
+    and the date is not cached yet.
     """
+    # Not a default of the parameter: that would be the day of the start.
+    due_date = due_date or date.today()
     start = time.time()
 
     async def query_db(due_date_param):
-        statement = select(schema_task.Task).where(
+        statement = select_task_rows().where(
             schema_task.Task.due_date == due_date_param
         )
         result = await session.execute(statement)
-        return result.scalars().all()
+        return dump_tasks(result)
 
-    async with httpx.AsyncClient(timeout=httpx.Timeout(10.0, read=None)) as http_client:
-        res = await asyncio.gather(
-            query_db(due_date),
-            http_client.get(f"https://isdayoff.ru/{due_date}"),
-        )
+    tasks, is_day_off = await asyncio.gather(
+        query_db(due_date), day_off_service.is_day_off(due_date)
+    )
 
     elapsed_seconds = time.time() - start
     output = [
         {
             "due_date": due_date,
-            "is_day_off": res[1].text == "1",
-            "tasks": res[0],
+            "is_day_off": is_day_off,
+            "tasks": tasks,
         }
     ]
 
     response.headers["X-Completed-In"] = f"{elapsed_seconds:.3f} seconds"
-    return output
+    return json_response(orjson.dumps(output), response)
 
 
-results = {}
+@router.get(
+    "/tasks-calendar",
+    status_code=status.HTTP_200_OK,
+    summary="Задачи по дням периода с отметками о выходных",
+)
+async def read_tasks_calendar(
+    response: Response,
+    start: date = Query(description="Первый день периода"),
+    end: date = Query(description="Последний день периода"),
+    assignee: Optional[int] = Query(default=None, description="ID исполнителя"),
+    session: AsyncSession = Depends(get_async_session),
+):
+    """
+    Fetch tasks for every day of a period and check which days are days off.
 
+    Returns one item per day in the shape of `/tasks-for-day`. The tasks of
+    the whole period are read with one query and the day-off flags with one
+    batched lookup, so a month view costs one round trip per backend.
+    """
+    if end < start:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="The end of the period is before its start.",
+        )
+    if (end - start).days >= MAX_CALENDAR_DAYS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"The period is longer than {MAX_CALENDAR_DAYS} days.",
+        )
+    begin = time.time()
 
-async def async_job(job_id: str):
+    async def query_db():
+        statement = (
+            select_task_rows()
+            .where(schema_task.Task.due_date.between(start, end))
+            .order_by(schema_task.Task.due_date, schema_task.Task.id)
+        )
+        if assignee is not None:
+            statement = statement.where(schema_task.Task.assignee == assignee)
+        result = await session.execute(statement)
+        return dump_tasks(result)
+
+    tasks, days_off = await asyncio.gather(
+        query_db(), day_off_service.days_off(start, end)
+    )
+
+    tasks_by_day = defaultdict(list)
+    for task in tasks:
+        tasks_by_day[task["due_date"]].append(task)
+
+    elapsed_seconds = time.time() - begin
+    response.headers["X-Completed-In"] = f"{elapsed_seconds:.3f} seconds"
+    output = [
+        {
+            "due_date": day,
+            "is_day_off": is_day_off,
+            "tasks": tasks_by_day[day],
+        }
+        for day, is_day_off in days_off.items()
+    ]
+    return json_response(orjson.dumps(output), response)
+
+
+@job_handler("demo")
+async def async_job(job_id: str, seconds: float = 20):
     """
     Simulate a long-running asynchronous job.
     """
     start = datetime.now().strftime("%H:%M:%S")
-    results[job_id] = "pending"
-    await asyncio.sleep(20)
+    await asyncio.sleep(seconds)
     finish = datetime.now().strftime("%H:%M:%S")
-    results[job_id] = f"Job {job_id} started at {start} and finished at {finish}"
+    return f"Job {job_id} started at {start} and finished at {finish}"
 
 
-@router.post("/start-job", status_code=status.HTTP_202_ACCEPTED)
-async def start_job():
+@router.post(
+    "/start-job",
+    status_code=status.HTTP_202_ACCEPTED,
+    summary="Запустить демонстрационную фоновую задачу",
+)
+async def start_job(session: AsyncSession = Depends(get_async_session)):
     """
     Start a new asynchronous job.
-    """
-    job_id = shortuuid.uuid()
-
-    loop = asyncio.new_event_loop()
-    threading.Thread(
-        target=lambda: loop.run_until_complete(async_job(job_id))
-    ).start()
 
+    The job is stored in the database and run by the background worker of
+    any application process.
+    """
+    job_id = await enqueue(session, "demo")
+    await session.commit()
     return {"message": "Job started", "job_id": job_id}
 
 
-@router.get("/get-job-result/{job_id}", status_code=status.HTTP_200_OK)
-async def get_job_result(job_id: str):
+@router.get(
+    "/get-job-result/{job_id}",
+    status_code=status.HTTP_200_OK,
+    summary="Получить результат фоновой задачи",
+)
+async def get_job_result(
+    job_id: str, session: AsyncSession = Depends(get_async_session)
+):
     """
     Retrieve the result of a specific job.
     """
-    result = results.get(job_id)
-    if result is None:
+    job = await session.get(Job, job_id)
+    if job is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail=f"Job {job_id} does not exist",
         )
-    if result == "pending":
+    if job.status in ("pending", "running"):
         raise HTTPException(
             status_code=status.HTTP_202_ACCEPTED,
             detail=f"Job {job_id} is still running",
         )
-    return {"result": result}
+    if job.status == "failed":
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Job {job_id} failed: {job.error}",
+        )
+    return {"result": job.result}
@@ -2,12 +2,13 @@ from datetime import timedelta
 
 from fastapi import APIRouter, Depends, HTTPException, status
 from fastapi.security.oauth2 import OAuth2PasswordRequestForm
-from psycopg2.errors import UniqueViolation
+from asyncpg.exceptions import UniqueViolationError
 from sqlalchemy.exc import IntegrityError
-from sqlmodel import Session, select
+from sqlalchemy.ext.asyncio import AsyncSession
 
+from app import queries
 from app.config import settings
-from app.db import get_session
+from app.db import get_async_session
 from ..auth import auth_handler
 from ..schemas import task as schema_task
 
@@ -20,9 +21,9 @@ router = APIRouter(prefix="/auth", tags=["Безопасность"])
     response_model=int,
     summary="Добавить пользователя",
 )
-def create_user(
+async def create_user(
     user: schema_task.User,
-    session: Session = Depends(get_session),
+    session: AsyncSession = Depends(get_async_session),
 ):
     """
     Create a new user with hashed password.
@@ -30,15 +31,14 @@ def create_user(
     new_user = schema_task.User(
         name=user.name,
         email=user.email,
-        password=auth_handler.get_password_hash(user.password),
+        password=await auth_handler.get_password_hash(user.password),
     )
     try:
         session.add(new_user)
-        session.commit()
-        session.refresh(new_user)
+        await session.commit()
         return new_user.id
     except IntegrityError as exc:
-        assert isinstance(exc.orig, UniqueViolation)
+        assert isinstance(exc.orig.__cause__, UniqueViolationError)
         raise HTTPException(
             status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
             detail=f"User with email {user.email} already exists",
@@ -50,17 +50,17 @@ def create_user(
     status_code=status.HTTP_200_OK,
     summary="Войти в систему",
 )
-def user_login(
+async def user_login(
     login_attempt_data: OAuth2PasswordRequestForm = Depends(),
-    db_session: Session = Depends(get_session),
+    db_session: AsyncSession = Depends(get_async_session),
 ):
     """
     Authenticate a user and return an access token.
     """
-    statement = select(schema_task.User).where(
-        schema_task.User.email == login_attempt_data.username
+    result = await db_session.execute(
+        queries.user_by_email(login_attempt_data.username)
     )
-    existing_user = db_session.exec(statement).first()
+    existing_user = result.scalars().first()
 
     if not existing_user:
         raise HTTPException(
@@ -68,9 +68,13 @@ def user_login(
             detail=f"User {login_attempt_data.username} not found",
         )
 
-    if auth_handler.verify_password(
+    verified, new_hash = await auth_handler.verify_password(
         login_attempt_data.password, existing_user.password
-    ):
+    )
+    if verified:
+        if new_hash is not None:
+            existing_user.password = new_hash
+            await db_session.commit()
         access_token_expires = timedelta(
             minutes=settings.access_token_expire_minutes
         )
@@ -0,0 +1,18 @@
+from fastapi import APIRouter, Response, status
+from prometheus_client import CONTENT_TYPE_LATEST
+
+from app.metrics import render_metrics
+
+router = APIRouter(tags=["Мониторинг"])
+
+
+@router.get(
+    "/metrics",
+    status_code=status.HTTP_200_OK,
+    summary="Метрики в формате Prometheus",
+)
+async def read_metrics():
+    """
+    Report request and database metrics of all worker processes.
+    """
+    return Response(content=render_metrics(), media_type=CONTENT_TYPE_LATEST)
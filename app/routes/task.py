@@ -1,18 +1,47 @@
-from typing import Annotated, List
-from fastapi import APIRouter, Depends, HTTPException, status
+import csv
+import io
+import json
+from typing import Annotated, AsyncIterator, List, Literal, Optional
+import orjson
+from fastapi import (
+    APIRouter, Depends, HTTPException, Query, Request, Response, status,
+)
+from fastapi.responses import StreamingResponse
+from pydantic import TypeAdapter, ValidationError
+from sqlalchemy import func, insert, update
+from sqlalchemy.exc import DBAPIError, IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlmodel import Session, select
+from sqlmodel import select
 from datetime import datetime
 
-from app.db import get_async_session, get_session
-from app.schemas.task import ProductivityLog, Task, User
+from app import queries
+from app.config import settings
+from app.db import get_async_engine, get_async_session
+from app.schemas.task import ProductivityLog, Task, TaskStats, User
 from ..api_docs import request_examples
 from ..auth.auth_handler import get_current_user
-from ..logging.logs_handler import update_mean_complexity, get_or_create_log
+from ..http_cache import bump_versions, response_cache
+from ..jobs.worker import enqueue
+from ..logging.archive_handler import remove_tasks
+from ..logging.logs_handler import record_completion
+from ..logging.stats_handler import (
+    NO_PROJECT, STATE_FIELDS, apply_task_changes, task_state,
+)
+from ..pagination import (
+    PageCursor, PageLimit, cursor_id, filter_tasks, keyset, ranked_keyset,
+    split_page,
+)
+from ..responses import (
+    TASK_COLUMNS, dump_tasks, encode_models, encode_tasks, select_task_rows,
+)
 from ..schemas import task as schema_task
+from ..search import task_search
 
 router = APIRouter(prefix="/tasks", tags=["Управление задачами в БД"])
 
+PROJECT_LIST = TypeAdapter(List[schema_task.ProjectRead])
+PRODUCTIVITY_LOG = TypeAdapter(ProductivityLog)
+
 
 @router.post(
     "/new_project",
@@ -20,11 +49,11 @@ router = APIRouter(prefix="/tasks", tags=["Управление задачами
     response_model=schema_task.ProjectRead,
     summary="Добавить проект",
 )
-def create_project(
+async def create_project(
     project: Annotated[
         schema_task.ProjectCreate, request_examples.example_create_project
     ],
-    session: Session = Depends(get_session),
+    session: AsyncSession = Depends(get_async_session),
 ):
     """
     Create a new project.
@@ -34,8 +63,9 @@ def create_project(
         description=project.description,
     )
     session.add(new_project)
-    session.commit()
-    session.refresh(new_project)
+    await bump_versions(session, [("projects", 0)])
+    await session.commit()
+    await session.refresh(new_project)
     return new_project
 
 
@@ -45,17 +75,39 @@ def create_project(
     response_model=List[schema_task.ProjectRead],
     summary="Список всех проектов",
 )
-def get_all_projects(session: Session = Depends(get_session)):
+async def get_all_projects(
+    request: Request,
+    response: Response,
+    limit: int = PageLimit,
+    after: Optional[str] = PageCursor,
+    session: AsyncSession = Depends(get_async_session),
+):
     """
-    Retrieve all projects.
+    Retrieve all projects page by page.
+
+    The cursor of the next page is returned in the `X-Next-Cursor` header.
+    Supports conditional requests with `If-None-Match`.
     """
-    projects = session.exec(select(schema_task.Project)).all()
+    cached = await response_cache.lookup(
+        request, response, session, [("projects", 0)]
+    )
+    if cached is not None:
+        return cached
+    statement = keyset(
+        select(schema_task.Project), schema_task.Project.id, limit, after
+    )
+    result = await session.execute(statement)
+    projects, next_cursor = split_page(result.scalars().all(), limit)
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
     if not projects:
         raise HTTPException(
             status_code=status.HTTP_204_NO_CONTENT,
             detail="No projects found.",
         )
-    return projects
+    return response_cache.store(
+        request, response, encode_models(PROJECT_LIST, projects)
+    )
 
 
 @router.post(
@@ -64,19 +116,17 @@ def get_all_projects(session: Session = Depends(get_session)):
     response_model=schema_task.TaskRead,
     summary="Добавить задачу",
 )
-def create_task(
+async def create_task(
     task: Annotated[
         schema_task.TaskCreate, request_examples.example_create_task
     ],
-    session: Session = Depends(get_session),
+    session: AsyncSession = Depends(get_async_session),
 ):
     """
     Create a new task and assign it to a user.
     """
-    statement = select(schema_task.User).where(
-        schema_task.User.name == task.assignee
-    )
-    existing_user = session.exec(statement).first()
+    result = await session.execute(queries.user_by_name(task.assignee))
+    existing_user = result.scalars().first()
 
     if not existing_user:
         raise HTTPException(
@@ -91,34 +141,354 @@ def create_task(
         complexity=task.complexity,
     )
     session.add(new_task)
-    session.commit()
-    session.refresh(new_task)
+    await apply_task_changes(session, [(None, task_state(new_task))])
+    await session.commit()
+    await session.refresh(new_task)
     return new_task
 
 
+NDJSON_CONTENT_TYPES = ("application/x-ndjson", "application/jsonl")
+
+
+async def read_bulk_items(request: Request) -> list:
+    """
+    Read raw items of a bulk request.
+
+    A JSON array is decoded at once; an NDJSON body is read as a stream
+    and split into lines that are validated one by one later.
+    """
+    content_type = request.headers.get("content-type", "")
+    if content_type.split(";")[0].strip() in NDJSON_CONTENT_TYPES:
+        lines, tail = [], b""
+        async for chunk in request.stream():
+            *complete, tail = (tail + chunk).split(b"\n")
+            lines.extend(complete)
+        lines.append(tail)
+        return [line for line in lines if line.strip()]
+
+    try:
+        items = json.loads(await request.body())
+    except ValueError:
+        items = None
+    if not isinstance(items, list):
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail="Request body must be a JSON array or NDJSON.",
+        )
+    return items
+
+
+def describe_validation_error(exc: ValidationError) -> str:
+    """Render a validation error as one line."""
+    return "; ".join(
+        f"{'.'.join(map(str, error['loc'])) or 'item'}: {error['msg']}"
+        for error in exc.errors()
+    )
+
+
+@router.post(
+    "/bulk",
+    status_code=status.HTTP_200_OK,
+    response_model=schema_task.BulkTaskReport,
+    summary="Добавить несколько задач",
+    openapi_extra={
+        "requestBody": {
+            "required": True,
+            "content": {
+                "application/json": {
+                    "schema": {
+                        "type": "array",
+                        "items": {"$ref": "#/components/schemas/TaskCreate"},
+                    },
+                },
+                "application/x-ndjson": {
+                    "schema": {"type": "string"},
+                },
+            },
+        },
+    },
+)
+async def create_tasks_bulk(
+    request: Request,
+    batch_size: int = Query(
+        default=settings.bulk_batch_size,
+        ge=1,
+        le=10000,
+        description="Количество задач в одном INSERT и одной транзакции",
+    ),
+    session: AsyncSession = Depends(get_async_session),
+):
+    """
+    Create many tasks at once from a JSON array or an NDJSON stream.
+
+    Assignees and projects of all items are resolved with one query each.
+    Valid items are inserted with multi-row INSERTs, one transaction per
+    batch. Task IDs are drawn from the sequence beforehand, so they are
+    matched to the items without relying on the order of RETURNING rows.
+    The result of every item is reported by its position in the input.
+    """
+    results = {}
+    tasks = []
+    for index, raw in enumerate(await read_bulk_items(request)):
+        try:
+            if isinstance(raw, bytes):
+                task = schema_task.TaskCreate.model_validate_json(raw)
+            else:
+                task = schema_task.TaskCreate.model_validate(raw)
+        except ValidationError as exc:
+            results[index] = schema_task.BulkTaskResult(
+                index=index, error=describe_validation_error(exc)
+            )
+            continue
+        tasks.append((index, task))
+
+    assignees, projects = {}, set()
+    names = {task.assignee for _, task in tasks}
+    if names:
+        result = await session.execute(
+            select(User.name, func.min(User.id))
+            .where(User.name.in_(names))
+            .group_by(User.name)
+        )
+        assignees = dict(result.all())
+    project_ids = {task.project for _, task in tasks if task.project is not None}
+    if project_ids:
+        result = await session.execute(
+            select(schema_task.Project.id)
+            .where(schema_task.Project.id.in_(project_ids))
+        )
+        projects = set(result.scalars().all())
+
+    rows = []
+    for index, task in tasks:
+        if task.assignee not in assignees:
+            error = f"{task.assignee} not found"
+        elif task.project is not None and task.project not in projects:
+            error = f"Project with ID {task.project} not found."
+        else:
+            rows.append((index, {
+                "description": task.description,
+                "assignee": assignees[task.assignee],
+                "due_date": task.due_date,
+                "project": task.project,
+                "complexity": task.complexity,
+                "is_completed": False,
+            }))
+            continue
+        results[index] = schema_task.BulkTaskResult(index=index, error=error)
+
+    for start in range(0, len(rows), batch_size):
+        batch = rows[start:start + batch_size]
+        try:
+            result = await session.execute(
+                select(schema_task.task_id_seq.next_value())
+                .select_from(func.generate_series(1, len(batch)))
+            )
+            task_ids = result.scalars().all()
+            await session.execute(insert(Task), [
+                {**values, "id": task_id}
+                for (_, values), task_id in zip(batch, task_ids)
+            ])
+            await apply_task_changes(
+                session, [(None, values) for _, values in batch]
+            )
+            await session.commit()
+        except DBAPIError as exc:
+            await session.rollback()
+            for index, _ in batch:
+                results[index] = schema_task.BulkTaskResult(
+                    index=index,
+                    error=f"Batch rejected by the database: {exc.orig}",
+                )
+            continue
+        for (index, _), task_id in zip(batch, task_ids):
+            results[index] = schema_task.BulkTaskResult(index=index, id=task_id)
+
+    created = sum(1 for item in results.values() if item.id is not None)
+    return schema_task.BulkTaskReport(
+        created=created,
+        failed=len(results) - created,
+        results=[results[index] for index in sorted(results)],
+    )
+
+
+@router.get(
+    "",
+    status_code=status.HTTP_200_OK,
+    response_model=schema_task.TaskPage,
+    summary="Получить страницу задач с фильтрацией",
+)
+async def read_tasks(
+    filters: schema_task.TaskFilter = Depends(),
+    limit: int = PageLimit,
+    after: Optional[str] = PageCursor,
+    session: AsyncSession = Depends(get_async_session),
+):
+    """
+    Retrieve one page of tasks matching the given filters.
+
+    Pages are ordered by task ID, so fetching any page costs the same
+    regardless of how far the client has scrolled.
+    """
+    statement = keyset(
+        filter_tasks(select_task_rows(), filters),
+        schema_task.Task.id, limit, after,
+    )
+    result = await session.execute(statement)
+    tasks, next_cursor = split_page(result.all(), limit)
+    return Response(
+        content=orjson.dumps(
+            {"items": dump_tasks(tasks), "next_cursor": next_cursor}
+        ),
+        media_type="application/json",
+    )
+
+
+@router.get(
+    "/search",
+    status_code=status.HTTP_200_OK,
+    response_model=schema_task.TaskPage,
+    summary="Найти задачи по описанию",
+)
+async def search_tasks(
+    q: str = Query(
+        min_length=1,
+        max_length=300,
+        description=(
+            "Поисковый запрос. Поддерживаются фразы в кавычках, "
+            "OR и исключение слов через -"
+        ),
+    ),
+    filters: schema_task.TaskFilter = Depends(),
+    limit: int = PageLimit,
+    after: Optional[str] = PageCursor,
+    session: AsyncSession = Depends(get_async_session),
+):
+    """
+    Search tasks by description, best matches first.
+
+    Accepts the filters of the task list. Pages are ordered by rank and
+    task ID, and the cursor carries both, see ``app.search``.
+    """
+    matched, rank = await task_search.criteria(session, q)
+    statement = ranked_keyset(
+        filter_tasks(
+            select_task_rows().add_columns(rank.label("rank")), filters
+        ).where(matched),
+        rank, schema_task.Task.id, limit, after,
+    )
+    result = await session.execute(statement)
+    tasks, next_cursor = split_page(
+        result.all(), limit, key=lambda row: (row.rank, row.id)
+    )
+    return Response(
+        content=orjson.dumps(
+            {"items": dump_tasks(tasks), "next_cursor": next_cursor}
+        ),
+        media_type="application/json",
+    )
+
+
+EXPORT_COLUMNS = (
+    Task.id, Task.description, Task.assignee, Task.project,
+    Task.due_date, Task.is_completed, Task.complexity,
+)
+EXPORT_MEDIA_TYPES = {"ndjson": "application/x-ndjson", "csv": "text/csv"}
+
+
+async def stream_export(statement, export_format: str) -> AsyncIterator[str]:
+    """
+    Stream rows of a statement as NDJSON or CSV text, one chunk per
+    fetched batch.
+
+    The rows come from a server-side cursor on a connection owned by the
+    generator, so memory use does not depend on the number of rows and
+    the connection lives as long as the response is being sent.
+    """
+    names = [column.key for column in EXPORT_COLUMNS]
+    async with get_async_engine().connect() as conn:
+        result = await conn.stream(
+            statement.execution_options(yield_per=settings.export_chunk_size)
+        )
+        if export_format == "csv":
+            buffer = io.StringIO()
+            writer = csv.writer(buffer)
+            writer.writerow(names)
+            async for rows in result.partitions():
+                writer.writerows(rows)
+                yield buffer.getvalue()
+                buffer.seek(0)
+                buffer.truncate()
+        else:
+            async for rows in result.partitions():
+                yield "".join(
+                    json.dumps(dict(zip(names, row)), default=str) + "\n"
+                    for row in rows
+                )
+
+
+@router.get(
+    "/export",
+    status_code=status.HTTP_200_OK,
+    response_class=StreamingResponse,
+    summary="Выгрузить задачи в формате NDJSON или CSV",
+)
+async def export_tasks(
+    filters: schema_task.TaskFilter = Depends(),
+    export_format: Literal["ndjson", "csv"] = Query(
+        default="ndjson", alias="format", description="Формат выгрузки"
+    ),
+):
+    """
+    Export all tasks matching the given filters as a stream.
+    """
+    statement = filter_tasks(select(*EXPORT_COLUMNS), filters).order_by(Task.id)
+    return StreamingResponse(
+        stream_export(statement, export_format),
+        media_type=EXPORT_MEDIA_TYPES[export_format],
+        headers={
+            "Content-Disposition": f'attachment; filename="tasks.{export_format}"'
+        },
+    )
+
+
 @router.get(
     "/project/{project_id}/tasks",
     status_code=status.HTTP_200_OK,
     response_model=List[schema_task.TaskRead],
     summary="Получить все задачи, связанные с определенным проектом",
 )
-def read_tasks_by_project(
-    project_id: int, session: Session = Depends(get_session)
+async def read_tasks_by_project(
+    project_id: int,
+    request: Request,
+    response: Response,
+    limit: int = PageLimit,
+    after: Optional[str] = PageCursor,
+    session: AsyncSession = Depends(get_async_session),
 ):
     """
-    Retrieve all tasks associated with a specific project.
+    Retrieve tasks associated with a specific project page by page.
+
+    The cursor of the next page is returned in the `X-Next-Cursor` header.
+    Supports conditional requests with `If-None-Match`.
     """
-    tasks = session.exec(
-        select(schema_task.Task).where(
-            schema_task.Task.project == project_id
-        )
-    ).all()
+    cached = await response_cache.lookup(
+        request, response, session, [("project", project_id)]
+    )
+    if cached is not None:
+        return cached
+    result = await session.execute(
+        queries.tasks_by_project(project_id, limit, cursor_id(after))
+    )
+    tasks, next_cursor = split_page(result.all(), limit)
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
     if not tasks:
         raise HTTPException(
             status_code=status.HTTP_204_NO_CONTENT,
             detail=f"No tasks found for project ID {project_id}.",
         )
-    return tasks
+    return response_cache.store(request, response, encode_tasks(tasks))
 
 
 @router.get(
@@ -127,19 +497,36 @@ def read_tasks_by_project(
     response_model=List[schema_task.TaskRead],
     summary="Получить все задачи, которые не связаны с каким-либо проектом",
 )
-def read_tasks_without_project(session: Session = Depends(get_session)):
+async def read_tasks_without_project(
+    request: Request,
+    response: Response,
+    limit: int = PageLimit,
+    after: Optional[str] = PageCursor,
+    session: AsyncSession = Depends(get_async_session),
+):
     """
-    Retrieve all tasks that are not associated with any project.
+    Retrieve tasks that are not associated with any project page by page.
+
+    The cursor of the next page is returned in the `X-Next-Cursor` header.
+    Supports conditional requests with `If-None-Match`.
     """
-    tasks = session.exec(
-        select(schema_task.Task).where(schema_task.Task.project == None)
-    ).all()
+    cached = await response_cache.lookup(
+        request, response, session, [("project", NO_PROJECT)]
+    )
+    if cached is not None:
+        return cached
+    result = await session.execute(
+        queries.tasks_without_project(limit, cursor_id(after))
+    )
+    tasks, next_cursor = split_page(result.all(), limit)
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
     if not tasks:
         raise HTTPException(
             status_code=status.HTTP_204_NO_CONTENT,
             detail="No tasks found without a project.",
         )
-    return tasks
+    return response_cache.store(request, response, encode_tasks(tasks))
 
 
 @router.get(
@@ -148,23 +535,187 @@ def read_tasks_without_project(session: Session = Depends(get_session)):
     response_model=List[schema_task.TaskRead],
     summary="Получить все задачи, связанные с определенным пользователем",
 )
-def read_tasks_by_user(
-    user_id: int, session: Session = Depends(get_session)
+async def read_tasks_by_user(
+    user_id: int,
+    request: Request,
+    response: Response,
+    limit: int = PageLimit,
+    after: Optional[str] = PageCursor,
+    session: AsyncSession = Depends(get_async_session),
 ):
     """
-    Retrieve all tasks assigned to a specific user.
+    Retrieve tasks assigned to a specific user page by page.
+
+    The cursor of the next page is returned in the `X-Next-Cursor` header.
+    Supports conditional requests with `If-None-Match`.
     """
-    tasks = session.exec(
-        select(schema_task.Task).where(
-            schema_task.Task.assignee == user_id
-        )
-    ).all()
+    cached = await response_cache.lookup(
+        request, response, session, [("user", user_id)]
+    )
+    if cached is not None:
+        return cached
+    result = await session.execute(
+        queries.tasks_by_user(user_id, limit, cursor_id(after))
+    )
+    tasks, next_cursor = split_page(result.all(), limit)
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
     if not tasks:
         raise HTTPException(
             status_code=status.HTTP_204_NO_CONTENT,
             detail=f"No tasks found for user ID {user_id}.",
         )
-    return tasks
+    return response_cache.store(request, response, encode_tasks(tasks))
+
+
+async def read_task_stats(
+    session: AsyncSession, scope: str, key: int
+) -> TaskStats:
+    """Read one counters row; a missing row means no tasks yet."""
+    stats = await session.get(TaskStats, (scope, key))
+    return stats or TaskStats(scope=scope, key=key)
+
+
+@router.get(
+    "/stats/project/{project_id}",
+    status_code=status.HTTP_200_OK,
+    response_model=TaskStats,
+    summary="Получить сводку по задачам проекта",
+)
+async def get_project_stats(
+    project_id: int, session: AsyncSession = Depends(get_async_session)
+):
+    """
+    Retrieve open and completed task counts and total complexity of
+    a project from the precomputed counters.
+    """
+    if await session.get(schema_task.Project, project_id) is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Project with ID {project_id} not found.",
+        )
+    return await read_task_stats(session, "project", project_id)
+
+
+@router.get(
+    "/stats/no-project",
+    status_code=status.HTTP_200_OK,
+    response_model=TaskStats,
+    summary="Получить сводку по задачам без проекта",
+)
+async def get_no_project_stats(
+    session: AsyncSession = Depends(get_async_session),
+):
+    """
+    Retrieve the precomputed counters of tasks without a project.
+    """
+    return await read_task_stats(session, "project", NO_PROJECT)
+
+
+@router.get(
+    "/stats/user/{user_id}",
+    status_code=status.HTTP_200_OK,
+    response_model=TaskStats,
+    summary="Получить сводку по задачам пользователя",
+)
+async def get_user_stats(
+    user_id: int, session: AsyncSession = Depends(get_async_session)
+):
+    """
+    Retrieve the precomputed counters of tasks assigned to a user.
+    """
+    if await session.get(User, user_id) is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"User with ID {user_id} not found.",
+        )
+    return await read_task_stats(session, "user", user_id)
+
+
+async def update_tasks(
+    session: AsyncSession, ids: List[int], changes: schema_task.TaskUpdate
+) -> list:
+    """
+    Apply the fields set in ``changes`` to tasks with one UPDATE ... RETURNING.
+
+    The old values that the task counters depend on come from a CTE of
+    the same statement, which locks the rows in ID order so concurrent
+    batches cannot deadlock. The caller commits.
+
+    Returns:
+        list: Rows of the updated tasks; their first columns are
+        ``TASK_COLUMNS``.
+    """
+    values = changes.model_dump(exclude_unset=True)
+    if not values:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail="No fields to update.",
+        )
+    if values.get("is_completed"):
+        values["completed_at"] = func.coalesce(
+            Task.completed_at, func.localtimestamp()
+        )
+    elif "is_completed" in values:
+        values["completed_at"] = None
+    old = (
+        select(Task.id, *(getattr(Task, name) for name in STATE_FIELDS))
+        .where(Task.id.in_(ids))
+        .order_by(Task.id)
+        .with_for_update()
+        .cte("old")
+    )
+    statement = (
+        update(Task)
+        .where(Task.id == old.c.id)
+        .values(**values)
+        .returning(
+            *TASK_COLUMNS,
+            *(old.c[name].label(f"old_{name}") for name in STATE_FIELDS),
+        )
+        .execution_options(synchronize_session=False)
+    )
+    try:
+        result = await session.execute(statement)
+    except IntegrityError:
+        await session.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Assignee or project not found.",
+        )
+    rows = result.all()
+    await apply_task_changes(session, [
+        (
+            {name: row._mapping[f"old_{name}"] for name in STATE_FIELDS},
+            {name: row._mapping[name] for name in STATE_FIELDS},
+        )
+        for row in rows
+    ])
+    return rows
+
+
+@router.patch(
+    "",
+    status_code=status.HTTP_200_OK,
+    response_model=schema_task.TaskBatchUpdateResult,
+    summary="Обновить несколько задач",
+)
+async def update_tasks_batch(
+    batch: Annotated[
+        schema_task.TaskBatchUpdate, request_examples.example_update_tasks
+    ],
+    session: AsyncSession = Depends(get_async_session),
+):
+    """
+    Apply the same partial update to many tasks, e.g. to reassign or close
+    them, with one statement.
+    """
+    rows = await update_tasks(session, batch.ids, batch.changes)
+    await session.commit()
+    updated = sorted(row.id for row in rows)
+    return schema_task.TaskBatchUpdateResult(
+        updated=updated, missing=sorted(set(batch.ids) - set(updated))
+    )
 
 
 @router.patch(
@@ -173,33 +724,27 @@ def read_tasks_by_user(
     response_model=schema_task.TaskRead,
     summary="Обновить задачу по ID",
 )
-def update_task_by_id(
+async def update_task_by_id(
     task_id: int,
-    data_for_update: dict,
-    session: Session = Depends(get_session),
+    changes: Annotated[
+        schema_task.TaskUpdate, request_examples.example_update_task
+    ],
+    session: AsyncSession = Depends(get_async_session),
 ):
     """
     Update a task by its ID.
-    """
-    statement = select(schema_task.Task).where(
-        schema_task.Task.id == task_id
-    )
-    task = session.exec(statement).first()
 
-    if not task:
+    Only the fields present in the request body are changed; an explicit
+    `null` clears `project` or `due_date`.
+    """
+    rows = await update_tasks(session, [task_id], changes)
+    if not rows:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail=f"Task with ID {task_id} not found.",
         )
-
-    for key, value in data_for_update.items():
-        if hasattr(task, key):
-            setattr(task, key, value)
-
-    session.add(task)
-    session.commit()
-    session.refresh(task)
-    return task
+    await session.commit()
+    return dump_tasks(rows)[0]
 
 
 @router.post(
@@ -214,23 +759,33 @@ async def complete_task(
 ):
     """
     Mark a task as completed and update productivity logs.
+
+    The task and the log are updated by a single statement; the task is
+    looked up separately only to tell why nothing was updated.
+    Task counters are updated in the same transaction.
     """
-    task = await session.get(Task, task_id)
-    if not task:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail=f"Task with ID {task_id} not found.",
-        )
-    if task.is_completed:
+    log = await record_completion(session, task_id, current_user.id)
+    if log is None:
+        task_exists = await session.scalar(queries.task_id_by_id(task_id))
+        if task_exists is None:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail=f"Task with ID {task_id} not found.",
+            )
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail=f"Task {task_id} is already completed.",
         )
-    task.is_completed = True
-
-    log = await get_or_create_log(session, current_user.id)
-    log = await update_mean_complexity(log, task.complexity)
-
+    completed = {
+        "assignee": log.assignee,
+        "project": log.project,
+        "complexity": log.complexity,
+    }
+    await apply_task_changes(session, [(
+        {**completed, "is_completed": False},
+        {**completed, "is_completed": True},
+    )])
+    await bump_versions(session, [("log", current_user.id)])
     await session.commit()
 
     month = datetime.now().strftime("%B")
@@ -250,19 +805,98 @@ async def complete_task(
 )
 async def get_productivity_log(
     user_id: int,
+    request: Request,
+    response: Response,
     session: AsyncSession = Depends(get_async_session)
 ):
     """
     Retrieve the productivity log for a specific user.
+
+    Supports conditional requests with `If-None-Match`.
     """
-    log = await session.get(ProductivityLog, user_id)
+    cached = await response_cache.lookup(
+        request, response, session, [("log", user_id)]
+    )
+    if cached is not None:
+        return cached
+    result = await session.execute(queries.log_by_user_id(user_id))
+    log = result.scalars().first()
     if not log:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail=f"Productivity log for user ID {user_id} not found.",
         )
 
-    return log
+    return response_cache.store(
+        request, response, encode_models(PRODUCTIVITY_LOG, log)
+    )
+
+
+@router.post(
+    "/archive",
+    status_code=status.HTTP_202_ACCEPTED,
+    summary="Перенести завершённые задачи в архив",
+)
+async def archive_tasks(
+    older_than_days: int = Query(
+        default=settings.archive_after_days,
+        ge=0,
+        description="Архивировать задачи, завершённые раньше указанного числа дней назад",
+    ),
+    chunk_size: int = Query(
+        default=settings.archive_chunk_size,
+        ge=1,
+        le=10000,
+        description="Количество задач, переносимых в одной транзакции",
+    ),
+    session: AsyncSession = Depends(get_async_session),
+):
+    """
+    Start moving old completed tasks to the archive in the background.
+
+    The result is available from `/v2/async/get-job-result/{job_id}`.
+    """
+    job_id = await enqueue(
+        session, "archive-tasks",
+        {"older_than_days": older_than_days, "chunk_size": chunk_size},
+    )
+    await session.commit()
+    return {"message": "Archiving started", "job_id": job_id}
+
+
+@router.delete(
+    "",
+    status_code=status.HTTP_200_OK,
+    summary="Удалить задачи по фильтру",
+)
+async def delete_tasks(
+    filters: schema_task.TaskFilter = Depends(),
+    chunk_size: int = Query(
+        default=settings.archive_chunk_size,
+        ge=1,
+        le=10000,
+        description="Количество задач, удаляемых в одной транзакции",
+    ),
+    session: AsyncSession = Depends(get_async_session),
+):
+    """
+    Delete all tasks matching the given filters.
+
+    Tasks are deleted in chunks, one transaction each, so a large delete
+    does not hold locks for long. At least one filter is required.
+    """
+    if not filters.model_dump(exclude_defaults=True):
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail="At least one filter is required.",
+        )
+    chosen = (
+        filter_tasks(select(Task.id), filters)
+        .order_by(Task.id)
+        .with_for_update()
+    )
+    deleted = await remove_tasks(session, chosen, chunk_size, archive=False)
+    return {"deleted": deleted}
 
 
 @router.delete(
@@ -271,16 +905,17 @@ async def get_productivity_log(
     response_model=dict,
     summary="Удалить задачу по ID.",
 )
-def delete_task_by_id(
-    task_id: int, session: Session = Depends(get_session)
+async def delete_task_by_id(
+    task_id: int, session: AsyncSession = Depends(get_async_session)
 ):
     """
-    Delete a task by its ID.
+    Delete a task by its ID with one DELETE ... RETURNING.
     """
-    statement = select(schema_task.Task).where(
-        schema_task.Task.id == task_id
+    result = await session.execute(
+        queries.delete_task(task_id),
+        execution_options={"synchronize_session": False},
     )
-    task = session.exec(statement).first()
+    task = result.first()
 
     if not task:
         raise HTTPException(
@@ -288,6 +923,7 @@ def delete_task_by_id(
             detail=f"Task with ID {task_id} not found.",
         )
 
-    session.delete(task)
-    session.commit()
+    task = dump_tasks([task])[0]
+    await apply_task_changes(session, [(task, None)])
+    await session.commit()
     return {"deleted task": task}
@@ -1,13 +1,19 @@
+import os
 from typing import Annotated
 
-from fastapi import APIRouter, Depends, status
+from fastapi import APIRouter, Depends, HTTPException, Path, status
 from fastapi.security import OAuth2PasswordBearer
 from sqlalchemy import text
-from sqlmodel import SQLModel, Session, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlmodel import SQLModel, select
 
-from app.db import engine, get_session
+from app.calendar.day_off import DayOffUnavailable, day_off_service
+from app.db import engines, get_async_engine, get_async_session, pool_stats
 from app.schemas.task import User
 from ..auth.auth_handler import get_current_user
+from ..auth.user_cache import user_cache
+from ..http_cache import response_cache
+from ..logging.stats_handler import rebuild_task_stats
 
 router = APIRouter(prefix="/utils", tags=["Вспомогательные инструменты"])
 
@@ -17,12 +23,101 @@ router = APIRouter(prefix="/utils", tags=["Вспомогательные инс
     status_code=status.HTTP_200_OK,
     summary="Тест подключения к базе данных",
 )
-def test_database(session: Session = Depends(get_session)):
+async def test_database(session: AsyncSession = Depends(get_async_session)):
     """
     Test database connection by executing a simple query.
     """
-    result = session.exec(select(text("'Hello world'"))).all()
-    return result
+    result = await session.execute(select(text("'Hello world'")))
+    return result.scalars().all()
+
+
+@router.get(
+    "/pool-stats",
+    status_code=status.HTTP_200_OK,
+    summary="Состояние пулов соединений с базой данных",
+)
+async def read_pool_stats():
+    """
+    Report checked-out, idle and overflow connections of both engines
+    in the worker process that served the request; ``null`` for an engine
+    the worker has not created yet, which this does not create either.
+    """
+    stats = {"worker_pid": os.getpid(), "sync": None, "async": None}
+    for name, db_engine in engines.items():
+        stats[name] = pool_stats(getattr(db_engine, "sync_engine", db_engine))
+    return stats
+
+
+@router.get(
+    "/user-cache-stats",
+    status_code=status.HTTP_200_OK,
+    summary="Статистика кэша пользователей",
+)
+async def read_user_cache_stats():
+    """
+    Report hit and miss counters of the authenticated user cache
+    in the worker process that served the request.
+    """
+    return {"worker_pid": os.getpid(), **user_cache.stats()}
+
+
+@router.get(
+    "/http-cache-stats",
+    status_code=status.HTTP_200_OK,
+    summary="Статистика кэша ответов",
+)
+async def read_http_cache_stats():
+    """
+    Report conditional GET and response cache counters
+    in the worker process that served the request.
+    """
+    return {"worker_pid": os.getpid(), **response_cache.stats()}
+
+
+@router.get(
+    "/day-off-stats",
+    status_code=status.HTTP_200_OK,
+    summary="Статистика кэша производственного календаря",
+)
+async def read_day_off_stats():
+    """
+    Report cache, upstream and circuit breaker state of the day-off lookups
+    in the worker process that served the request.
+    """
+    return {"worker_pid": os.getpid(), **day_off_service.stats()}
+
+
+@router.post(
+    "/prefill-day-off/{year}",
+    status_code=status.HTTP_200_OK,
+    summary="Загрузить производственный календарь на год",
+)
+async def prefill_day_off(year: int = Path(ge=2000, le=2100)):
+    """
+    Load the day-off flags of a whole year with one upstream call.
+    """
+    try:
+        days = await day_off_service.prefill(year)
+    except DayOffUnavailable as exc:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=f"The calendar service is unavailable: {exc}",
+        )
+    return {"year": year, "days": days}
+
+
+@router.post(
+    "/rebuild-task-stats",
+    status_code=status.HTTP_200_OK,
+    summary="Пересчитать сводки по задачам",
+)
+async def rebuild_stats(session: AsyncSession = Depends(get_async_session)):
+    """
+    Recompute the per-project and per-user task counters from scratch.
+    """
+    rows = await rebuild_task_stats(session)
+    await session.commit()
+    return {"rows": rows}
 
 
 @router.get(
@@ -30,11 +125,12 @@ def test_database(session: Session = Depends(get_session)):
     status_code=status.HTTP_200_OK,
     summary="Создать таблицы базы данных",
 )
-def create_database_tables():
+async def create_database_tables():
     """
     Create all database tables defined in the SQLModel metadata.
     """
-    SQLModel.metadata.create_all(engine)
+    async with get_async_engine().begin() as conn:
+        await conn.run_sync(SQLModel.metadata.create_all)
     return {"message": "Tables created"}
 
 
@@ -45,7 +141,7 @@ oauth2_scheme = OAuth2PasswordBearer(tokenUrl="auth/login")
     "/test-auth",
     summary="Посмотреть токен",
 )
-def show_access_token(token: str = Depends(oauth2_scheme)):
+async def show_access_token(token: str = Depends(oauth2_scheme)):
     """
     Display the access token for the current user.
     """
@@ -57,7 +153,7 @@ def show_access_token(token: str = Depends(oauth2_scheme)):
     response_model=int,
     summary="Получить ID вошедшего пользователя",
 )
-def read_users_me(
+async def read_users_me(
     current_user: Annotated[User, Depends(get_current_user)],
 ):
     """
@@ -0,0 +1,19 @@
+from sqlalchemy import BigInteger, Column, Sequence
+from sqlmodel import SQLModel, Field as SQLField
+
+resource_version_seq = Sequence(
+    "resource_version_seq", metadata=SQLModel.metadata
+)
+
+
+class ResourceVersion(SQLModel, table=True):
+    """
+    Version of a cacheable resource, changed by every write to it.
+
+    Versions are taken from one sequence, so a version is never reused,
+    not even after the row is deleted and created again.
+    """
+    __tablename__ = "resource_version"
+    resource: str = SQLField(primary_key=True, max_length=16)
+    key: int = SQLField(primary_key=True)
+    version: int = SQLField(sa_column=Column(BigInteger, nullable=False))
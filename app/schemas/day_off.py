@@ -0,0 +1,12 @@
+from datetime import date, datetime
+
+from sqlmodel import SQLModel, Field as SQLField
+
+
+class DayOff(SQLModel, table=True):
+    """
+    Cached answer of the production calendar service for one date.
+    """
+    day: date = SQLField(primary_key=True)
+    is_day_off: bool
+    fetched_at: datetime = SQLField(default_factory=datetime.now)
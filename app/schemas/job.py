@@ -0,0 +1,40 @@
+from datetime import datetime
+from typing import Any, Optional
+
+from sqlalchemy import Column, Index, text
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlmodel import SQLModel, Field as SQLField
+
+
+class Job(SQLModel, table=True):
+    """
+    Background job model for the database.
+
+    A job is ``pending`` until a worker claims it, ``running`` while the
+    worker holds its lease (``locked_until``), and ends up ``done`` or
+    ``failed``. A running job whose lease expired is claimed again if it
+    has attempts left, and fails otherwise.
+    """
+    __table_args__ = (
+        Index(
+            "ix_job_claimable", "run_after",
+            postgresql_where=text("status IN ('pending', 'running')"),
+        ),
+    )
+    id: str = SQLField(primary_key=True, max_length=32)
+    kind: str = SQLField(max_length=100)
+    payload: dict = SQLField(
+        default_factory=dict, sa_column=Column(JSONB, nullable=False)
+    )
+    status: str = SQLField(default="pending", max_length=16)
+    result: Optional[Any] = SQLField(
+        default=None, sa_column=Column(JSONB, nullable=True)
+    )
+    error: Optional[str] = SQLField(default=None)
+    attempts: int = SQLField(default=0)
+    max_attempts: int = SQLField(default=3)
+    timeout: float = SQLField(default=300.0)
+    run_after: datetime = SQLField(default_factory=datetime.now)
+    locked_until: Optional[datetime] = SQLField(default=None)
+    created_at: datetime = SQLField(default_factory=datetime.now)
+    finished_at: Optional[datetime] = SQLField(default=None)
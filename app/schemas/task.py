@@ -1,9 +1,14 @@
-from datetime import date, datetime, timedelta
-from typing import Optional, Annotated
+from datetime import date, datetime
+from typing import Annotated, List, Optional
 
-from pydantic import BaseModel, EmailStr, Field
+from pydantic import (
+    BaseModel, ConfigDict, EmailStr, Field, field_validator, model_validator,
+)
 from pydantic_settings import SettingsConfigDict
-from sqlalchemy import UniqueConstraint
+from sqlalchemy import (
+    DDL, Column, Computed, Index, Sequence, UniqueConstraint, event, text,
+)
+from sqlalchemy.dialects.postgresql import TSVECTOR
 from sqlmodel import SQLModel, Field as SQLField
 
 
@@ -22,6 +27,17 @@ class ProjectCreate(BaseModel):
     )
 
 
+def not_in_past(value: Optional[date]) -> Optional[date]:
+    """
+    Reject a due date earlier than today. Checked on every validation
+    rather than with a bound fixed at import, which a long-running worker
+    would keep past midnight.
+    """
+    if value is not None and value < date.today():
+        raise ValueError("due_date cannot be earlier than today")
+    return value
+
+
 class TaskCreate(BaseModel):
     """
     Schema for creating a new task.
@@ -36,7 +52,6 @@ class TaskCreate(BaseModel):
             "Крайний срок исполнения задачи. "
             "Не допускаются даты, более ранние, чем сегодняшняя."
         ),
-        gt=date.today() - timedelta(days=1),
         default=None,
     )
     project: Optional[int] = Field(
@@ -50,6 +65,8 @@ class TaskCreate(BaseModel):
         default=1,
     )
 
+    check_due_date = field_validator("due_date")(not_in_past)
+
 
 class ProjectRead(ProjectCreate):
     """
@@ -58,18 +75,172 @@ class ProjectRead(ProjectCreate):
     id: int
 
 
-class TaskRead(TaskCreate):
+class TaskRead(BaseModel):
     """
     Schema for reading task details.
+
+    Read-side only: output rows are not checked against the input rules
+    of ``TaskCreate``, and the assignee is the user ID stored in the task.
     """
+    model_config = ConfigDict(from_attributes=True)
+
     id: int
+    description: str
+    assignee: int = Field(description="ID исполнителя")
+    due_date: Optional[date] = None
+    project: Optional[int] = None
+    is_completed: bool = False
+    complexity: int
+
+
+class TaskUpdate(BaseModel):
+    """
+    Schema for a partial task update; only the fields sent are changed.
+    """
+    description: Optional[str] = Field(
+        description="Описание задачи",
+        max_length=300,
+        default=None,
+    )
+    assignee: Optional[int] = Field(
+        description="ID исполнителя",
+        default=None,
+    )
+    due_date: Optional[date] = Field(
+        description=(
+            "Крайний срок исполнения задачи. "
+            "Не допускаются даты, более ранние, чем сегодняшняя."
+        ),
+        default=None,
+    )
+    project: Optional[int] = Field(
+        description="ID проекта, к которому относится задача",
+        default=None,
+    )
+    is_completed: Optional[bool] = Field(
+        description="Статус выполнения задачи",
+        default=None,
+    )
+    complexity: Optional[int] = Field(
+        description="Сложность задачи от 1 до 5",
+        ge=1,
+        le=5,
+        default=None,
+    )
+
+    check_due_date = field_validator("due_date")(not_in_past)
+
+    @model_validator(mode="after")
+    def check_required(self):
+        """Reject nulls in the fields that cannot be empty."""
+        for name in ("description", "assignee", "is_completed", "complexity"):
+            if name in self.model_fields_set and getattr(self, name) is None:
+                raise ValueError(f"{name} cannot be null")
+        return self
+
+
+class TaskBatchUpdate(BaseModel):
+    """
+    Schema for applying one partial update to many tasks.
+    """
+    ids: List[int] = Field(
+        description="ID задач",
+        min_length=1,
+        max_length=10000,
+    )
+    changes: TaskUpdate
+
+
+class TaskBatchUpdateResult(BaseModel):
+    """
+    Schema for the response of a batch task update.
+    """
+    updated: List[int] = Field(description="ID обновлённых задач")
+    missing: List[int] = Field(description="ID задач, которые не найдены")
+
+
+class TaskFilter(BaseModel):
+    """
+    Query parameters for filtering task lists.
+    """
+    assignee: Optional[int] = Field(
+        description="ID исполнителя",
+        default=None,
+    )
+    project: Optional[int] = Field(
+        description="ID проекта",
+        default=None,
+    )
+    no_project: bool = Field(
+        description="Только задачи без проекта",
+        default=False,
+    )
+    is_completed: Optional[bool] = Field(
+        description="Статус выполнения задачи",
+        default=None,
+    )
+    due_from: Optional[date] = Field(
+        description="Крайний срок не раньше указанной даты",
+        default=None,
+    )
+    due_to: Optional[date] = Field(
+        description="Крайний срок не позже указанной даты",
+        default=None,
+    )
+    complexity: Optional[int] = Field(
+        description="Сложность задачи от 1 до 5",
+        ge=1,
+        le=5,
+        default=None,
+    )
+
+
+class TaskPage(BaseModel):
+    """
+    Schema for one page of a task list.
+    """
+    items: List[TaskRead]
+    next_cursor: Optional[str] = Field(
+        description=(
+            "Курсор следующей страницы. "
+            "Отсутствует, если текущая страница последняя."
+        ),
+        default=None,
+    )
+
+
+class BulkTaskResult(BaseModel):
+    """
+    Schema for the outcome of one item of a bulk task creation.
+    """
+    index: int = Field(description="Номер элемента во входных данных")
+    id: Optional[int] = Field(
+        description="ID созданной задачи",
+        default=None,
+    )
+    error: Optional[str] = Field(
+        description="Причина, по которой задача не создана",
+        default=None,
+    )
+
+
+class BulkTaskReport(BaseModel):
+    """
+    Schema for the response of a bulk task creation.
+    """
+    created: int
+    failed: int
+    results: List[BulkTaskResult]
 
 
 class User(SQLModel, table=True):
     """
     User model for the database.
     """
-    __table_args__ = (UniqueConstraint("email"),)
+    __table_args__ = (
+        UniqueConstraint("email"),
+        Index("ix_user_name", "name"),
+    )
     id: int = SQLField(default=None, nullable=False, primary_key=True)
     email: str = SQLField(nullable=True, unique_items=True)
     password: Optional[str]
@@ -110,17 +281,45 @@ class Project(SQLModel, ProjectRead, table=True):
     id: int = SQLField(nullable=False, primary_key=True)
 
 
-class Task(SQLModel, TaskRead, table=True):
+task_id_seq = Sequence("task_id_seq", metadata=SQLModel.metadata)
+
+
+class Task(SQLModel, TaskCreate, table=True):
     """
     Task model for the database.
+
+    The table is partitioned by month of ``due_date``; tasks without a due
+    date, and those beyond the last monthly partition, are kept in
+    ``task_default``. A primary key of a partitioned table has to include
+    the partition key, so ``id`` is the primary key of the mapping only:
+    it is unique because it is drawn from ``task_id_seq``, and indexed.
     """
-    id: int = SQLField(default=None, nullable=False, primary_key=True)
+    __table_args__ = (
+        Index("ix_task_id", "id"),
+        Index("ix_task_assignee_id", "assignee", "id"),
+        Index("ix_task_project_id", "project", "id"),
+        Index(
+            "ix_task_no_project_id", "id",
+            postgresql_where=text("project IS NULL"),
+        ),
+        Index("ix_task_due_date", "due_date"),
+        Index(
+            "ix_task_completed_at", "completed_at",
+            postgresql_where=text("is_completed"),
+        ),
+        {"postgresql_partition_by": "RANGE (due_date)"},
+    )
+    __mapper_args__ = {"primary_key": ["id"], "eager_defaults": True}
+    id: int = SQLField(
+        default=None,
+        nullable=False,
+        sa_column_kwargs={"server_default": task_id_seq.next_value()},
+    )
     due_date: Optional[date] = SQLField(
         description=(
             "Крайний срок исполнения задачи. "
             "Не допускаются даты, более ранние, чем сегодняшняя."
         ),
-        gt=date.today() - timedelta(days=1),
         default=None,
     )
     assignee: int = SQLField(foreign_key="user.id")
@@ -134,12 +333,101 @@ class Task(SQLModel, TaskRead, table=True):
         le=5,
         default=1,
     )
+    completed_at: Optional[datetime] = SQLField(default=None)
+
+
+# Full-text search document of the description, see ``app.search``. The
+# column is not mapped, so the ORM never loads it. Where the pg_trgm
+# extension is available, migration e94cabb23c80 also creates the trigram
+# index ix_task_description_trgm for substring and fuzzy matching.
+Task.__table__.append_column(Column(
+    "search_vector",
+    TSVECTOR,
+    Computed("to_tsvector('simple', description)", persisted=True),
+))
+Index(
+    "ix_task_search_vector",
+    Task.__table__.c.search_vector,
+    postgresql_using="gin",
+)
+
+# Creates the missing monthly partitions of the task table between two
+# dates. Rows of a new month that are already in the default partition are
+# moved to the new partition, which is then attached. Kept in step with the
+# function of migration e94cabb23c80.
+CREATE_TASK_PARTITIONS = DDL("""
+CREATE OR REPLACE FUNCTION create_task_partitions(first_day date, last_day date)
+RETURNS integer
+LANGUAGE plpgsql AS $$
+DECLARE
+    month date := date_trunc('month', first_day)::date;
+    bound date;
+    part text;
+    cols text;
+    created integer := 0;
+BEGIN
+    -- Concurrent callers, e.g. workers starting together, take turns.
+    PERFORM pg_advisory_xact_lock(hashtext('create_task_partitions'));
+    -- Generated columns are computed by the partition, not copied.
+    SELECT string_agg(quote_ident(attname), ', ' ORDER BY attnum) INTO cols
+    FROM pg_attribute
+    WHERE attrelid = 'task'::regclass AND attnum > 0
+        AND NOT attisdropped AND attgenerated = '';
+    WHILE month <= last_day LOOP
+        bound := (month + interval '1 month')::date;
+        part := 'task_p' || to_char(month, 'YYYYMM');
+        IF to_regclass(part) IS NULL THEN
+            EXECUTE 'CREATE TABLE ' || quote_ident(part)
+                || ' (LIKE task INCLUDING DEFAULTS INCLUDING GENERATED)';
+            EXECUTE 'WITH moved AS (DELETE FROM task_default'
+                || ' WHERE due_date >= ' || quote_literal(month)
+                || ' AND due_date < ' || quote_literal(bound)
+                || ' RETURNING ' || cols || ') INSERT INTO '
+                || quote_ident(part) || ' (' || cols || ') SELECT '
+                || cols || ' FROM moved';
+            EXECUTE 'ALTER TABLE task ATTACH PARTITION ' || quote_ident(part)
+                || ' FOR VALUES FROM (' || quote_literal(month)
+                || ') TO (' || quote_literal(bound) || ')';
+            created := created + 1;
+        END IF;
+        month := bound;
+    END LOOP;
+    RETURN created;
+END
+$$
+""")
+
+event.listen(Task.__table__, "after_create", CREATE_TASK_PARTITIONS)
+event.listen(
+    Task.__table__,
+    "after_create",
+    DDL("CREATE TABLE task_default PARTITION OF task DEFAULT"),
+)
+
+
+class TaskArchive(SQLModel, table=True):
+    """
+    Completed task moved out of the task table, see
+    ``app.logging.archive_handler``.
+    """
+    __tablename__ = "task_archive"
+    id: int = SQLField(primary_key=True)
+    description: str
+    assignee: int
+    due_date: Optional[date] = None
+    project: Optional[int] = None
+    complexity: int
+    completed_at: Optional[datetime] = None
+    archived_at: datetime = SQLField(default_factory=datetime.now)
 
 
 class ProductivityLog(SQLModel, table=True):
     """
     Productivity log model for the database.
     """
+    __table_args__ = (
+        Index("ix_productivitylog_user_id", "user_id", unique=True),
+    )
     id: int = SQLField(default=None, primary_key=True)
     user_id: int = SQLField(foreign_key="user.id")
     log_date: date = SQLField(default_factory=date.today)
@@ -155,3 +443,19 @@ class ProductivityLog(SQLModel, table=True):
     last_activity: datetime = SQLField(
         default_factory=lambda: datetime.now()
     )
+
+
+class TaskStats(SQLModel, table=True):
+    """
+    Task counters of one project or one assignee, kept up to date by the
+    write routes.
+
+    ``scope`` is ``project`` or ``user``; ``key`` is the project or user ID,
+    and ``0`` in the ``project`` scope stands for tasks without a project.
+    """
+    __tablename__ = "task_stats"
+    scope: str = SQLField(primary_key=True, max_length=16)
+    key: int = SQLField(primary_key=True)
+    tasks_open: int = SQLField(nullable=False, default=0)
+    tasks_completed: int = SQLField(nullable=False, default=0)
+    total_complexity: int = SQLField(nullable=False, default=0)
@@ -0,0 +1,67 @@
+"""
+Search of tasks by their description.
+
+Words are matched with the generated ``search_vector`` column of the task
+table and its GIN index, using the ``simple`` text search configuration,
+so words are not stemmed and the search works for any language. Where
+the pg_trgm extension is installed, queries of three or more characters
+also match substrings and misspelled words through the trigram index of
+the description, and the word similarity is added to the rank.
+"""
+
+from typing import Optional, Tuple
+
+from sqlalchemy import ColumnElement, func, literal, or_, select, text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.schemas.task import Task
+
+SEARCH_VECTOR = Task.__table__.c.search_vector
+# Shorter queries have no trigrams to look up in the index.
+TRIGRAM_MIN_LENGTH = 3
+
+
+class TaskSearch:
+    """
+    Builds the match condition and the rank of a search query.
+
+    Whether pg_trgm is installed is checked with the first query of the
+    process and remembered.
+    """
+
+    def __init__(self):
+        self.trigram: Optional[bool] = None
+
+    async def criteria(
+        self, session: AsyncSession, q: str
+    ) -> Tuple[ColumnElement, ColumnElement]:
+        """
+        Return the condition selecting the tasks that match ``q`` and the
+        rank to order them by, higher first.
+        """
+        if self.trigram is None:
+            result = await session.execute(select(
+                select(text("1"))
+                .select_from(text("pg_extension"))
+                .where(text("extname = 'pg_trgm'"))
+                .exists()
+            ))
+            self.trigram = result.scalar_one()
+        return self.build(q)
+
+    def build(self, q: str) -> Tuple[ColumnElement, ColumnElement]:
+        """Build the criteria of ``criteria`` once pg_trgm is checked."""
+        query = func.websearch_to_tsquery("simple", q)
+        matched = SEARCH_VECTOR.op("@@")(query)
+        rank = func.ts_rank(SEARCH_VECTOR, query)
+        if self.trigram and len(q) >= TRIGRAM_MIN_LENGTH:
+            matched = or_(
+                matched,
+                Task.description.icontains(q, autoescape=True),
+                Task.description.op("%>")(q),
+            )
+            rank = rank + func.word_similarity(literal(q), Task.description)
+        return matched, rank
+
+
+task_search = TaskSearch()
@@ -0,0 +1,146 @@
+"""
+Compare the task routes of API versions 1 and 2 side by side.
+
+For every route of version 2 that mirrors one of version 1, the script
+runs the load scenario of both routes in-process against the seeded
+database, alternating the versions ``--rounds`` times so that both see
+the same state of the caches and of the table, and prints the median
+p50, p95 and throughput of each, to decide which routes can be moved to
+version 2.
+
+Usage:
+    python -m benchmarks.seed --tasks 1000000
+    python -m benchmarks.api_versions --requests 500 --concurrency 20
+"""
+
+import argparse
+import asyncio
+import statistics
+
+import httpx
+
+from app.db import async_engine
+from app.main import app
+from benchmarks.load import Scenario, new_task, run_scenario, sample_dataset
+
+# Pairs of a version 1 and a version 2 scenario of the same operation.
+ROUTES = {
+    "list": (
+        Scenario(
+            "GET /tasks",
+            lambda d: ("/tasks", {"params": {"assignee": d.user()[0]}}),
+        ),
+        Scenario(
+            "GET /v2/async/tasks",
+            lambda d: ("/v2/async/tasks", {"params": {"assignee": d.user()[0]}}),
+            accept=(200, 204),
+        ),
+    ),
+    "create": (
+        Scenario(
+            "POST /tasks/new_task",
+            lambda d: ("/tasks/new_task", {"json": new_task(d)}),
+            accept=(201,),
+        ),
+        Scenario(
+            "POST /v2/async/tasks",
+            lambda d: ("/v2/async/tasks", {"json": new_task(d)}),
+            accept=(201,),
+        ),
+    ),
+    "update": (
+        Scenario(
+            "PATCH /tasks/{task_id}",
+            lambda d: (f"/tasks/{d.task()}", {"json": {
+                "complexity": d.rng.randint(1, 5),
+            }}),
+        ),
+        Scenario(
+            "PATCH /v2/async/tasks/{task_id}",
+            lambda d: (f"/v2/async/tasks/{d.task()}", {"json": {
+                "complexity": d.rng.randint(1, 5),
+            }}),
+        ),
+    ),
+    "complete": (
+        Scenario(
+            "POST /tasks/{task_id}/complete",
+            lambda d: (f"/tasks/{d.take_task()}/complete", {}),
+            auth=True,
+        ),
+        Scenario(
+            "POST /v2/async/tasks/{task_id}/complete",
+            lambda d: (f"/v2/async/tasks/{d.take_task()}/complete", {}),
+            auth=True,
+        ),
+    ),
+    "delete": (
+        Scenario(
+            "DELETE /tasks/{task_id}",
+            lambda d: (f"/tasks/{d.take_task()}", {}),
+        ),
+        Scenario(
+            "DELETE /v2/async/tasks/{task_id}",
+            lambda d: (f"/v2/async/tasks/{d.take_task()}", {}),
+        ),
+    ),
+}
+
+
+async def run(args):
+    # Completing and deleting use up open tasks; every scenario takes up
+    # to ``requests`` plus the warm-up per round.
+    needed = 4 * args.rounds * (args.requests + 10) + 100
+    data = await sample_dataset(args.password, needed)
+    async with httpx.AsyncClient(
+        transport=httpx.ASGITransport(app=app, raise_app_exceptions=False),
+        base_url="http://test",
+        timeout=60,
+    ) as client:
+        response = await client.post("/auth/login", data={
+            "username": data.users[0][1], "password": args.password,
+        })
+        response.raise_for_status()
+        data.token = response.json()["access_token"]
+
+        print(
+            f"{'route':10} {'version':>7} {'p50, ms':>9} {'p95, ms':>9} "
+            f"{'req/s':>9} {'errors':>7}"
+        )
+        for operation, scenarios in ROUTES.items():
+            if args.only and operation not in args.only:
+                continue
+            summaries = {version: [] for version in (1, 2)}
+            for _ in range(args.rounds):
+                for version, scenario in zip((1, 2), scenarios):
+                    summaries[version].append(await run_scenario(
+                        client, scenario, data, args.requests, args.concurrency
+                    ))
+            for version, runs in summaries.items():
+                def median(metric):
+                    return statistics.median(run[metric] for run in runs)
+
+                print(
+                    f"{operation:10} {'v' + str(version):>7} "
+                    f"{median('p50_ms'):9.2f} {median('p95_ms'):9.2f} "
+                    f"{median('rps'):9.1f} {median('error_rate'):7.1%}"
+                )
+    await async_engine.dispose()
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Compare the task routes of API versions 1 and 2."
+    )
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--rounds", type=int, default=3)
+    parser.add_argument("--password", default="benchmark")
+    parser.add_argument(
+        "--only", nargs="+", choices=list(ROUTES), help="Compare these only."
+    )
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,58 @@
+"""
+Compare creating tasks one by one with POST /tasks/bulk.
+
+Usage:
+    python -m benchmarks.bulk_create --tasks 5000 --batch-size 1000
+"""
+
+import argparse
+import asyncio
+import time
+import uuid
+
+import httpx
+
+from app.db import async_engine
+from app.main import app
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--tasks", type=int, default=5000)
+    parser.add_argument("--batch-size", type=int, default=1000)
+    args = parser.parse_args()
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        name = f"bench-{uuid.uuid4()}"
+        await client.post(
+            "/auth/signup",
+            json={"email": f"{name}@example.com", "password": "x", "name": name},
+        )
+        items = [
+            {"description": f"bulk task {i}", "assignee": name,
+             "complexity": 1 + i % 5}
+            for i in range(args.tasks)
+        ]
+
+        started = time.perf_counter()
+        for item in items:
+            response = await client.post("/tasks/new_task", json=item)
+            response.raise_for_status()
+        single = time.perf_counter() - started
+
+        started = time.perf_counter()
+        response = await client.post(
+            "/tasks/bulk", json=items, params={"batch_size": args.batch_size}
+        )
+        response.raise_for_status()
+        bulk = time.perf_counter() - started
+        assert response.json()["created"] == args.tasks
+
+    print(f"single requests: {single:7.2f} s ({args.tasks / single:8.0f} tasks/s)")
+    print(f"bulk request:    {bulk:7.2f} s ({args.tasks / bulk:8.0f} tasks/s)")
+    await async_engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
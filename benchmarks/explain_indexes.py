@@ -0,0 +1,117 @@
+"""
+Compare query plans of the task access patterns with and without indexes.
+
+The script builds a scratch copy of the schema in a separate Postgres
+schema, fills it with synthetic data, prints EXPLAIN ANALYZE output for
+the queries issued by the routes, then creates the indexes declared on
+the models and prints the plans again.
+
+Usage:
+    python -m benchmarks.explain_indexes --tasks 1000000
+"""
+
+import argparse
+
+from sqlalchemy import text
+from sqlmodel import SQLModel
+
+from app.db import engine
+from app.schemas import task  # noqa: F401  registers the tables
+
+SCHEMA = "bench_indexes"
+
+QUERIES = {
+    "tasks by assignee": (
+        "SELECT * FROM task WHERE assignee = :user_id "
+        "ORDER BY id LIMIT 101"
+    ),
+    "tasks by project": (
+        "SELECT * FROM task WHERE project = :project_id "
+        "ORDER BY id LIMIT 101"
+    ),
+    "tasks without project": (
+        "SELECT * FROM task WHERE project IS NULL ORDER BY id LIMIT 101"
+    ),
+    "tasks for day": "SELECT * FROM task WHERE due_date = :day",
+    "log by user": "SELECT * FROM productivitylog WHERE user_id = :user_id",
+    "user by name": 'SELECT * FROM "user" WHERE name = :name',
+}
+
+PARAMS = {"user_id": 42, "project_id": 7, "day": "2030-01-15", "name": "user-42"}
+
+
+def seed(conn, users: int, projects: int, tasks: int) -> None:
+    """Fill the scratch schema with synthetic rows."""
+    conn.execute(text(
+        'INSERT INTO "user" (id, email, password, name) '
+        "SELECT i, 'user-' || i || '@example.com', '', 'user-' || i "
+        "FROM generate_series(1, :n) AS i"
+    ), {"n": users})
+    conn.execute(text(
+        "INSERT INTO project (id, name, description) "
+        "SELECT i, 'project-' || i, '' FROM generate_series(1, :n) AS i"
+    ), {"n": projects})
+    conn.execute(text(
+        "INSERT INTO task "
+        "(id, description, due_date, assignee, project, is_completed, complexity) "
+        "SELECT i, 'task ' || i, "
+        "DATE '2030-01-01' + (i % 365), "
+        "1 + (i % :users), "
+        "CASE WHEN i % 10 = 0 THEN NULL ELSE 1 + (i % :projects) END, "
+        "i % 3 = 0, 1 + (i % 5) "
+        "FROM generate_series(1, :n) AS i"
+    ), {"n": tasks, "users": users, "projects": projects})
+    conn.execute(text(
+        "INSERT INTO productivitylog "
+        "(user_id, log_date, tasks_completed, last_activity, "
+        "tasks_completed_month, mean_complexity_month) "
+        "SELECT i, now(), 0, now(), 0, 0 FROM generate_series(1, :n) AS i"
+    ), {"n": users})
+
+
+def explain(conn, title: str) -> None:
+    """Print the plan of every query."""
+    print(f"\n===== {title} =====")
+    for name, query in QUERIES.items():
+        plan = conn.execute(
+            text(f"EXPLAIN (ANALYZE, COSTS OFF, TIMING OFF) {query}"),
+            PARAMS,
+        ).scalars().all()
+        print(f"\n--- {name}")
+        print("\n".join(plan))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--users", type=int, default=10_000)
+    parser.add_argument("--projects", type=int, default=1_000)
+    parser.add_argument("--tasks", type=int, default=1_000_000)
+    args = parser.parse_args()
+
+    indexes = [
+        index
+        for table in SQLModel.metadata.sorted_tables
+        for index in table.indexes
+    ]
+    with engine.begin() as conn:
+        conn.execute(text(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE"))
+        conn.execute(text(f"CREATE SCHEMA {SCHEMA}"))
+        conn.execute(text(f"SET LOCAL search_path TO {SCHEMA}"))
+        ddl = conn.execution_options(schema_translate_map={None: SCHEMA})
+        SQLModel.metadata.create_all(ddl)
+        for index in indexes:
+            index.drop(ddl)
+        seed(conn, args.users, args.projects, args.tasks)
+        conn.execute(text("ANALYZE"))
+        explain(conn, "without secondary indexes")
+
+        for index in indexes:
+            index.create(ddl)
+        conn.execute(text("ANALYZE"))
+        explain(conn, "with secondary indexes")
+
+        conn.execute(text(f"DROP SCHEMA {SCHEMA} CASCADE"))
+
+
+if __name__ == "__main__":
+    main()
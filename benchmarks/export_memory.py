@@ -0,0 +1,121 @@
+"""
+Check that GET /tasks/export keeps memory flat for large exports.
+
+The script inserts ``--rows`` synthetic tasks for a temporary user,
+calls the ASGI application directly with a ``send`` callable that only
+counts the body chunks, and compares the peak RSS of the process before
+and after. (httpx's ASGI transport collects the whole body in memory, so
+it cannot be used here.) The synthetic rows are deleted afterwards. Exits with status 1 if the peak
+grew by more than ``--max-growth-mb``.
+
+Usage:
+    python -m benchmarks.export_memory --rows 1000000 --format csv
+"""
+
+import argparse
+import asyncio
+import resource
+import sys
+import time
+import uuid
+
+from urllib.parse import urlencode
+
+from sqlalchemy import text
+
+from app.db import async_engine
+from app.main import app
+
+
+def peak_rss_mb() -> float:
+    """Peak resident set size of this process in megabytes."""
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+async def consume(path: str, params: dict) -> tuple:
+    """Run one GET request through the ASGI app, discarding the body."""
+    scope = {
+        "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1",
+        "method": "GET", "scheme": "http", "path": path, "raw_path": path.encode(),
+        "query_string": urlencode(params).encode(), "root_path": "",
+        "headers": [(b"host", b"bench")], "client": ("127.0.0.1", 0),
+        "server": ("bench", 80),
+    }
+    received = lines = 0
+    requested = False
+    disconnected = asyncio.Event()
+
+    async def receive():
+        nonlocal requested
+        if not requested:
+            requested = True
+            return {"type": "http.request", "body": b"", "more_body": False}
+        await disconnected.wait()
+        return {"type": "http.disconnect"}
+
+    async def send(message):
+        nonlocal received, lines
+        if message["type"] == "http.response.body":
+            received += len(message.get("body", b""))
+            lines += message.get("body", b"").count(b"\n")
+            if not message.get("more_body", False):
+                disconnected.set()
+
+    await app(scope, receive, send)
+    return received, lines
+
+
+async def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--format", choices=["ndjson", "csv"], default="ndjson")
+    parser.add_argument("--max-growth-mb", type=float, default=50.0)
+    args = parser.parse_args()
+
+    name = f"export-{uuid.uuid4()}"
+    async with async_engine.begin() as conn:
+        user_id = (await conn.execute(
+            text(
+                'INSERT INTO "user" (email, password, name) '
+                "VALUES (:email, '', :name) RETURNING id"
+            ),
+            {"email": f"{name}@example.com", "name": name},
+        )).scalar_one()
+        await conn.execute(
+            text(
+                "INSERT INTO task (description, assignee, is_completed, complexity) "
+                "SELECT 'synthetic task ' || i, :user_id, false, 1 + i % 5 "
+                "FROM generate_series(1, :rows) AS i"
+            ),
+            {"user_id": user_id, "rows": args.rows},
+        )
+
+    try:
+        before = peak_rss_mb()
+        started = time.perf_counter()
+        received, lines = await consume(
+            "/tasks/export", {"assignee": user_id, "format": args.format}
+        )
+        elapsed = time.perf_counter() - started
+        growth = peak_rss_mb() - before
+    finally:
+        async with async_engine.begin() as conn:
+            await conn.execute(
+                text("DELETE FROM task WHERE assignee = :user_id"),
+                {"user_id": user_id},
+            )
+            await conn.execute(
+                text('DELETE FROM "user" WHERE id = :user_id'),
+                {"user_id": user_id},
+            )
+        await async_engine.dispose()
+
+    print(
+        f"exported {lines} lines, {received / 2**20:.1f} MiB in {elapsed:.1f} s; "
+        f"peak RSS grew by {growth:.1f} MiB"
+    )
+    return 0 if growth <= args.max_growth_mb else 1
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main()))
@@ -0,0 +1,466 @@
+"""
+Load test every router of the application against a seeded database.
+
+Each scenario sends ``--requests`` requests to one route from
+``--concurrency`` concurrent clients, after a few warm-up requests, and
+records the latency percentiles, the throughput, the share of failed
+requests and the number of database queries and database time per
+request, read from the ``Server-Timing`` header. Requests go to the
+application in-process by default; with ``--base-url`` they go to a
+running server, which needs ``SERVER_TIMING=true`` for the query counts
+and the same ``DB_*`` settings as this script, since the route
+parameters are sampled from the database.
+
+Run ``benchmarks.seed`` first. Scenarios that write go last; completing
+and deleting tasks use up open tasks of the dataset. Not covered:
+``DELETE /tasks`` (deletes everything matching a filter),
+``/utils/prefill-day-off`` (calls the external calendar service) and
+the maintenance routes ``/utils/rebuild-task-stats`` and
+``/utils/create-db-tables``. The ``/v2/async`` task routes are compared
+with version 1 by ``benchmarks.api_versions``.
+
+With ``--output`` the results are saved as JSON; with ``--baseline``
+they are compared to an earlier run, and the script exits with status 1
+if the p95 latency or the queries per request of a scenario grew, or its
+throughput fell, by more than ``--threshold``.
+
+Usage:
+    python -m benchmarks.seed --tasks 2000000
+    python -m benchmarks.load --output benchmarks/results/baseline.json
+    python -m benchmarks.load --baseline benchmarks/results/baseline.json
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import re
+import statistics
+import subprocess
+import sys
+import time
+import uuid
+from dataclasses import dataclass, field
+from datetime import date, datetime, timedelta
+from typing import Callable, List, Optional, Tuple
+
+import httpx
+from sqlalchemy import text
+
+from app.config import settings
+from app.db import async_engine, async_session
+
+from benchmarks.seed import SEED_DOMAIN
+
+SERVER_TIMING = re.compile(r'db;dur=([\d.]+);desc="(\d+) queries"')
+WARM_UP = 5
+SAMPLE_SIZE = 1000
+
+
+@dataclass
+class Dataset:
+    """Route parameters sampled from the seeded database."""
+    users: List[Tuple[int, str, str]]
+    projects: List[int]
+    open_tasks: List[int]
+    words: List[str]
+    password: str
+    token: str = ""
+    rng: random.Random = field(default_factory=lambda: random.Random(42))
+
+    def user(self) -> Tuple[int, str, str]:
+        return self.rng.choice(self.users)
+
+    def project(self) -> int:
+        return self.rng.choice(self.projects)
+
+    def task(self) -> int:
+        return self.rng.choice(self.open_tasks)
+
+    def take_task(self) -> int:
+        """An open task that no other request has used up."""
+        return self.open_tasks.pop()
+
+    def due_date(self) -> str:
+        return (date.today() + timedelta(days=self.rng.randrange(365))).isoformat()
+
+
+@dataclass
+class Scenario:
+    """
+    A route under load.
+
+    Args:
+        name (str): Method and route template, as in the metrics.
+        request (Callable): Returns the path and the ``httpx`` request
+            arguments of one request.
+        auth (bool): Send the bearer token of a seeded user.
+        accept (tuple): Status codes that are not counted as failures.
+    """
+    name: str
+    request: Callable[[Dataset], Tuple[str, dict]]
+    auth: bool = False
+    accept: tuple = (200,)
+
+    @property
+    def method(self) -> str:
+        return self.name.split()[0]
+
+
+def new_task(data: Dataset) -> dict:
+    return {
+        "description": f"load test {' '.join(data.rng.sample(data.words, 3))}",
+        "assignee": data.user()[2],
+        "due_date": data.due_date(),
+        "project": data.project(),
+        "complexity": data.rng.randint(1, 5),
+    }
+
+
+SCENARIOS = [
+    Scenario("GET /utils/test-db", lambda d: ("/utils/test-db", {})),
+    Scenario("GET /utils/pool-stats", lambda d: ("/utils/pool-stats", {})),
+    Scenario(
+        "GET /utils/user-cache-stats", lambda d: ("/utils/user-cache-stats", {})
+    ),
+    Scenario(
+        "GET /utils/http-cache-stats", lambda d: ("/utils/http-cache-stats", {})
+    ),
+    Scenario("GET /utils/day-off-stats", lambda d: ("/utils/day-off-stats", {})),
+    Scenario("GET /utils/test-auth", lambda d: ("/utils/test-auth", {}), auth=True),
+    Scenario("GET /utils/me", lambda d: ("/utils/me", {}), auth=True),
+    Scenario("GET /metrics", lambda d: ("/metrics", {})),
+    Scenario("GET /tasks/all_projects", lambda d: ("/tasks/all_projects", {})),
+    Scenario(
+        "GET /tasks",
+        lambda d: ("/tasks", {"params": {"assignee": d.user()[0]}}),
+    ),
+    Scenario(
+        "GET /tasks/search",
+        lambda d: ("/tasks/search", {"params": {"q": d.rng.choice(d.words)}}),
+    ),
+    Scenario(
+        "GET /tasks/export",
+        lambda d: ("/tasks/export", {"params": {"assignee": d.user()[0]}}),
+    ),
+    Scenario(
+        "GET /tasks/project/{project_id}/tasks",
+        lambda d: (f"/tasks/project/{d.project()}/tasks", {}),
+    ),
+    Scenario("GET /tasks/no_project", lambda d: ("/tasks/no_project", {})),
+    Scenario(
+        "GET /tasks/user/{user_id}/tasks",
+        lambda d: (f"/tasks/user/{d.user()[0]}/tasks", {}),
+    ),
+    Scenario(
+        "GET /tasks/stats/project/{project_id}",
+        lambda d: (f"/tasks/stats/project/{d.project()}", {}),
+    ),
+    Scenario(
+        "GET /tasks/stats/no-project", lambda d: ("/tasks/stats/no-project", {})
+    ),
+    Scenario(
+        "GET /tasks/stats/user/{user_id}",
+        lambda d: (f"/tasks/stats/user/{d.user()[0]}", {}),
+    ),
+    Scenario(
+        "POST /auth/signup",
+        lambda d: ("/auth/signup", {"json": {
+            "email": f"load-{uuid.uuid4().hex}@{SEED_DOMAIN}",
+            "password": d.password,
+            "name": "Load Test",
+        }}),
+        accept=(201,),
+    ),
+    Scenario(
+        "POST /auth/login",
+        lambda d: ("/auth/login", {
+            "data": {"username": d.user()[1], "password": d.password},
+        }),
+    ),
+    Scenario(
+        "POST /tasks/new_project",
+        lambda d: ("/tasks/new_project", {"json": {
+            "name": f"Load test {uuid.uuid4().hex[:8]}",
+            "description": " ".join(d.rng.sample(d.words, 10)),
+        }}),
+        accept=(201,),
+    ),
+    Scenario(
+        "POST /tasks/new_task",
+        lambda d: ("/tasks/new_task", {"json": new_task(d)}),
+        accept=(201,),
+    ),
+    Scenario(
+        "POST /tasks/bulk",
+        lambda d: ("/tasks/bulk", {"json": [new_task(d) for _ in range(20)]}),
+    ),
+    Scenario(
+        "PATCH /tasks/{task_id}",
+        lambda d: (f"/tasks/{d.task()}", {"json": {
+            "complexity": d.rng.randint(1, 5), "due_date": d.due_date(),
+        }}),
+    ),
+    Scenario(
+        "PATCH /tasks",
+        lambda d: ("/tasks", {"json": {
+            "ids": d.rng.sample(d.open_tasks, 50),
+            "changes": {"assignee": d.user()[0]},
+        }}),
+    ),
+    Scenario(
+        "POST /tasks/{task_id}/complete",
+        lambda d: (f"/tasks/{d.take_task()}/complete", {}),
+        auth=True,
+    ),
+    # 404 for users that have not completed a task yet.
+    Scenario(
+        "GET /tasks/user/{user_id}/productivity_log",
+        lambda d: (f"/tasks/user/{d.user()[0]}/productivity_log", {}),
+        accept=(200, 404),
+    ),
+    Scenario(
+        "POST /tasks/archive",
+        lambda d: ("/tasks/archive", {"params": {"older_than_days": 90}}),
+        accept=(202,),
+    ),
+    Scenario(
+        "DELETE /tasks/{task_id}",
+        lambda d: (f"/tasks/{d.take_task()}", {}),
+    ),
+]
+
+
+async def sample_dataset(password: str, open_tasks: int) -> Dataset:
+    """Sample seeded users, projects, open tasks and description words."""
+    async with async_session() as session:
+        users = (await session.execute(
+            text(
+                'SELECT id, email, name FROM "user" WHERE email LIKE :domain '
+                "ORDER BY random() LIMIT :n"
+            ),
+            {"domain": f"%@{SEED_DOMAIN}", "n": SAMPLE_SIZE},
+        )).all()
+        projects = (await session.execute(
+            text("SELECT id FROM project ORDER BY random() LIMIT :n"),
+            {"n": SAMPLE_SIZE},
+        )).scalars().all()
+        tasks = (await session.execute(
+            text(
+                "SELECT id FROM task WHERE NOT is_completed "
+                "ORDER BY random() LIMIT :n"
+            ),
+            {"n": open_tasks},
+        )).scalars().all()
+        descriptions = (await session.execute(
+            text("SELECT description FROM task ORDER BY random() LIMIT 200")
+        )).scalars().all()
+    if not users or not projects or len(tasks) < open_tasks:
+        sys.exit("Not enough seeded data, run benchmarks.seed first.")
+    words = sorted({
+        word.strip(".").lower()
+        for description in descriptions
+        for word in description.split()
+        if len(word) > 3
+    })
+    return Dataset(
+        users=[tuple(user) for user in users],
+        projects=list(projects),
+        open_tasks=list(tasks),
+        words=words,
+        password=password,
+    )
+
+
+async def run_scenario(
+    client: httpx.AsyncClient,
+    scenario: Scenario,
+    data: Dataset,
+    requests: int,
+    concurrency: int,
+) -> dict:
+    """Send the requests of one scenario and summarize them."""
+    headers = {"Authorization": f"Bearer {data.token}"} if scenario.auth else {}
+    latencies, queries, db_time, failures = [], [], [], {}
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def send(record: bool):
+        path, kwargs = scenario.request(data)
+        async with semaphore:
+            started = time.perf_counter()
+            response = await client.request(
+                scenario.method, path, headers=headers, **kwargs
+            )
+            elapsed = time.perf_counter() - started
+        if not record:
+            return
+        latencies.append(elapsed)
+        if response.status_code not in scenario.accept:
+            failures[response.status_code] = failures.get(response.status_code, 0) + 1
+        timing = SERVER_TIMING.search(response.headers.get("server-timing", ""))
+        if timing:
+            db_time.append(float(timing.group(1)))
+            queries.append(int(timing.group(2)))
+
+    for _ in range(WARM_UP):
+        await send(record=False)
+    started = time.perf_counter()
+    await asyncio.gather(*(send(record=True) for _ in range(requests)))
+    elapsed = time.perf_counter() - started
+
+    percentiles = statistics.quantiles(latencies, n=100, method="inclusive")
+    return {
+        "requests": requests,
+        "rps": round(requests / elapsed, 1),
+        "p50_ms": round(percentiles[49] * 1000, 2),
+        "p95_ms": round(percentiles[94] * 1000, 2),
+        "p99_ms": round(percentiles[98] * 1000, 2),
+        "error_rate": round(sum(failures.values()) / requests, 4),
+        "errors": {str(code): count for code, count in failures.items()},
+        "queries_per_request": (
+            round(statistics.mean(queries), 2) if queries else None
+        ),
+        "db_ms_per_request": (
+            round(statistics.mean(db_time), 2) if db_time else None
+        ),
+    }
+
+
+async def dataset_size() -> dict:
+    async with async_session() as session:
+        result = await session.execute(text(
+            'SELECT (SELECT count(*) FROM "user"), (SELECT count(*) FROM project), '
+            "(SELECT count(*) FROM task)"
+        ))
+        users, projects, tasks = result.one()
+    return {"users": users, "projects": projects, "tasks": tasks}
+
+
+def git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(results: dict, baseline: dict, threshold: float) -> List[str]:
+    """
+    Print the change of every scenario against the baseline and return
+    the scenarios that regressed by more than ``threshold``.
+    """
+    regressions = []
+    print(f"\n{'scenario':45} {'p95':>9} {'rps':>9} {'queries':>9}")
+    for name, current in results.items():
+        before = baseline.get(name)
+        if before is None:
+            continue
+        changes = {}
+        for metric in ("p95_ms", "rps", "queries_per_request"):
+            old, new = before.get(metric), current.get(metric)
+            changes[metric] = (new - old) / old if old and new is not None else 0.0
+        print(
+            f"{name:45} {changes['p95_ms']:>+9.1%} {changes['rps']:>+9.1%} "
+            f"{changes['queries_per_request']:>+9.1%}"
+        )
+        if (
+            changes["p95_ms"] > threshold
+            or changes["rps"] < -threshold
+            or changes["queries_per_request"] > threshold
+        ):
+            regressions.append(name)
+    return regressions
+
+
+async def run(args) -> dict:
+    data = await sample_dataset(args.password, 3 * args.requests + 100)
+    if args.base_url:
+        transport = None
+        base_url = args.base_url
+    else:
+        # The middleware reads the setting when the application is built.
+        settings.server_timing = True
+        from app.main import app
+
+        # Unhandled errors become 500 responses, as behind a server.
+        transport = httpx.ASGITransport(app=app, raise_app_exceptions=False)
+        base_url = "http://test"
+    selected = [
+        scenario for scenario in SCENARIOS
+        if not args.only or any(part in scenario.name for part in args.only)
+    ]
+
+    results = {}
+    async with httpx.AsyncClient(
+        transport=transport, base_url=base_url, timeout=60
+    ) as client:
+        response = await client.post("/auth/login", data={
+            "username": data.users[0][1], "password": args.password,
+        })
+        response.raise_for_status()
+        data.token = response.json()["access_token"]
+        for scenario in selected:
+            summary = await run_scenario(
+                client, scenario, data, args.requests, args.concurrency
+            )
+            results[scenario.name] = summary
+            print(
+                f"{scenario.name:45} p50 {summary['p50_ms']:8.2f} ms  "
+                f"p95 {summary['p95_ms']:8.2f} ms  p99 {summary['p99_ms']:8.2f} ms  "
+                f"{summary['rps']:8.1f} req/s  "
+                f"queries {summary['queries_per_request']}  "
+                f"errors {summary['error_rate']:.1%}"
+            )
+    report = {
+        "commit": git_commit(),
+        "started_at": datetime.now().isoformat(timespec="seconds"),
+        "target": args.base_url or "in-process",
+        "requests": args.requests,
+        "concurrency": args.concurrency,
+        "dataset": await dataset_size(),
+        "scenarios": results,
+    }
+    await async_engine.dispose()
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Load test the routes of the application."
+    )
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--base-url", help="Test a running server instead.")
+    parser.add_argument("--password", default="benchmark")
+    parser.add_argument(
+        "--only", nargs="+", help="Run the scenarios whose name contains one of these."
+    )
+    parser.add_argument("--output", help="Save the results to this JSON file.")
+    parser.add_argument("--baseline", help="Compare with the results in this file.")
+    parser.add_argument(
+        "--threshold", type=float, default=0.1,
+        help="Allowed relative regression against the baseline.",
+    )
+    args = parser.parse_args()
+
+    report = asyncio.run(run(args))
+    if args.output:
+        os.makedirs(os.path.dirname(args.output) or ".", exist_ok=True)
+        with open(args.output, "w", encoding="utf-8") as file:
+            json.dump(report, file, indent=2, ensure_ascii=False)
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as file:
+            baseline = json.load(file)
+        regressions = compare(
+            report["scenarios"], baseline["scenarios"], args.threshold
+        )
+        if regressions:
+            print(f"\nRegressed: {', '.join(regressions)}")
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+"""
+Measure login throughput and event loop responsiveness under concurrency.
+
+For every pool size given in ``--workers`` the script sends concurrent
+``POST /auth/login`` requests to the application in-process and, at the
+same time, polls a route that does no hashing. With ``0`` workers bcrypt
+runs inline and the probe latency grows with every login in flight; with
+a process pool the probe stays fast and login throughput scales with the
+number of workers up to the CPU count.
+
+Usage:
+    python -m benchmarks.login_throughput --workers 0 2 4 --logins 200
+"""
+
+import argparse
+import asyncio
+import statistics
+import time
+import uuid
+
+import httpx
+
+from app.auth.auth_handler import hashing_pool
+from app.db import async_engine
+from app.main import app
+
+
+async def probe(client: httpx.AsyncClient, stop: asyncio.Event) -> list:
+    """
+    Poll a cheap route every 10 ms until stopped.
+
+    Latency is counted from the moment the request was due, so time spent
+    waiting for a blocked event loop is included.
+    """
+    latencies = []
+    while not stop.is_set():
+        due = time.perf_counter() + 0.01
+        await asyncio.sleep(0.01)
+        await client.get("/utils/user-cache-stats")
+        latencies.append(time.perf_counter() - due)
+    return latencies
+
+
+async def run(workers: int, logins: int, concurrency: int, rounds: int) -> dict:
+    """Run one round of logins with the given pool size."""
+    hashing_pool.shutdown()
+    hashing_pool.workers = workers
+    hashing_pool.queue_size = logins
+    hashing_pool.rounds = rounds
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        email, password = f"{uuid.uuid4()}@example.com", "benchmark"
+        await client.post(
+            "/auth/signup",
+            json={"email": email, "password": password, "name": "benchmark"},
+        )
+        credentials = {"username": email, "password": password}
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def login():
+            async with semaphore:
+                response = await client.post("/auth/login", data=credentials)
+                response.raise_for_status()
+
+        await login()  # start the worker processes
+        stop = asyncio.Event()
+        probing = asyncio.create_task(probe(client, stop))
+        started = time.perf_counter()
+        await asyncio.gather(*(login() for _ in range(logins)))
+        elapsed = time.perf_counter() - started
+        stop.set()
+        latencies = await probing
+
+    return {
+        "logins_per_s": logins / elapsed,
+        "probe_p50_ms": statistics.median(latencies) * 1000,
+        "probe_max_ms": max(latencies) * 1000,
+    }
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--workers", type=int, nargs="+", default=[0, 2, 4])
+    parser.add_argument("--logins", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--rounds", type=int, default=12)
+    args = parser.parse_args()
+
+    for workers in args.workers:
+        stats = await run(workers, args.logins, args.concurrency, args.rounds)
+        print(
+            f"workers={workers}: {stats['logins_per_s']:6.1f} logins/s  "
+            f"probe p50 {stats['probe_p50_ms']:7.1f} ms  "
+            f"max {stats['probe_max_ms']:7.1f} ms"
+        )
+    hashing_pool.shutdown()
+    await async_engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
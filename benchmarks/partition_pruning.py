@@ -0,0 +1,129 @@
+"""
+Show partition pruning of the day and range queries on the task table.
+
+The script builds a scratch copy of the schema in a separate Postgres
+schema, creates monthly partitions of the task table for the seeded
+period, fills it with synthetic tasks, and copies them to an unpartitioned
+table with the same indexes. For every query it prints how many task
+partitions the plan reads and the execution time on both tables.
+
+Usage:
+    python -m benchmarks.partition_pruning --tasks 2000000 --months 24
+"""
+
+import argparse
+import json
+
+from sqlalchemy import text
+from sqlmodel import SQLModel
+
+from app.db import engine
+from app.schemas import task  # noqa: F401  registers the tables
+
+SCHEMA = "bench_partitions"
+FIRST_DAY = "2030-01-01"
+
+QUERIES = {
+    "tasks for day": "SELECT * FROM {table} WHERE due_date = :day",
+    "tasks for week": (
+        "SELECT * FROM {table} "
+        "WHERE due_date BETWEEN :day AND CAST(:day AS date) + 6"
+    ),
+    "tasks for quarter": (
+        "SELECT * FROM {table} "
+        "WHERE due_date BETWEEN :day AND CAST(:day AS date) + 90"
+    ),
+    "tasks without due date": (
+        "SELECT * FROM {table} WHERE due_date IS NULL "
+        "ORDER BY id LIMIT 101"
+    ),
+    "tasks by assignee": (
+        "SELECT * FROM {table} WHERE assignee = :user_id "
+        "ORDER BY id LIMIT 101"
+    ),
+}
+
+PARAMS = {"day": "2030-06-15", "user_id": 42}
+
+
+def seed(conn, users: int, tasks: int, months: int) -> None:
+    """Fill the scratch schema; one task in ten has no due date."""
+    conn.execute(text(
+        'INSERT INTO "user" (id, email, password, name) '
+        "SELECT i, 'user-' || i || '@example.com', '', 'user-' || i "
+        "FROM generate_series(1, :n) AS i"
+    ), {"n": users})
+    conn.execute(text(
+        "INSERT INTO task "
+        "(id, description, due_date, assignee, is_completed, complexity) "
+        "SELECT i, 'task ' || i, "
+        "CASE WHEN i % 10 = 0 THEN NULL "
+        "ELSE CAST(:first AS date) + (i % (:months * 30)) END, "
+        "1 + (i % :users), i % 3 = 0, 1 + (i % 5) "
+        "FROM generate_series(1, :n) AS i"
+    ), {"n": tasks, "users": users, "months": months, "first": FIRST_DAY})
+
+
+def plan_relations(node: dict) -> list:
+    """Names of the relations scanned by a JSON plan node and its children."""
+    names = [node["Relation Name"]] if "Relation Name" in node else []
+    for child in node.get("Plans", []):
+        names.extend(plan_relations(child))
+    return names
+
+
+def explain(conn, query: str) -> tuple:
+    """Return the scanned relations and the execution time in ms."""
+    raw = conn.execute(
+        text(f"EXPLAIN (ANALYZE, FORMAT JSON) {query}"), PARAMS
+    ).scalar_one()
+    plan = (json.loads(raw) if isinstance(raw, str) else raw)[0]
+    return set(plan_relations(plan["Plan"])), plan["Execution Time"]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--users", type=int, default=10_000)
+    parser.add_argument("--tasks", type=int, default=2_000_000)
+    parser.add_argument("--months", type=int, default=24)
+    args = parser.parse_args()
+
+    with engine.begin() as conn:
+        conn.execute(text(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE"))
+        conn.execute(text(f"CREATE SCHEMA {SCHEMA}"))
+        conn.execute(text(f"SET LOCAL search_path TO {SCHEMA}"))
+        ddl = conn.execution_options(schema_translate_map={None: SCHEMA})
+        SQLModel.metadata.create_all(ddl)
+        conn.execute(text(
+            "SELECT create_task_partitions(CAST(:first AS date), "
+            "CAST(CAST(:first AS date) "
+            "+ make_interval(months => :months - 1) AS date))"
+        ), {"first": FIRST_DAY, "months": args.months})
+        seed(conn, args.users, args.tasks, args.months)
+        conn.execute(text(
+            "CREATE TABLE task_flat AS SELECT * FROM task; "
+            "CREATE INDEX ON task_flat (id); "
+            "CREATE INDEX ON task_flat (due_date); "
+            "CREATE INDEX ON task_flat (assignee, id)"
+        ))
+        conn.execute(text("ANALYZE"))
+
+        total = conn.execute(text(
+            "SELECT count(*) FROM pg_inherits "
+            "WHERE inhparent = CAST('task' AS regclass)"
+        )).scalar_one()
+        print(f"{args.tasks} tasks in {total} partitions\n")
+        print(f"{'query':<24}{'partitions':>12}{'partitioned':>14}{'flat':>12}")
+        for name, query in QUERIES.items():
+            scanned, partitioned = explain(conn, query.format(table="task"))
+            _, flat = explain(conn, query.format(table="task_flat"))
+            print(
+                f"{name:<24}{len(scanned):>6} / {total:<3}"
+                f"{partitioned:>11.2f} ms{flat:>9.2f} ms"
+            )
+
+        conn.execute(text(f"DROP SCHEMA {SCHEMA} CASCADE"))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,124 @@
+"""
+Measure the Python-side overhead of the hot queries.
+
+For every query of ``app.queries`` the script compares the ``select()``
+construct the routes built before with the cached lambda statement, in
+two ways:
+
+* build: building the statement and its cache key, which SQLAlchemy
+  does on every execution to find the compiled SQL in its cache; no
+  database is involved;
+* execute: a whole ``session.execute()`` against the database; both
+  versions run the same prepared statement, so the difference between
+  them is the Python work only.
+
+Usage:
+    python -m benchmarks.query_overhead --iterations 20000
+"""
+
+import argparse
+import asyncio
+import statistics
+import time
+
+from sqlalchemy import delete, select
+
+from app import queries
+from app.db import async_session, dispose_engines
+from app.pagination import keyset
+from app.responses import TASK_COLUMNS, select_task_rows
+from app.schemas.task import ProductivityLog, Task, User
+
+EMAIL = "nobody@example.com"
+# Pairs of the previous construct and the cached statement of a query.
+QUERIES = {
+    "user by email": (
+        lambda: select(User).where(User.email == EMAIL),
+        lambda: queries.user_by_email(EMAIL),
+    ),
+    "user by name": (
+        lambda: select(User).where(User.name == "nobody"),
+        lambda: queries.user_by_name("nobody"),
+    ),
+    "task exists": (
+        lambda: select(Task.id).where(Task.id == 1),
+        lambda: queries.task_id_by_id(1),
+    ),
+    "log by user": (
+        lambda: select(ProductivityLog).where(ProductivityLog.user_id == 1),
+        lambda: queries.log_by_user_id(1),
+    ),
+    "tasks by user": (
+        lambda: keyset(
+            select_task_rows().where(Task.assignee == 1), Task.id, 100, None
+        ),
+        lambda: queries.tasks_by_user(1, 100, None),
+    ),
+    "tasks by project": (
+        lambda: keyset(
+            select_task_rows().where(Task.project == 1), Task.id, 100, None
+        ),
+        lambda: queries.tasks_by_project(1, 100, None),
+    ),
+    "delete task": (
+        lambda: delete(Task).where(Task.id == 0).returning(*TASK_COLUMNS),
+        lambda: queries.delete_task(0),
+    ),
+}
+
+
+def build_time(build, iterations: int) -> float:
+    """Microseconds to build a statement and its cache key."""
+    started = time.perf_counter()
+    for _ in range(iterations):
+        build()._generate_cache_key()
+    return (time.perf_counter() - started) / iterations * 1e6
+
+
+async def execute_time(session, build, iterations: int) -> float:
+    """Median microseconds of one ``session.execute()``, in batches of 100."""
+    batches = []
+    for _ in range(max(iterations // 100, 1)):
+        started = time.perf_counter()
+        for _ in range(100):
+            (await session.execute(build())).all()
+        batches.append((time.perf_counter() - started) / 100 * 1e6)
+    return statistics.median(batches)
+
+
+async def run(iterations: int, executions: int):
+    print(
+        f"{'query':18} {'build, µs':>20} {'execute, µs':>22}\n"
+        f"{'':18} {'before':>9} {'after':>10} {'before':>10} {'after':>11}"
+    )
+    async with async_session() as session:
+        for name, (before, after) in QUERIES.items():
+            # Warm up the compiled cache and the prepared statements.
+            for build in (before, after):
+                (await session.execute(build())).all()
+            builds = [build_time(build, iterations) for build in (before, after)]
+            executes = [
+                await execute_time(session, build, executions)
+                for build in (before, after)
+            ]
+            print(
+                f"{name:18} {builds[0]:9.1f} {builds[1]:10.1f} "
+                f"{executes[0]:10.1f} {executes[1]:11.1f}"
+            )
+        # The delete matched no rows, but do not keep anything anyway.
+        await session.rollback()
+    await dispose_engines()
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Compare statement overhead before and after caching."
+    )
+    parser.add_argument("--iterations", type=int, default=20000)
+    parser.add_argument("--executions", type=int, default=2000)
+    args = parser.parse_args()
+    asyncio.run(run(args.iterations, args.executions))
+
+
+if __name__ == "__main__":
+    main()
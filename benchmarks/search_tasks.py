@@ -0,0 +1,107 @@
+"""
+Measure task search over a large synthetic task table.
+
+The script builds a scratch copy of the schema in a separate Postgres
+schema, fills it with tasks whose descriptions are drawn from a fixed
+vocabulary, and prints EXPLAIN ANALYZE timings of the statements built by
+``app.search`` for rare, common and multi-word queries, one page each.
+The trigram index is built too when pg_trgm is installed.
+
+Usage:
+    python -m benchmarks.search_tasks --tasks 2000000
+"""
+
+import argparse
+import json
+
+from sqlalchemy import text
+from sqlmodel import SQLModel
+
+from app.db import engine
+from app.pagination import ranked_keyset
+from app.responses import select_task_rows
+from app.schemas.task import Task
+from app.search import TaskSearch
+
+SCHEMA = "bench_search"
+QUERIES = ("zircon", "report", "quarterly report", '"budget review"', "repor")
+PAGE_SIZE = 100
+
+
+def seed(conn, users: int, tasks: int) -> None:
+    """
+    Fill the scratch schema. Descriptions are five words out of 1000; the
+    word ``zircon`` appears in about one task in 100 000.
+    """
+    conn.execute(text(
+        'INSERT INTO "user" (id, email, password, name) '
+        "SELECT i, 'user-' || i || '@example.com', '', 'user-' || i "
+        "FROM generate_series(1, :n) AS i"
+    ), {"n": users})
+    conn.execute(text(
+        "WITH vocabulary AS ("
+        "  SELECT array_agg(CASE i WHEN 0 THEN 'report' WHEN 1 THEN 'quarterly' "
+        "  WHEN 2 THEN 'budget' WHEN 3 THEN 'review' "
+        "  ELSE substr(md5(i::text), 1, 8) END ORDER BY i) AS words "
+        "  FROM generate_series(0, 999) AS i"
+        ") "
+        "INSERT INTO task "
+        "(id, description, due_date, assignee, is_completed, complexity) "
+        "SELECT t.i, "
+        "CASE WHEN t.i % 100000 = 0 THEN 'zircon ' ELSE '' END "
+        "|| array_to_string(ARRAY["
+        "  words[1 + (t.i * 7) % 1000], words[1 + (t.i * 13) % 50],"
+        "  words[1 + (t.i * 31) % 1000], words[1 + (t.i * 17) % 200],"
+        "  words[1 + t.i % 997]], ' '), "
+        "NULL, 1 + (t.i % :users), t.i % 3 = 0, 1 + (t.i % 5) "
+        "FROM vocabulary, generate_series(1, :n) AS t(i)"
+    ), {"n": tasks, "users": users})
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--users", type=int, default=10_000)
+    parser.add_argument("--tasks", type=int, default=2_000_000)
+    args = parser.parse_args()
+
+    with engine.begin() as conn:
+        conn.execute(text(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE"))
+        conn.execute(text(f"CREATE SCHEMA {SCHEMA}"))
+        conn.execute(text(f"SET LOCAL search_path TO {SCHEMA}, public"))
+        ddl = conn.execution_options(schema_translate_map={None: SCHEMA})
+        SQLModel.metadata.create_all(ddl)
+        trigram = conn.execute(text(
+            "SELECT count(*) FROM pg_extension WHERE extname = 'pg_trgm'"
+        )).scalar_one() > 0
+        if trigram:
+            conn.execute(text(
+                "CREATE INDEX ix_task_description_trgm ON task "
+                "USING gin (description gin_trgm_ops)"
+            ))
+        seed(conn, args.users, args.tasks)
+        conn.execute(text("ANALYZE"))
+
+        search = TaskSearch()
+        search.trigram = trigram
+        print(f"{args.tasks} tasks, trigram index: {trigram}\n")
+        for q in QUERIES:
+            matched, rank = search.build(q)
+            statement = ranked_keyset(
+                select_task_rows().add_columns(rank.label("rank")).where(matched),
+                rank, Task.id, PAGE_SIZE, None,
+            )
+            compiled = statement.compile(conn)
+            raw = conn.exec_driver_sql(
+                f"EXPLAIN (ANALYZE, FORMAT JSON) {compiled}", compiled.params
+            ).scalar_one()
+            plan = (json.loads(raw) if isinstance(raw, str) else raw)[0]
+            print(
+                f"{q!r:<22}{plan['Plan']['Actual Rows']:>6} rows"
+                f"{plan['Execution Time']:>10.2f} ms"
+            )
+
+        conn.execute(text(f"DROP SCHEMA {SCHEMA} CASCADE"))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,161 @@
+"""
+Fill the database with a realistic synthetic dataset for load testing.
+
+Users, projects and tasks are written with binary ``COPY`` through
+asyncpg in chunks, so millions of tasks load in minutes. Names and texts
+come from Faker; a pool of generated sentences is sampled for task
+descriptions instead of generating one per task. Due dates fall within
+the partitions of the coming year, about a third of the tasks are
+completed, some of them long enough ago to be archived. The task
+counters are rebuilt and the tables analyzed afterwards.
+
+Seeded rows are not removed, so point ``DB_NAME`` at a scratch database.
+Every seeded user has the password given with ``--password``; their
+emails end with ``@seed.example.com``, which is how ``benchmarks.load``
+finds them.
+
+Usage:
+    python -m benchmarks.seed --users 10000 --projects 1000 --tasks 2000000
+"""
+
+import argparse
+import asyncio
+import random
+import time
+from datetime import date, datetime, timedelta
+
+from faker import Faker
+from sqlalchemy import text
+
+from app.auth.hashing import hash_sync
+from app.config import settings
+from app.db import async_engine, async_session
+from app.logging.partition_handler import create_task_partitions
+from app.logging.stats_handler import rebuild_task_stats
+
+SEED_DOMAIN = "seed.example.com"
+CHUNK_SIZE = 50_000
+DESCRIPTIONS = 20_000
+
+
+async def copy_rows(conn, table: str, columns: list, rows) -> int:
+    """Copy ``rows`` into ``table`` in chunks of ``CHUNK_SIZE``."""
+    driver = (await conn.get_raw_connection()).driver_connection
+    copied = 0
+    chunk = []
+    for row in rows:
+        chunk.append(row)
+        if len(chunk) == CHUNK_SIZE:
+            await driver.copy_records_to_table(
+                table, records=chunk, columns=columns
+            )
+            copied += len(chunk)
+            chunk = []
+    if chunk:
+        await driver.copy_records_to_table(table, records=chunk, columns=columns)
+        copied += len(chunk)
+    return copied
+
+
+async def max_id(conn, table: str) -> int:
+    result = await conn.execute(text(f'SELECT coalesce(max(id), 0) FROM "{table}"'))
+    return result.scalar_one()
+
+
+async def new_ids(conn, table: str, after: int) -> list:
+    result = await conn.execute(
+        text(f'SELECT id FROM "{table}" WHERE id > :after ORDER BY id'),
+        {"after": after},
+    )
+    return list(result.scalars())
+
+
+async def seed(args) -> None:
+    fake = Faker()
+    Faker.seed(args.seed)
+    rng = random.Random(args.seed)
+    password = hash_sync(args.password, settings.bcrypt_rounds)
+    run = f"{int(time.time()):x}"
+    today = date.today()
+    now = datetime.now()
+
+    async with async_session() as session:
+        await create_task_partitions(session, settings.task_partition_months_ahead)
+        await session.commit()
+
+    async with async_engine.connect() as conn:
+        started = time.perf_counter()
+        first_user = await max_id(conn, "user")
+        await copy_rows(conn, "user", ["email", "password", "name"], (
+            (f"{run}-{i}@{SEED_DOMAIN}", password, fake.name())
+            for i in range(args.users)
+        ))
+        first_project = await max_id(conn, "project")
+        await copy_rows(conn, "project", ["name", "description"], (
+            (fake.catch_phrase()[:100], fake.paragraph())
+            for _ in range(args.projects)
+        ))
+        await conn.commit()
+        users = await new_ids(conn, "user", first_user)
+        projects = await new_ids(conn, "project", first_project)
+        print(
+            f"{len(users)} users, {len(projects)} projects "
+            f"in {time.perf_counter() - started:.1f} s"
+        )
+
+        descriptions = [
+            fake.sentence(nb_words=rng.randint(3, 12))[:300]
+            for _ in range(DESCRIPTIONS)
+        ]
+
+        def tasks():
+            for _ in range(args.tasks):
+                completed = rng.random() < 0.3
+                due_date = (
+                    None if rng.random() < 0.1
+                    else today + timedelta(days=rng.randrange(365))
+                )
+                yield (
+                    rng.choice(descriptions),
+                    due_date,
+                    rng.choice(users),
+                    None if rng.random() < 0.2 else rng.choice(projects),
+                    completed,
+                    rng.randint(1, 5),
+                    now - timedelta(minutes=rng.randrange(180 * 24 * 60))
+                    if completed else None,
+                )
+
+        started = time.perf_counter()
+        copied = await copy_rows(conn, "task", [
+            "description", "due_date", "assignee", "project",
+            "is_completed", "complexity", "completed_at",
+        ], tasks())
+        await conn.commit()
+        print(f"{copied} tasks in {time.perf_counter() - started:.1f} s")
+
+    async with async_session() as session:
+        rows = await rebuild_task_stats(session)
+        await session.commit()
+    print(f"Rebuilt {rows} task_stats rows")
+
+    async with async_engine.connect() as conn:
+        conn = await conn.execution_options(isolation_level="AUTOCOMMIT")
+        await conn.execute(text('ANALYZE "user", project, task'))
+    await async_engine.dispose()
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Fill the database with synthetic users, projects and tasks."
+    )
+    parser.add_argument("--users", type=int, default=10_000)
+    parser.add_argument("--projects", type=int, default=1_000)
+    parser.add_argument("--tasks", type=int, default=1_000_000)
+    parser.add_argument("--password", default="benchmark")
+    parser.add_argument("--seed", type=int, default=42)
+    asyncio.run(seed(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
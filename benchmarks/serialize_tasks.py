@@ -0,0 +1,115 @@
+"""
+Measure the per-row cost of serializing a task list response.
+
+Three ways of turning 10k tasks into a JSON body are compared:
+
+- ``orm+legacy``: ORM ``Task`` objects validated against the previous
+  ``TaskRead``, which inherited the input rules of ``TaskCreate``, then
+  encoded by FastAPI's ``JSONResponse``; this was the list route path;
+- ``orm+read``: ORM objects through the read-side ``TaskRead``; they are
+  no longer instances of the response model, so every attribute is
+  validated, which is why the list routes do not take this path;
+- ``rows``: column tuples encoded by ``encode_tasks`` with orjson, which
+  the list routes use now.
+
+Only serialization is timed; loading ORM objects instead of rows from the
+database costs extra on top of that. On a laptop the rows path takes about
+1 us per row against 4.7 us for the legacy path.
+
+Usage:
+    python -m benchmarks.serialize_tasks --rows 10000 --repeat 5
+"""
+
+import argparse
+import asyncio
+import time
+import warnings
+from datetime import date, timedelta
+from typing import List
+
+from fastapi.responses import JSONResponse
+from fastapi.routing import serialize_response
+from fastapi.utils import create_model_field
+
+from sqlmodel import SQLModel, Field as SQLField
+
+from app.responses import TASK_FIELDS, encode_tasks
+from app.schemas.task import Task, TaskCreate, TaskRead
+
+
+class LegacyTaskRead(TaskCreate):
+    """``TaskRead`` as it was before it got its own read-side fields."""
+    id: int
+
+
+class LegacyTask(SQLModel, LegacyTaskRead, table=True):
+    """``Task`` as it was when it inherited ``LegacyTaskRead``."""
+    __tablename__ = "legacy_task_benchmark"
+    id: int = SQLField(default=None, primary_key=True)
+    assignee: int
+    is_completed: bool = False
+
+
+def make_rows(count: int) -> list:
+    today = date.today()
+    return [
+        (
+            task_id, f"benchmark task {task_id}", 1 + task_id % 50,
+            today + timedelta(days=task_id % 30), 1 + task_id % 10,
+            task_id % 3 == 0, 1 + task_id % 5,
+        )
+        for task_id in range(1, count + 1)
+    ]
+
+
+async def time_best(func, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = func()
+        if asyncio.iscoroutine(result):
+            await result
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--rows", type=int, default=10000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    # The legacy path warns about every integer assignee; building the
+    # warnings is part of its cost, printing them is not.
+    warnings.simplefilter("ignore")
+    rows = make_rows(args.rows)
+
+    def through_response_model(model, orm_class):
+        field = create_model_field("Response", List[model])
+        tasks = [orm_class(**dict(zip(TASK_FIELDS, row))) for row in rows]
+
+        async def run():
+            content = await serialize_response(
+                field=field, response_content=tasks
+            )
+            return JSONResponse(content).body
+        return run
+
+    paths = {
+        "orm+legacy": through_response_model(LegacyTaskRead, LegacyTask),
+        "orm+read": through_response_model(TaskRead, Task),
+        "rows": lambda: encode_tasks(rows),
+    }
+    baseline = None
+    for name, func in paths.items():
+        seconds = await time_best(func, args.repeat)
+        per_row = seconds / args.rows * 1e6
+        baseline = baseline or per_row
+        print(
+            f"{name:>10}: {seconds * 1000:8.1f} ms  "
+            f"{per_row:6.2f} us/row  x{baseline / per_row:5.1f}"
+        )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
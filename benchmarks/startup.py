@@ -0,0 +1,107 @@
+"""
+Measure the cold start of the application.
+
+Every run starts a fresh interpreter with ``python -X importtime`` that
+imports ``app.main``, runs its startup, and sends one request, timing
+each step. The script prints the median of the runs and the modules
+with the highest median import time of their own, which are the
+candidates for deferred imports.
+
+Usage:
+    python -m benchmarks.startup --runs 10 --top 15
+"""
+
+import argparse
+import asyncio
+import json
+import re
+import statistics
+import subprocess
+import sys
+import time
+from collections import defaultdict
+
+IMPORT_TIME = re.compile(r"import time:\s+(\d+) \|\s+(\d+) \|(\s*)(\S+)")
+FIRST_PATH = "/tasks/stats/no-project"
+
+
+async def child():
+    """Start the application in this process and print the timings."""
+    started = time.perf_counter()
+    from app.main import app, lifespan
+
+    imported = time.perf_counter()
+    async with lifespan(app):
+        ready = time.perf_counter()
+        # Imported late so that its import time is not counted.
+        import httpx
+
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(
+            transport=transport, base_url="http://test"
+        ) as client:
+            sent = time.perf_counter()
+            (await client.get(FIRST_PATH)).raise_for_status()
+            first = time.perf_counter()
+            (await client.get(FIRST_PATH)).raise_for_status()
+            second = time.perf_counter()
+    print(json.dumps({
+        "import_ms": (imported - started) * 1000,
+        "startup_ms": (ready - imported) * 1000,
+        "first_request_ms": (first - sent) * 1000,
+        "second_request_ms": (second - first) * 1000,
+    }))
+
+
+def run_once() -> tuple:
+    """Start a child interpreter; return its timings and import times."""
+    process = subprocess.run(
+        [sys.executable, "-X", "importtime", "-m", "benchmarks.startup",
+         "--child"],
+        capture_output=True, text=True, check=True,
+    )
+    self_times = {}
+    for line in process.stderr.splitlines():
+        match = IMPORT_TIME.match(line)
+        if match:
+            self_times[match.group(4)] = int(match.group(1)) / 1000
+    timings = json.loads(process.stdout.strip().splitlines()[-1])
+    return timings, self_times
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Measure import, startup and first request times."
+    )
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--top", type=int, default=15)
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.child:
+        asyncio.run(child())
+        return
+
+    timings, self_times = defaultdict(list), defaultdict(list)
+    for _ in range(args.runs):
+        run_timings, run_self_times = run_once()
+        for name, value in run_timings.items():
+            timings[name].append(value)
+        for module, value in run_self_times.items():
+            self_times[module].append(value)
+
+    # Imports measured with -X importtime are slower than plain ones.
+    for name, values in timings.items():
+        print(f"{name:20} {statistics.median(values):8.1f}")
+    print(f"\nTop {args.top} modules by own import time, ms:")
+    medians = {
+        module: statistics.median(values)
+        for module, values in self_times.items()
+    }
+    for module, value in sorted(
+        medians.items(), key=lambda item: item[1], reverse=True
+    )[:args.top]:
+        print(f"{value:8.1f}  {module}")
+
+
+if __name__ == "__main__":
+    main()
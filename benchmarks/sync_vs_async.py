@@ -0,0 +1,130 @@
+"""
+Compare a threadpool-bound sync route with an async route under load.
+
+Both routes run the same task list query, optionally preceded by a
+server-side delay that imitates a slow database. The sync route uses a
+psycopg2 ``Session`` and occupies one of the AnyIO worker threads while
+it waits; the async route uses an asyncpg ``AsyncSession``. Requests are
+sent in-process through the ASGI transport, so no network is involved.
+
+Usage:
+    python -m benchmarks.sync_vs_async --requests 2000 --concurrency 400
+
+The sync route cannot serve more than 40 requests at once (the default
+AnyIO threadpool size), so with a 0.25 s delay it tops out near
+160 req/s, while the async route is limited only by ``--pool-size``.
+Postgres ``max_connections`` must be larger than the pool size.
+"""
+
+import argparse
+import asyncio
+import statistics
+import time
+
+import httpx
+from fastapi import Depends, FastAPI
+from sqlalchemy import create_engine, text
+from sqlalchemy.ext.asyncio import (
+    AsyncSession,
+    async_sessionmaker,
+    create_async_engine,
+)
+from sqlmodel import Session
+
+from app.db import ASYNC_DB_URL, DB_URL
+
+QUERY = text(
+    "SELECT id, description FROM task "
+    "WHERE assignee = :user_id ORDER BY id LIMIT 100"
+)
+DELAY = text("SELECT pg_sleep(:delay)")
+
+
+def build_app(pool_size: int, delay: float) -> FastAPI:
+    """Create an app exposing the same query on a sync and an async route."""
+    engine = create_engine(DB_URL, pool_size=pool_size, max_overflow=0)
+    async_engine = create_async_engine(
+        ASYNC_DB_URL, pool_size=pool_size, max_overflow=0
+    )
+    async_session = async_sessionmaker(async_engine, class_=AsyncSession)
+
+    def get_session():
+        with Session(engine) as session:
+            yield session
+
+    async def get_async_session():
+        async with async_session() as session:
+            yield session
+
+    app = FastAPI()
+
+    @app.get("/sync")
+    def sync_route(session: Session = Depends(get_session)):
+        if delay:
+            session.execute(DELAY, {"delay": delay})
+        return len(session.execute(QUERY, {"user_id": 1}).all())
+
+    @app.get("/async")
+    async def async_route(session: AsyncSession = Depends(get_async_session)):
+        if delay:
+            await session.execute(DELAY, {"delay": delay})
+        result = await session.execute(QUERY, {"user_id": 1})
+        return len(result.all())
+
+    app.state.engines = (engine, async_engine)
+    return app
+
+
+async def drive(app: FastAPI, path: str, requests: int, concurrency: int) -> dict:
+    """Send requests with bounded concurrency and collect latencies."""
+    latencies = []
+    semaphore = asyncio.Semaphore(concurrency)
+    transport = httpx.ASGITransport(app=app)
+
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        async def one():
+            async with semaphore:
+                start = time.perf_counter()
+                response = await client.get(path)
+                response.raise_for_status()
+                latencies.append(time.perf_counter() - start)
+
+        await client.get(path)  # warm up the pool and the route
+        started = time.perf_counter()
+        await asyncio.gather(*(one() for _ in range(requests)))
+        elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    return {
+        "rps": requests / elapsed,
+        "p50_ms": statistics.median(latencies) * 1000,
+        "p99_ms": latencies[int(len(latencies) * 0.99) - 1] * 1000,
+    }
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=400)
+    parser.add_argument("--pool-size", type=int, default=150)
+    parser.add_argument(
+        "--delay", type=float, default=0.25,
+        help="server-side delay per request, seconds",
+    )
+    args = parser.parse_args()
+
+    app = build_app(args.pool_size, args.delay)
+    for path in ("/sync", "/async"):
+        stats = await drive(app, path, args.requests, args.concurrency)
+        print(
+            f"{path:>6}: {stats['rps']:8.1f} req/s  "
+            f"p50 {stats['p50_ms']:7.1f} ms  p99 {stats['p99_ms']:7.1f} ms"
+        )
+
+    engine, async_engine = app.state.engines
+    engine.dispose()
+    await async_engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
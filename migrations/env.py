@@ -1,4 +1,5 @@
 import asyncio
+import re
 from logging.config import fileConfig
 
 from sqlalchemy import pool
@@ -9,7 +10,12 @@ from sqlmodel import SQLModel
 from alembic import context
 
 from app.config import settings as cnf
-from app.schemas.task import Task, User, Project, ProductivityLog
+from app.schemas.cache import ResourceVersion
+from app.schemas.day_off import DayOff
+from app.schemas.job import Job
+from app.schemas.task import (
+    Task, User, Project, ProductivityLog, TaskStats, TaskArchive,
+)
 
 # this is the Alembic Config object, which provides
 # access to the values within the .ini file in use.
@@ -33,6 +39,24 @@ if config.config_file_name is not None:
 # target_metadata = mymodel.Base.metadata
 target_metadata = SQLModel.metadata
 
+# Monthly and default partitions of the task table are created by the
+# create_task_partitions() function, not by migrations.
+TASK_PARTITION = re.compile(r"^task_(p\d{6}|default)$")
+# Indexes that exist only where their extension is available.
+OPTIONAL_INDEXES = {"ix_task_description_trgm"}
+
+
+def include_name(name, type_, parent_names) -> bool:
+    """
+    Leave the partitions of the task table and the optional indexes out of
+    autogenerate.
+    """
+    if type_ == "table":
+        return TASK_PARTITION.match(name) is None
+    if type_ == "index":
+        return name not in OPTIONAL_INDEXES
+    return True
+
 # other values from the config, defined by the needs of env.py,
 # can be acquired:
 # my_important_option = config.get_main_option("my_important_option")
@@ -55,6 +79,7 @@ def run_migrations_offline() -> None:
     context.configure(
         url=url,
         target_metadata=target_metadata,
+        include_name=include_name,
         literal_binds=True,
         dialect_opts={"paramstyle": "named"},
     )
@@ -64,7 +89,11 @@ def run_migrations_offline() -> None:
 
 
 def do_run_migrations(connection: Connection) -> None:
-    context.configure(connection=connection, target_metadata=target_metadata)
+    context.configure(
+        connection=connection,
+        target_metadata=target_metadata,
+        include_name=include_name,
+    )
 
     with context.begin_transaction():
         context.run_migrations()
@@ -0,0 +1,57 @@
+"""task access indexes
+
+Revision ID: 2f7fb2f1a8aa
+Revises: d259f09f4c90
+Create Date: 2026-10-18 12:55:03.114027
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '2f7fb2f1a8aa'
+down_revision: Union[str, None] = 'd259f09f4c90'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # get_or_create_log could insert several logs for one user under
+    # concurrent requests. Keep the most complete one before making
+    # user_id unique.
+    op.execute(
+        """
+        DELETE FROM productivitylog
+        WHERE id IN (
+            SELECT id FROM (
+                SELECT id, row_number() OVER (
+                    PARTITION BY user_id
+                    ORDER BY tasks_completed DESC, id
+                ) AS position
+                FROM productivitylog
+            ) AS ranked
+            WHERE ranked.position > 1
+        )
+        """
+    )
+    # Build the indexes without blocking writes to the tables.
+    with op.get_context().autocommit_block():
+        op.create_index('ix_task_assignee_id', 'task', ['assignee', 'id'], postgresql_concurrently=True)
+        op.create_index('ix_task_project_id', 'task', ['project', 'id'], postgresql_concurrently=True)
+        op.create_index('ix_task_no_project_id', 'task', ['id'], postgresql_where=sa.text('project IS NULL'), postgresql_concurrently=True)
+        op.create_index('ix_task_due_date', 'task', ['due_date'], postgresql_concurrently=True)
+        op.create_index('ix_productivitylog_user_id', 'productivitylog', ['user_id'], unique=True, postgresql_concurrently=True)
+        op.create_index('ix_user_name', 'user', ['name'], postgresql_concurrently=True)
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index('ix_user_name', table_name='user', postgresql_concurrently=True)
+        op.drop_index('ix_productivitylog_user_id', table_name='productivitylog', postgresql_concurrently=True)
+        op.drop_index('ix_task_due_date', table_name='task', postgresql_concurrently=True)
+        op.drop_index('ix_task_no_project_id', table_name='task', postgresql_concurrently=True)
+        op.drop_index('ix_task_project_id', table_name='task', postgresql_concurrently=True)
+        op.drop_index('ix_task_assignee_id', table_name='task', postgresql_concurrently=True)
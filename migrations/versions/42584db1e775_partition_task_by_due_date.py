@@ -0,0 +1,142 @@
+"""partition task by due date
+
+Revision ID: 42584db1e775
+Revises: be0592290c08
+Create Date: 2026-10-18 17:41:12.208315
+
+The task table is recreated as a table partitioned by range of
+``due_date``: one partition per month and a default partition for tasks
+without a due date. Existing rows are copied in the migration transaction,
+which holds an exclusive lock on the task table until it commits, so run
+it in a maintenance window. Indexes are built after the copy; a
+partitioned table cannot be indexed concurrently.
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+
+
+# revision identifiers, used by Alembic.
+revision: str = '42584db1e775'
+down_revision: Union[str, None] = 'be0592290c08'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Months of partitions created ahead of the current one.
+MONTHS_AHEAD = 12
+
+COLUMNS = (
+    "id, description, due_date, assignee, project, is_completed, "
+    "complexity, completed_at"
+)
+
+CREATE_TASK_PARTITIONS = """
+CREATE OR REPLACE FUNCTION create_task_partitions(first_day date, last_day date)
+RETURNS integer
+LANGUAGE plpgsql AS $$
+DECLARE
+    month date := date_trunc('month', first_day)::date;
+    bound date;
+    part text;
+    created integer := 0;
+BEGIN
+    -- Concurrent callers, e.g. workers starting together, take turns.
+    PERFORM pg_advisory_xact_lock(hashtext('create_task_partitions'));
+    WHILE month <= last_day LOOP
+        bound := (month + interval '1 month')::date;
+        part := 'task_p' || to_char(month, 'YYYYMM');
+        IF to_regclass(part) IS NULL THEN
+            EXECUTE 'CREATE TABLE ' || quote_ident(part)
+                || ' (LIKE task INCLUDING DEFAULTS)';
+            EXECUTE 'WITH moved AS (DELETE FROM task_default'
+                || ' WHERE due_date >= ' || quote_literal(month)
+                || ' AND due_date < ' || quote_literal(bound)
+                || ' RETURNING *) INSERT INTO ' || quote_ident(part)
+                || ' SELECT * FROM moved';
+            EXECUTE 'ALTER TABLE task ATTACH PARTITION ' || quote_ident(part)
+                || ' FOR VALUES FROM (' || quote_literal(month)
+                || ') TO (' || quote_literal(bound) || ')';
+            created := created + 1;
+        END IF;
+        month := bound;
+    END LOOP;
+    RETURN created;
+END
+$$
+"""
+
+
+def create_indexes() -> None:
+    op.create_index('ix_task_assignee_id', 'task', ['assignee', 'id'], unique=False)
+    op.create_index('ix_task_completed_at', 'task', ['completed_at'], unique=False, postgresql_where=sa.text('is_completed'))
+    op.create_index('ix_task_due_date', 'task', ['due_date'], unique=False)
+    op.create_index('ix_task_no_project_id', 'task', ['id'], unique=False, postgresql_where=sa.text('project IS NULL'))
+    op.create_index('ix_task_project_id', 'task', ['project', 'id'], unique=False)
+
+
+def upgrade() -> None:
+    # The sequence would be dropped with the old table otherwise.
+    op.execute("ALTER SEQUENCE task_id_seq OWNED BY NONE")
+    op.rename_table('task', 'task_unpartitioned')
+    # ### commands auto generated by Alembic - please adjust! ###
+    op.create_table('task',
+    sa.Column('description', sqlmodel.sql.sqltypes.AutoString(length=300), nullable=False),
+    sa.Column('due_date', sa.Date(), nullable=True),
+    sa.Column('assignee', sa.Integer(), nullable=False),
+    sa.Column('project', sa.Integer(), nullable=True),
+    sa.Column('id', sa.Integer(), server_default=sa.text("nextval('task_id_seq')"), nullable=False),
+    sa.Column('is_completed', sa.Boolean(), nullable=False),
+    sa.Column('complexity', sa.Integer(), server_default=sa.text('1'), nullable=False),
+    sa.Column('completed_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['assignee'], ['user.id'], name='task_assignee_fkey'),
+    sa.ForeignKeyConstraint(['project'], ['project.id'], name='task_project_fkey'),
+    postgresql_partition_by='RANGE (due_date)'
+    )
+    # ### end Alembic commands ###
+    op.execute("ALTER SEQUENCE task_id_seq OWNED BY task.id")
+    op.execute("CREATE TABLE task_default PARTITION OF task DEFAULT")
+    op.execute(CREATE_TASK_PARTITIONS)
+    op.execute(
+        "SELECT create_task_partitions("
+        "least(min(due_date), current_date), "
+        f"(current_date + interval '{MONTHS_AHEAD} months')::date"
+        ") FROM task_unpartitioned"
+    )
+    op.execute(
+        f"INSERT INTO task ({COLUMNS}) "
+        f"SELECT {COLUMNS} FROM task_unpartitioned"
+    )
+    op.drop_table('task_unpartitioned')
+    op.create_index('ix_task_id', 'task', ['id'], unique=False)
+    create_indexes()
+    op.execute("ANALYZE task")
+
+
+def downgrade() -> None:
+    op.execute("ALTER SEQUENCE task_id_seq OWNED BY NONE")
+    op.rename_table('task', 'task_partitioned')
+    op.create_table('task',
+    sa.Column('description', sqlmodel.sql.sqltypes.AutoString(length=300), nullable=False),
+    sa.Column('due_date', sa.Date(), nullable=True),
+    sa.Column('assignee', sa.Integer(), nullable=False),
+    sa.Column('project', sa.Integer(), nullable=True),
+    sa.Column('id', sa.Integer(), server_default=sa.text("nextval('task_id_seq')"), nullable=False),
+    sa.Column('is_completed', sa.Boolean(), nullable=False),
+    sa.Column('complexity', sa.Integer(), server_default=sa.text('1'), nullable=False),
+    sa.Column('completed_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['assignee'], ['user.id'], name='task_assignee_fkey'),
+    sa.ForeignKeyConstraint(['project'], ['project.id'], name='task_project_fkey'),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.execute("ALTER SEQUENCE task_id_seq OWNED BY task.id")
+    op.execute(
+        f"INSERT INTO task ({COLUMNS}) "
+        f"SELECT {COLUMNS} FROM task_partitioned"
+    )
+    # Drops the partitions as well.
+    op.drop_table('task_partitioned')
+    op.execute("DROP FUNCTION create_task_partitions(date, date)")
+    create_indexes()
@@ -0,0 +1,128 @@
+"""task search
+
+Revision ID: e94cabb23c80
+Revises: 42584db1e775
+Create Date: 2026-10-18 18:34:50.112907
+
+Adds the generated full-text search column of the task description and
+its GIN index. The trigram index for substring and fuzzy matching needs
+the pg_trgm extension; it is skipped where the extension is not
+available, and the search then matches whole words only.
+
+Adding a stored generated column rewrites the task table.
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e94cabb23c80'
+down_revision: Union[str, None] = '42584db1e775'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# New partitions must carry the generated column, and the rows moved out
+# of the default partition are copied without it.
+CREATE_TASK_PARTITIONS = """
+CREATE OR REPLACE FUNCTION create_task_partitions(first_day date, last_day date)
+RETURNS integer
+LANGUAGE plpgsql AS $$
+DECLARE
+    month date := date_trunc('month', first_day)::date;
+    bound date;
+    part text;
+    cols text;
+    created integer := 0;
+BEGIN
+    -- Concurrent callers, e.g. workers starting together, take turns.
+    PERFORM pg_advisory_xact_lock(hashtext('create_task_partitions'));
+    -- Generated columns are computed by the partition, not copied.
+    SELECT string_agg(quote_ident(attname), ', ' ORDER BY attnum) INTO cols
+    FROM pg_attribute
+    WHERE attrelid = 'task'::regclass AND attnum > 0
+        AND NOT attisdropped AND attgenerated = '';
+    WHILE month <= last_day LOOP
+        bound := (month + interval '1 month')::date;
+        part := 'task_p' || to_char(month, 'YYYYMM');
+        IF to_regclass(part) IS NULL THEN
+            EXECUTE 'CREATE TABLE ' || quote_ident(part)
+                || ' (LIKE task INCLUDING DEFAULTS INCLUDING GENERATED)';
+            EXECUTE 'WITH moved AS (DELETE FROM task_default'
+                || ' WHERE due_date >= ' || quote_literal(month)
+                || ' AND due_date < ' || quote_literal(bound)
+                || ' RETURNING ' || cols || ') INSERT INTO '
+                || quote_ident(part) || ' (' || cols || ') SELECT '
+                || cols || ' FROM moved';
+            EXECUTE 'ALTER TABLE task ATTACH PARTITION ' || quote_ident(part)
+                || ' FOR VALUES FROM (' || quote_literal(month)
+                || ') TO (' || quote_literal(bound) || ')';
+            created := created + 1;
+        END IF;
+        month := bound;
+    END LOOP;
+    RETURN created;
+END
+$$
+"""
+
+PREVIOUS_CREATE_TASK_PARTITIONS = """
+CREATE OR REPLACE FUNCTION create_task_partitions(first_day date, last_day date)
+RETURNS integer
+LANGUAGE plpgsql AS $$
+DECLARE
+    month date := date_trunc('month', first_day)::date;
+    bound date;
+    part text;
+    created integer := 0;
+BEGIN
+    -- Concurrent callers, e.g. workers starting together, take turns.
+    PERFORM pg_advisory_xact_lock(hashtext('create_task_partitions'));
+    WHILE month <= last_day LOOP
+        bound := (month + interval '1 month')::date;
+        part := 'task_p' || to_char(month, 'YYYYMM');
+        IF to_regclass(part) IS NULL THEN
+            EXECUTE 'CREATE TABLE ' || quote_ident(part)
+                || ' (LIKE task INCLUDING DEFAULTS)';
+            EXECUTE 'WITH moved AS (DELETE FROM task_default'
+                || ' WHERE due_date >= ' || quote_literal(month)
+                || ' AND due_date < ' || quote_literal(bound)
+                || ' RETURNING *) INSERT INTO ' || quote_ident(part)
+                || ' SELECT * FROM moved';
+            EXECUTE 'ALTER TABLE task ATTACH PARTITION ' || quote_ident(part)
+                || ' FOR VALUES FROM (' || quote_literal(month)
+                || ') TO (' || quote_literal(bound) || ')';
+            created := created + 1;
+        END IF;
+        month := bound;
+    END LOOP;
+    RETURN created;
+END
+$$
+"""
+
+
+def upgrade() -> None:
+    # ### commands auto generated by Alembic - please adjust! ###
+    op.add_column('task', sa.Column('search_vector', postgresql.TSVECTOR(), sa.Computed("to_tsvector('simple', description)", persisted=True), nullable=True))
+    op.create_index('ix_task_search_vector', 'task', ['search_vector'], unique=False, postgresql_using='gin')
+    # ### end Alembic commands ###
+    op.execute(CREATE_TASK_PARTITIONS)
+    available = op.get_bind().execute(sa.text(
+        "SELECT 1 FROM pg_available_extensions WHERE name = 'pg_trgm'"
+    )).scalar()
+    if available:
+        op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+        op.create_index('ix_task_description_trgm', 'task', ['description'], unique=False, postgresql_using='gin', postgresql_ops={'description': 'gin_trgm_ops'})
+
+
+def downgrade() -> None:
+    op.execute("DROP INDEX IF EXISTS ix_task_description_trgm")
+    op.execute(PREVIOUS_CREATE_TASK_PARTITIONS)
+    # ### commands auto generated by Alembic - please adjust! ###
+    op.drop_index('ix_task_search_vector', table_name='task', postgresql_using='gin')
+    op.drop_column('task', 'search_vector')
+    # ### end Alembic commands ###
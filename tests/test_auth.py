@@ -1,5 +1,7 @@
+import pytest
 from fastapi.testclient import TestClient
 import faker
+from app.auth.user_cache import MemoryBackend, user_cache
 from app.main import app
 
 client = TestClient(app)
@@ -12,6 +14,15 @@ client.new_user_id = 0
 client.auth_token = ""
 
 
+@pytest.fixture(scope="module", autouse=True)
+def lifespan():
+    """
+    Run all requests of the module on one event loop.
+    """
+    with client:
+        yield
+
+
 def test_signup():
     response = client.post("/auth/signup",
                            json={"email": client.fake_user_email,
@@ -35,3 +46,24 @@ def test_me():
     response = client.get("/utils/me", headers={"Authorization": f"Bearer {client.auth_token}"})
     assert response.status_code == 200
     assert response.json() == client.new_user_id
+
+
+def test_me_is_cached():
+    response = client.get("/utils/user-cache-stats")
+    hits = response.json()["hits"]
+    response = client.get("/utils/me", headers={"Authorization": f"Bearer {client.auth_token}"})
+    assert response.json() == client.new_user_id
+    assert client.get("/utils/user-cache-stats").json()["hits"] == hits + 1
+
+
+def test_me_with_shared_cache(monkeypatch):
+    """
+    Test that a cache miss stores the user in the shared backend.
+    """
+    backend = MemoryBackend()
+    monkeypatch.setattr(user_cache, "backend", backend)
+    user_cache.invalidate(client.fake_user_email)
+    response = client.get("/utils/me", headers={"Authorization": f"Bearer {client.auth_token}"})
+    assert response.status_code == 200
+    assert response.json() == client.new_user_id
+    assert backend._data[user_cache.prefix + client.fake_user_email]
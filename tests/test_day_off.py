@@ -0,0 +1,179 @@
+import asyncio
+import calendar
+from datetime import date, datetime
+
+import httpx
+from sqlalchemy import delete, extract
+from sqlalchemy.ext.asyncio import (
+    AsyncSession,
+    async_sessionmaker,
+    create_async_engine,
+)
+
+from app.calendar.day_off import DayOffService
+from app.db import ASYNC_DB_URL
+from app.schemas.day_off import DayOff
+
+YEAR = 2001
+
+
+def stub_calendar(requests: list, fail: bool = False, delay: float = 0.0):
+    """
+    Stand-in for isdayoff.ru: weekends are days off.
+    """
+    async def handler(request: httpx.Request) -> httpx.Response:
+        requests.append(request)
+        await asyncio.sleep(delay)
+        if fail:
+            return httpx.Response(500)
+        params = request.url.params
+        if "year" in params:
+            year = int(params["year"])
+            start, count = date(year, 1, 1), 365 + calendar.isleap(year)
+        else:
+            start = datetime.strptime(params["date1"], "%Y%m%d").date()
+            end = datetime.strptime(params["date2"], "%Y%m%d").date()
+            count = (end - start).days + 1
+        return httpx.Response(200, text="".join(
+            "1" if date.fromordinal(start.toordinal() + i).weekday() >= 5
+            else "0"
+            for i in range(count)
+        ))
+    return httpx.MockTransport(handler)
+
+
+def run_with_service(scenario, transport, **options):
+    """
+    Run a scenario with fresh services sharing one engine, then drop the
+    cached test year.
+    """
+    async def main():
+        engine = create_async_engine(ASYNC_DB_URL)
+        session_factory = async_sessionmaker(engine, class_=AsyncSession)
+
+        def make_service():
+            return DayOffService(
+                base_url="http://calendar.test",
+                timeout=options.get("timeout", 1.0),
+                max_connections=5,
+                cache_size=100,
+                failure_threshold=2,
+                reset_timeout=60,
+                session_factory=session_factory,
+                transport=transport,
+            )
+
+        try:
+            return await scenario(make_service)
+        finally:
+            async with session_factory() as session:
+                await session.execute(
+                    delete(DayOff).where(extract("year", DayOff.day) == YEAR)
+                )
+                await session.commit()
+            await engine.dispose()
+
+    return asyncio.run(main())
+
+
+def test_concurrent_lookups_share_one_call():
+    """
+    Test that concurrent lookups of a date make one upstream call and that
+    the answer is reused from memory and from the database.
+    """
+    requests = []
+
+    async def scenario(make_service):
+        service = make_service()
+        saturday = date(YEAR, 1, 6)
+        answers = await asyncio.gather(
+            *(service.is_day_off(saturday) for _ in range(10))
+        )
+        assert await service.is_day_off(saturday) is True
+        other = make_service()
+        assert await other.is_day_off(saturday) is True
+        await service.stop()
+        await other.stop()
+        return answers, service.stats(), other.stats()
+
+    answers, stats, other_stats = run_with_service(
+        scenario, stub_calendar(requests, delay=0.05)
+    )
+    assert answers == [True] * 10
+    assert len(requests) == 1
+    assert stats["hits"] == 1
+    assert other_stats["db_hits"] == 1
+    assert other_stats["upstream_calls"] == 0
+
+
+def test_prefill_year():
+    """
+    Test that a whole year is loaded with one upstream call.
+    """
+    requests = []
+
+    async def scenario(make_service):
+        service = make_service()
+        days = await service.prefill(YEAR)
+        answers = [
+            await service.is_day_off(date(YEAR, 1, day)) for day in (5, 6)
+        ]
+        await service.stop()
+        return days, answers
+
+    days, answers = run_with_service(scenario, stub_calendar(requests))
+    assert days == 365
+    assert answers == [False, True]
+    assert len(requests) == 1
+    assert requests[0].url.params["year"] == str(YEAR)
+
+
+def test_range_lookup_is_batched():
+    """
+    Test that a range is resolved with one query and one upstream call for
+    the dates that are not cached.
+    """
+    requests = []
+
+    async def scenario(make_service):
+        service = make_service()
+        await service.is_day_off(date(YEAR, 1, 3))
+        other = make_service()
+        days = await other.days_off(date(YEAR, 1, 1), date(YEAR, 1, 31))
+        again = await other.days_off(date(YEAR, 1, 1), date(YEAR, 1, 31))
+        await service.stop()
+        await other.stop()
+        return days, again, other.stats()
+
+    days, again, stats = run_with_service(scenario, stub_calendar(requests))
+    assert len(days) == 31
+    assert days == again
+    assert [day.day for day, off in days.items() if off][:2] == [6, 7]
+    assert len(requests) == 2
+    assert requests[1].url.params["date1"] == f"{YEAR}0101"
+    assert requests[1].url.params["date2"] == f"{YEAR}0131"
+    assert stats["db_hits"] == 1
+    assert stats["hits"] == 31
+
+
+def test_circuit_breaker_opens():
+    """
+    Test that a failing or slow service is not called once the breaker
+    is open and that lookups degrade to unknown.
+    """
+    for transport in (
+        stub_calendar([], fail=True), stub_calendar([], delay=2.0)
+    ):
+        async def scenario(make_service):
+            service = make_service()
+            answers = [
+                await service.is_day_off(date(YEAR, 1, day))
+                for day in range(1, 5)
+            ]
+            await service.stop()
+            return answers, service.stats()
+
+        answers, stats = run_with_service(scenario, transport, timeout=0.1)
+        assert answers == [None] * 4
+        assert stats["upstream_calls"] == 2
+        assert stats["breaker"] == "open"
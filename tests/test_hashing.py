@@ -0,0 +1,76 @@
+import asyncio
+
+from fastapi import HTTPException
+
+from app.auth.hashing import HashingPool
+
+
+def test_hash_and_verify_in_worker_process():
+    """
+    Test hashing and verification through the process pool.
+    """
+    async def scenario():
+        pool = HashingPool(workers=1, queue_size=1, rounds=4)
+        try:
+            hashed = await pool.hash("secret")
+            return hashed, await pool.verify("secret", hashed), \
+                await pool.verify("wrong", hashed)
+        finally:
+            pool.shutdown()
+
+    hashed, good, bad = asyncio.run(scenario())
+    assert hashed.startswith("$2b$04$")
+    assert good == (True, None)
+    assert bad == (False, None)
+
+
+def test_rehash_when_work_factor_changes():
+    """
+    Test that a hash with an outdated work factor is replaced on verify.
+    """
+    async def scenario():
+        old = await HashingPool(workers=0, queue_size=0, rounds=4).hash("pw")
+        return await HashingPool(workers=0, queue_size=0, rounds=5).verify("pw", old)
+
+    verified, new_hash = asyncio.run(scenario())
+    assert verified
+    assert new_hash.startswith("$2b$05$")
+
+
+def test_reject_when_pool_is_full():
+    """
+    Test that calls beyond the workers and the queue get 503.
+    """
+    async def scenario():
+        pool = HashingPool(workers=1, queue_size=0, rounds=10)
+        try:
+            return await asyncio.gather(
+                pool.hash("a"), pool.hash("b"), return_exceptions=True
+            )
+        finally:
+            pool.shutdown()
+
+    first, second = asyncio.run(scenario())
+    assert isinstance(first, str)
+    assert isinstance(second, HTTPException)
+    assert second.status_code == 503
+
+
+def test_broken_pool_is_replaced():
+    """
+    Test that the pool recovers after its worker process dies.
+    """
+    async def scenario():
+        pool = HashingPool(workers=1, queue_size=1, rounds=4)
+        try:
+            hashed = await pool.hash("secret")
+            for process in list(pool._executor._processes.values()):
+                process.kill()
+                process.join()
+            return hashed, await pool.verify("secret", hashed)
+        finally:
+            pool.shutdown()
+
+    hashed, verified = asyncio.run(scenario())
+    assert hashed.startswith("$2b$04$")
+    assert verified == (True, None)
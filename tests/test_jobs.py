@@ -0,0 +1,200 @@
+import asyncio
+
+from sqlalchemy import delete, func, update
+from sqlalchemy.ext.asyncio import (
+    AsyncSession,
+    async_sessionmaker,
+    create_async_engine,
+)
+
+from app.db import ASYNC_DB_URL
+from app.jobs.worker import JobWorker, enqueue, job_handler, job_worker
+from app.schemas.job import Job
+
+calls = []
+
+
+@job_handler("test-add")
+async def add_job(job_id: str, a: int, b: int):
+    return {"sum": a + b}
+
+
+@job_handler("test-flaky")
+async def flaky_job(job_id: str, failures: int):
+    calls.append(job_id)
+    if calls.count(job_id) <= failures:
+        raise RuntimeError("not yet")
+    return "ok"
+
+
+@job_handler("test-count")
+async def count_job(job_id: str):
+    calls.append(job_id)
+
+
+@job_handler("test-slow")
+async def slow_job(job_id: str):
+    await asyncio.sleep(10)
+
+
+def with_worker(scenario):
+    """
+    Run a coroutine function with a session factory and a dedicated worker
+    of the test job kinds.
+    """
+    async def run():
+        engine = create_async_engine(ASYNC_DB_URL)
+        session_factory = async_sessionmaker(
+            engine, class_=AsyncSession, expire_on_commit=False
+        )
+        worker = JobWorker(
+            session_factory=session_factory,
+            concurrency=4,
+            poll_interval=0.1,
+            retry_delay=0,
+            kinds=["test-add", "test-flaky", "test-count", "test-slow"],
+        )
+        try:
+            return await scenario(session_factory, worker)
+        finally:
+            await engine.dispose()
+
+    return asyncio.run(run())
+
+
+def run_jobs(*jobs: dict) -> list:
+    """
+    Enqueue jobs, run them with a dedicated worker and return their rows.
+    """
+    async def scenario(session_factory, worker):
+        async with session_factory() as session:
+            ids = [await enqueue(session, **job) for job in jobs]
+            await session.commit()
+        await worker.run_pending()
+        async with session_factory() as session:
+            rows = [await session.get(Job, job_id) for job_id in ids]
+            await session.execute(delete(Job).where(Job.id.in_(ids)))
+            await session.commit()
+        return rows
+
+    return with_worker(scenario)
+
+
+def test_job_result_is_stored():
+    """
+    Test that a finished job keeps its result in the database.
+    """
+    jobs = run_jobs(
+        *({"kind": "test-add", "payload": {"a": i, "b": 1}} for i in range(8))
+    )
+    assert [job.status for job in jobs] == ["done"] * 8
+    assert [job.result for job in jobs] == [{"sum": i + 1} for i in range(8)]
+    assert all(job.attempts == 1 and job.finished_at for job in jobs)
+
+
+def test_failed_job_is_retried():
+    """
+    Test that a failing job is retried until it runs out of attempts.
+    """
+    recovered, failed = run_jobs(
+        {"kind": "test-flaky", "payload": {"failures": 2}, "max_attempts": 3},
+        {"kind": "test-flaky", "payload": {"failures": 5}, "max_attempts": 2},
+    )
+    assert (recovered.status, recovered.attempts) == ("done", 3)
+    assert recovered.result == "ok"
+    assert (failed.status, failed.attempts) == ("failed", 2)
+    assert "RuntimeError: not yet" in failed.error
+
+
+def test_job_timeout():
+    """
+    Test that a job running longer than its timeout fails.
+    """
+    (job,) = run_jobs(
+        {"kind": "test-slow", "max_attempts": 1, "timeout": 0.2}
+    )
+    assert job.status == "failed"
+    assert job.error.startswith("Timed out")
+
+
+def test_worker_is_woken_after_commit():
+    """
+    Test that enqueueing wakes the worker only once the job is committed.
+    """
+    async def scenario(session_factory, worker):
+        job_worker._wakeup.clear()
+        async with session_factory() as session:
+            job_id = await enqueue(session, "test-add", {"a": 1, "b": 2})
+            await session.flush()
+            assert not job_worker._wakeup.is_set()
+            await session.commit()
+            assert job_worker._wakeup.is_set()
+            await session.execute(delete(Job).where(Job.id == job_id))
+            await session.commit()
+
+    with_worker(scenario)
+
+
+def test_stale_claim_does_not_finish_job():
+    """
+    Test that a runner whose claim expired does not overwrite the outcome
+    of the job claimed again by another runner.
+    """
+    async def scenario(session_factory, worker):
+        async with session_factory() as session:
+            job_id = await enqueue(session, "test-add", {"a": 1, "b": 2})
+            await session.commit()
+        (stale,) = await worker.claim(1)
+        async with session_factory() as session:
+            await session.execute(
+                update(Job).where(Job.id == job_id)
+                .values(locked_until=func.localtimestamp())
+            )
+            await session.commit()
+        (current,) = await worker.claim(1)
+        assert (stale.id, current.attempts) == (job_id, 2)
+
+        await worker.run(stale)
+        async with session_factory() as session:
+            job = await session.get(Job, job_id)
+            assert job.status == "running"
+            assert job.locked_until == current.locked_until
+        await worker.run(current)
+        async with session_factory() as session:
+            job = await session.get(Job, job_id)
+            await session.execute(delete(Job).where(Job.id == job_id))
+            await session.commit()
+        return job
+
+    job = with_worker(scenario)
+    assert (job.status, job.attempts, job.result) == ("done", 2, {"sum": 3})
+
+
+def test_expired_lease_without_attempts_fails():
+    """
+    Test that a job whose last attempt lost its lease fails instead of
+    running again.
+    """
+    async def scenario(session_factory, worker):
+        async with session_factory() as session:
+            job_id = await enqueue(session, "test-count", max_attempts=1)
+            await session.commit()
+        await worker.claim(1)
+        async with session_factory() as session:
+            await session.execute(
+                update(Job).where(Job.id == job_id)
+                .values(locked_until=func.localtimestamp())
+            )
+            await session.commit()
+        assert await worker.run_pending() == 0
+        async with session_factory() as session:
+            job = await session.get(Job, job_id)
+            await session.execute(delete(Job).where(Job.id == job_id))
+            await session.commit()
+        return job
+
+    job = with_worker(scenario)
+    assert (job.status, job.attempts) == ("failed", 1)
+    assert job.error == "Lease expired, no attempts left"
+    assert job.finished_at is not None
+    assert job.id not in calls
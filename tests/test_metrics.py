@@ -0,0 +1,136 @@
+import logging
+
+import pytest
+from fastapi import Depends, FastAPI
+from fastapi.testclient import TestClient
+from prometheus_client import REGISTRY
+from sqlalchemy import text
+from sqlalchemy.exc import DBAPIError
+from sqlmodel import Session
+
+from app.db import get_engine, get_session
+from app.main import app
+from app.metrics import MetricsMiddleware, parameter_shape, query_budget
+
+
+def test_metrics():
+    """
+    Test that requests and their queries are counted by route template.
+    """
+    with TestClient(app) as client:
+        assert client.get("/utils/test-db").status_code == 200
+        client.get("/tasks/stats/user/0")
+        assert client.get("/no-such-page").status_code == 404
+        response = client.get("/metrics")
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain")
+    body = response.text
+    assert (
+        'http_requests_total{method="GET",route="/utils/test-db",status="200"}'
+        in body
+    )
+    assert 'route="/tasks/stats/user/{user_id}"' in body
+    assert 'route="unmatched",status="404"' in body
+    assert 'http_request_db_queries_bucket{le="1.0",route="/utils/test-db"}' in body
+    assert 'db_query_duration_seconds_count{engine="async"}' in body
+    assert 'http_requests_in_progress{method="GET"}' in body
+
+
+def test_server_timing():
+    """
+    Test the Server-Timing header with the queries of the request.
+    """
+    demo = FastAPI()
+    demo.add_middleware(MetricsMiddleware, server_timing=True)
+
+    @demo.get("/two-queries")
+    def two_queries(session: Session = Depends(get_session)):
+        session.execute(text("SELECT 1"))
+        session.execute(text("SELECT 2"))
+        return {}
+
+    with TestClient(demo) as client:
+        header = client.get("/two-queries").headers["server-timing"]
+    db, total = header.split(", ")
+    assert db.startswith("db;dur=") and db.endswith(';desc="2 queries"')
+    assert total.startswith("total;dur=")
+
+
+def test_failed_query():
+    """
+    Test that a failed query is counted and leaves no state on its
+    pooled connection.
+    """
+    def errors():
+        return REGISTRY.get_sample_value(
+            "db_query_errors_total", {"engine": "sync"}
+        ) or 0
+
+    failed = errors()
+    with get_engine().connect() as conn:
+        with pytest.raises(DBAPIError):
+            conn.execute(text("SELECT 1 / 0"))
+        conn.rollback()
+        assert "query_started" not in conn.info
+        assert conn.execute(text("SELECT 1")).scalar() == 1
+    assert errors() == failed + 1
+
+    demo = FastAPI()
+    demo.add_middleware(MetricsMiddleware, server_timing=True)
+
+    @demo.get("/failing")
+    def failing(session: Session = Depends(get_session)):
+        try:
+            session.execute(text("SELECT 1 / 0"))
+        except DBAPIError:
+            session.rollback()
+        return {}
+
+    with TestClient(demo) as client:
+        header = client.get("/failing").headers["server-timing"]
+    assert header.split(", ")[0].endswith(';desc="1 queries"')
+
+
+def test_repeated_statements(caplog):
+    """
+    Test that statements repeated within a request are logged in query
+    debug mode and counted by ``query_budget``.
+    """
+    demo = FastAPI()
+    demo.add_middleware(
+        MetricsMiddleware, query_debug=True, repeat_threshold=3
+    )
+
+    @demo.get("/items")
+    def items(session: Session = Depends(get_session)):
+        for item_id in range(3):
+            session.execute(text("SELECT :id"), {"id": item_id})
+        session.execute(text("SELECT 1"))
+        return {}
+
+    with TestClient(demo) as client:
+        with pytest.raises(AssertionError, match="4 queries, at most 3"):
+            with query_budget(3):
+                client.get("/items")
+        caplog.clear()
+        with caplog.at_level(logging.WARNING, logger="app.metrics"):
+            with query_budget(4):
+                client.get("/items")
+
+    repeated = [
+        record.getMessage() for record in caplog.records
+        if "N+1" in record.getMessage()
+    ]
+    assert repeated == [
+        "Possible N+1 in GET /items, statement run 3 times: SELECT %(id)s"
+    ]
+
+
+def test_parameter_shape():
+    """
+    Test that parameters are described by their types only.
+    """
+    assert parameter_shape((1, "secret")) == "(int, str)"
+    assert parameter_shape({"id": 1}) == "{'id': int}"
+    assert parameter_shape([{"id": 1}, {"id": 2}], True) == "2 x {'id': int}"
@@ -0,0 +1,45 @@
+from sqlalchemy import text
+
+from app.db import engine
+
+PARTITION_OF_TASK = text(
+    "SELECT CAST(tableoid AS regclass)::text FROM task WHERE id = :id"
+)
+
+
+def test_create_task_partitions():
+    """
+    A task beyond the last partition waits in the default partition and
+    moves to its month's partition once that is created.
+    """
+    with engine.connect() as conn:
+        # Everything, the new partitions included, is rolled back.
+        user_id = conn.execute(text(
+            'INSERT INTO "user" (email, password, name) '
+            "VALUES ('partition@example.com', '', 'partition') "
+            "RETURNING id"
+        )).scalar_one()
+        task_id, no_date_id = conn.execute(text(
+            "INSERT INTO task (description, due_date, assignee, "
+            "is_completed, complexity) "
+            "VALUES ('later', '2101-03-15', :user_id, false, 1), "
+            "('someday', NULL, :user_id, false, 1) RETURNING id"
+        ), {"user_id": user_id}).scalars().all()
+        assert conn.execute(
+            PARTITION_OF_TASK, {"id": task_id}
+        ).scalar_one() == "task_default"
+
+        created = conn.execute(text(
+            "SELECT create_task_partitions('2101-02-20', '2101-03-01')"
+        )).scalar_one()
+        assert created == 2
+        assert conn.execute(
+            PARTITION_OF_TASK, {"id": task_id}
+        ).scalar_one() == "task_p210103"
+        assert conn.execute(
+            PARTITION_OF_TASK, {"id": no_date_id}
+        ).scalar_one() == "task_default"
+        assert conn.execute(text(
+            "SELECT create_task_partitions('2101-03-01', '2101-03-31')"
+        )).scalar_one() == 0
+        conn.rollback()
@@ -1,5 +1,14 @@
+import json
+import time
+from datetime import date
+from concurrent.futures import ThreadPoolExecutor
+import pytest
 from fastapi.testclient import TestClient
 import faker 
+from app.calendar.day_off import day_off_service
+from app.db import engines
+from app.metrics import query_budget
+from app.pagination import encode_cursor
 from app.main import app  # Assuming your FastAPI app is defined in app/main.py
 
 client = TestClient(app)
@@ -9,6 +18,58 @@ client.fake_user_email = fake.email()
 client.fake_user_password = fake.password()
 client.fake_user_name = fake.first_name()
 
+
+@pytest.fixture(scope="module", autouse=True)
+def lifespan():
+    """
+    Run all requests of the module on one event loop.
+    """
+    with client:
+        yield
+
+
+def new_user() -> tuple:
+    """
+    Sign up and log in a user with a unique name and email.
+
+    Returns:
+        tuple: The user ID, the user name and the authorization headers.
+    """
+    name = f"{fake.first_name()}-{fake.uuid4()}"
+    email, password = f"{fake.uuid4()}@example.com", fake.password()
+    user_id = client.post(
+        "/auth/signup",
+        json={"email": email, "password": password, "name": name},
+    ).json()
+    token = client.post(
+        "/auth/login", data={"username": email, "password": password}
+    ).json()["access_token"]
+    return user_id, name, {"Authorization": f"Bearer {token}"}
+
+
+def new_tasks(name: str, count: int = 1, **fields) -> list:
+    """
+    Create tasks ``task 0``, ``task 1``, ... of a user in bulk.
+
+    Returns:
+        list: The task IDs, in ascending order.
+    """
+    items = [
+        {"description": f"task {i}", "assignee": name, **fields}
+        for i in range(count)
+    ]
+    results = client.post("/tasks/bulk", json=items).json()["results"]
+    return [item["id"] for item in results]
+
+
+def new_project() -> int:
+    """Create a project and return its ID."""
+    return client.post(
+        "/tasks/new_project",
+        json={"name": fake.word(), "description": fake.sentence()},
+    ).json()["id"]
+
+
 def test_create_project():
     """
     Test creating a new project.
@@ -74,4 +135,653 @@ def test_get_tasks_without_project():
     response = client.get("/tasks/no_project")
     assert response.status_code in [200, 204]  # 204 if no tasks exist
     if response.status_code == 200:
-        assert isinstance(response.json(), list)
\ No newline at end of file
+        assert isinstance(response.json(), list)
+
+def test_paginate_tasks_by_filter():
+    """
+    Test walking through a filtered task list with a cursor.
+    """
+    user_id, name, _ = new_user()
+    created = new_tasks(name, 3, complexity=2)
+
+    first = client.get("/tasks", params={"assignee": user_id, "limit": 2})
+    assert first.status_code == 200
+    assert [task["id"] for task in first.json()["items"]] == created[:2]
+    cursor = first.json()["next_cursor"]
+    assert cursor
+
+    second = client.get(
+        "/tasks", params={"assignee": user_id, "limit": 2, "after": cursor}
+    )
+    assert [task["id"] for task in second.json()["items"]] == created[2:]
+    assert second.json()["next_cursor"] is None
+
+    filtered = client.get(
+        "/tasks", params={"assignee": user_id, "complexity": 3}
+    )
+    assert filtered.json()["items"] == []
+
+
+def test_paginate_user_tasks():
+    """
+    Test walking through a user's tasks with the `X-Next-Cursor` header.
+    """
+    user_id, name, _ = new_user()
+    created = new_tasks(name, 3)
+
+    first = client.get(f"/tasks/user/{user_id}/tasks", params={"limit": 1})
+    assert [task["id"] for task in first.json()] == created[:1]
+    assert "X-Next-Cursor" in first.headers
+    rest = client.get(
+        f"/tasks/user/{user_id}/tasks",
+        params={"limit": 2, "after": first.headers["X-Next-Cursor"]},
+    )
+    assert [task["id"] for task in rest.json()] == created[1:]
+    assert "X-Next-Cursor" not in rest.headers
+
+
+def test_invalid_cursor():
+    """
+    Test that a malformed cursor is rejected.
+    """
+    response = client.get("/tasks", params={"after": "not-a-cursor"})
+    assert response.status_code == 400
+
+    # Well-formed cursors whose ID is not a valid task ID.
+    for last_id in (True, 10**20, 0):
+        after = encode_cursor(last_id)
+        for path in ("/tasks", "/tasks/user/1/tasks", "/v2/async/tasks"):
+            response = client.get(path, params={"after": after})
+            assert response.status_code == 400, (path, last_id)
+
+
+def test_complete_task():
+    """
+    Test completing a task as an authenticated user.
+    """
+    user_id, name, headers = new_user()
+    task_id = client.post(
+        "/tasks/new_task",
+        json={"description": fake.sentence(), "assignee": name,
+              "complexity": 4},
+    ).json()["id"]
+    log_url = f"/tasks/user/{user_id}/productivity_log"
+    assert client.get(log_url).status_code == 404
+
+    response = client.post(f"/tasks/{task_id}/complete", headers=headers)
+    assert response.status_code == 200
+    assert response.json()["tasks_completed"] >= 1
+    log = client.get(log_url).json()
+    assert (log["user_id"], log["tasks_completed"]) == (user_id, 1)
+
+    response = client.post(f"/tasks/{task_id}/complete", headers=headers)
+    assert response.status_code == 400
+
+
+def test_auth_query_budgets():
+    """
+    Test that signing up and logging in do not run more queries than
+    they need.
+    """
+    email, password = f"{fake.uuid4()}@example.com", fake.password()
+    with query_budget(4):
+        client.post(
+            "/auth/signup",
+            json={"email": email, "password": password,
+                  "name": f"{fake.first_name()}-{fake.uuid4()}"},
+        )
+    with query_budget(1):
+        client.post("/auth/login", data={"username": email, "password": password})
+
+
+def test_create_query_budgets():
+    """
+    Test that the create routes do not run more queries than they need.
+    """
+    _, name, _ = new_user()
+    with query_budget(3):
+        project_id = new_project()
+    with query_budget(5):
+        client.post(
+            "/tasks/new_task",
+            json={"description": fake.sentence(), "assignee": name,
+                  "project": project_id},
+        )
+    with query_budget(6):
+        new_tasks(name, 30)
+
+
+def test_read_query_budgets():
+    """
+    Test that the task list and stats routes do not run more queries
+    than they need.
+    """
+    user_id, name, _ = new_user()
+    project_id = new_project()
+    new_tasks(name, 2, project=project_id)
+    with query_budget(2):
+        client.get(f"/tasks/project/{project_id}/tasks")
+    with query_budget(2):
+        client.get(f"/tasks/user/{user_id}/tasks")
+    with query_budget(2):
+        client.get(f"/tasks/stats/user/{user_id}")
+
+
+def test_write_query_budgets():
+    """
+    Test that updating, completing and deleting a task do not run more
+    queries than they need.
+    """
+    _, name, headers = new_user()
+    (task_id,) = new_tasks(name)
+    with query_budget(3):
+        client.patch(f"/tasks/{task_id}", json={"complexity": 3})
+    with query_budget(5):
+        client.post(f"/tasks/{task_id}/complete", headers=headers)
+    with query_budget(3):
+        client.delete(f"/tasks/{task_id}")
+
+
+def test_pool_stats():
+    """
+    Test reporting connection pool usage.
+    """
+    created = set(engines)
+    response = client.get("/utils/pool-stats")
+    assert response.status_code == 200
+    # Reporting does not create the engines that are not used yet.
+    assert set(engines) == created
+    for name in ("sync", "async"):
+        stats = response.json()[name]
+        if name not in created:
+            assert stats is None
+            continue
+        assert stats["checked_out"] <= stats["size"] + stats["overflow"]
+
+
+def test_create_tasks_bulk():
+    """
+    Test creating tasks in bulk with per-item errors.
+    """
+    _, name, _ = new_user()
+    items = [
+        {"description": fake.sentence(), "assignee": name},
+        {"description": fake.sentence(), "assignee": f"missing-{fake.uuid4()}"},
+        {"description": fake.sentence(), "assignee": name, "complexity": 9},
+        {"description": fake.sentence(), "assignee": name, "complexity": 5},
+    ]
+    response = client.post("/tasks/bulk", json=items, params={"batch_size": 1})
+    assert response.status_code == 200
+    report = response.json()
+    assert report["created"] == 2
+    assert report["failed"] == 2
+    results = report["results"]
+    assert [item["index"] for item in results] == [0, 1, 2, 3]
+    assert results[0]["id"] < results[3]["id"]
+    assert "not found" in results[1]["error"]
+    assert "complexity" in results[2]["error"]
+
+
+def test_create_tasks_bulk_ndjson():
+    """
+    Test creating tasks in bulk from an NDJSON stream.
+    """
+    _, name, _ = new_user()
+    ndjson = "\n".join(
+        json.dumps({"description": fake.sentence(), "assignee": name})
+        for _ in range(3)
+    )
+    response = client.post(
+        "/tasks/bulk", content=ndjson,
+        headers={"Content-Type": "application/x-ndjson"},
+    )
+    assert response.status_code == 200
+    assert response.json()["created"] == 3
+
+
+def test_export_tasks_ndjson():
+    """
+    Test exporting a user's tasks as NDJSON.
+    """
+    user_id, name, _ = new_user()
+    new_tasks(name, 3)
+
+    response = client.get(
+        "/tasks/export", params={"assignee": user_id, "format": "ndjson"}
+    )
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    rows = [json.loads(line) for line in response.text.splitlines()]
+    assert [row["description"] for row in rows] == ["task 0", "task 1", "task 2"]
+    assert all(row["assignee"] == user_id for row in rows)
+
+
+def test_export_tasks_csv():
+    """
+    Test exporting a user's tasks as CSV.
+    """
+    user_id, name, _ = new_user()
+    new_tasks(name, 3)
+
+    response = client.get(
+        "/tasks/export", params={"assignee": user_id, "format": "csv"}
+    )
+    assert response.status_code == 200
+    lines = response.text.splitlines()
+    assert lines[0].startswith("id,description,assignee")
+    assert len(lines) == 4
+
+
+def test_complete_tasks_concurrently():
+    """
+    Test that concurrent completions by one user do not lose updates.
+    """
+    _, name, headers = new_user()
+    task_ids = [
+        task_id
+        for complexity in range(1, 6)
+        for task_id in new_tasks(name, 2, complexity=complexity)
+    ]
+
+    with ThreadPoolExecutor(max_workers=10) as pool:
+        responses = list(pool.map(
+            lambda task_id: client.post(
+                f"/tasks/{task_id}/complete", headers=headers
+            ),
+            task_ids,
+        ))
+    assert all(response.status_code == 200 for response in responses)
+    counters = sorted(response.json()["tasks_completed"] for response in responses)
+    assert counters == list(range(1, 11))
+    last = max(responses, key=lambda response: response.json()["tasks_completed"])
+    month = next(key for key in last.json() if key.startswith("mean_complexity_"))
+    assert last.json()[month] == 3.0
+
+
+def test_complete_task_once_concurrently():
+    """
+    Test that only one of concurrent completions of a task succeeds.
+    """
+    _, name, headers = new_user()
+    (task_id,) = new_tasks(name)
+    with ThreadPoolExecutor(max_workers=5) as pool:
+        statuses = sorted(pool.map(
+            lambda _: client.post(
+                f"/tasks/{task_id}/complete", headers=headers
+            ).status_code,
+            range(5),
+        ))
+    assert statuses == [200, 400, 400, 400, 400]
+    assert client.post("/tasks/0/complete", headers=headers).status_code == 404
+
+
+def task_stats(scope: str, key: int) -> tuple:
+    """Read the open, completed and total complexity counters."""
+    response = client.get(f"/tasks/stats/{scope}/{key}")
+    assert response.status_code == 200
+    body = response.json()
+    return body["tasks_open"], body["tasks_completed"], body["total_complexity"]
+
+
+def test_task_stats():
+    """
+    Test that task counters follow creation, updates, completion and
+    deletion.
+    """
+    user_id, name, headers = new_user()
+    project_id = new_project()
+    assert task_stats("user", user_id) == (0, 0, 0)
+
+    (task_id,) = new_tasks(name, project=project_id, complexity=2)
+    moved, deleted = new_tasks(name, 2, complexity=3)
+    assert task_stats("user", user_id) == (3, 0, 8)
+    assert task_stats("project", project_id) == (1, 0, 2)
+
+    client.patch(f"/tasks/{moved}", json={"project": project_id})
+    client.post(f"/tasks/{task_id}/complete", headers=headers)
+    assert task_stats("project", project_id) == (1, 1, 5)
+    client.delete(f"/tasks/{deleted}")
+    assert task_stats("user", user_id) == (1, 1, 5)
+    assert client.get("/tasks/stats/project/0").status_code == 404
+
+
+def test_rebuild_task_stats():
+    """
+    Test that rebuilding the counters from scratch gives the same values.
+    """
+    user_id, name, headers = new_user()
+    project_id = new_project()
+    (task_id,) = new_tasks(name, project=project_id, complexity=2)
+    new_tasks(name, complexity=3)
+    client.post(f"/tasks/{task_id}/complete", headers=headers)
+
+    before = client.get("/tasks/stats/no-project").json()
+    assert client.post("/utils/rebuild-task-stats").status_code == 200
+    assert task_stats("user", user_id) == (1, 1, 5)
+    assert task_stats("project", project_id) == (0, 1, 2)
+    assert client.get("/tasks/stats/no-project").json() == before
+
+
+def test_conditional_get():
+    """
+    Test that a read route answers 304 to a request with a current ETag.
+    """
+    user_id, name, _ = new_user()
+    new_tasks(name, 3)
+    url = f"/tasks/user/{user_id}/tasks"
+
+    first = client.get(url, params={"limit": 2})
+    etag = first.headers["etag"]
+    assert first.headers["cache-control"] == "private, no-cache"
+    response = client.get(
+        url, params={"limit": 2}, headers={"If-None-Match": etag}
+    )
+    assert response.status_code == 304
+    assert response.headers["etag"] == etag
+
+
+def test_response_cache(monkeypatch):
+    """
+    Test that a repeated read is served from the response cache with its
+    headers.
+    """
+    from app.http_cache import response_cache
+
+    monkeypatch.setattr(response_cache, "maxsize", 16)
+    user_id, name, _ = new_user()
+    new_tasks(name, 3)
+    url = f"/tasks/user/{user_id}/tasks"
+
+    first = client.get(url, params={"limit": 2})
+    hits = response_cache.stats()["hits"]
+    cached = client.get(url, params={"limit": 2})
+    assert cached.json() == first.json()
+    assert cached.headers["x-next-cursor"] == first.headers["x-next-cursor"]
+    assert response_cache.stats()["hits"] == hits + 1
+
+
+def test_conditional_get_after_write(monkeypatch):
+    """
+    Test that a write changes the ETag and drops the cached response.
+    """
+    from app.http_cache import response_cache
+
+    monkeypatch.setattr(response_cache, "maxsize", 16)
+    user_id, name, _ = new_user()
+    task_id, _ = new_tasks(name, 2)
+    url = f"/tasks/user/{user_id}/tasks"
+    etag = client.get(url).headers["etag"]
+
+    client.patch(f"/tasks/{task_id}", json={"description": "new"})
+    response = client.get(url, headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.headers["etag"] != etag
+    assert response.json()[0]["description"] == "new"
+
+
+def test_task_list_rows():
+    """
+    Test that list routes return the read-side task fields.
+    """
+    user_id, name, _ = new_user()
+    (task_id,) = new_tasks(name, due_date="2030-01-01")
+    page = client.get("/tasks", params={"assignee": user_id}).json()
+    assert page == {
+        "items": [{
+            "id": task_id, "description": "task 0",
+            "assignee": user_id, "due_date": "2030-01-01", "project": None,
+            "is_completed": False, "complexity": 1,
+        }],
+        "next_cursor": None,
+    }
+    assert client.get(f"/tasks/user/{user_id}/tasks").json() == page["items"]
+
+
+def new_search_tasks() -> tuple:
+    """
+    Create a user's tasks that match a unique word in different ways.
+
+    Returns:
+        tuple: The user ID, the word and the task descriptions, best
+        matches first; the last one does not match.
+    """
+    user_id, name, _ = new_user()
+    word = fake.uuid4().replace("-", "")
+    descriptions = [
+        f"{word} {word} report",
+        f"{word} review of the report",
+        f"{word} Draft",
+        "unrelated task",
+    ]
+    client.post("/tasks/bulk", json=[
+        {"description": text, "assignee": name} for text in descriptions
+    ])
+    return user_id, word, descriptions
+
+
+def search(**params) -> list:
+    """Return the descriptions of the first page of search results."""
+    response = client.get("/tasks/search", params=params)
+    assert response.status_code == 200
+    return [task["description"] for task in response.json()["items"]]
+
+
+def test_search_tasks():
+    """
+    Test that search returns the matching tasks, best matches first.
+    """
+    _, word, descriptions = new_search_tasks()
+    texts = search(q=word)
+    assert texts[0] == descriptions[0]
+    assert sorted(texts) == sorted(descriptions[:3])
+
+
+def test_search_tasks_query_and_filters():
+    """
+    Test search operators and the task list filters.
+    """
+    user_id, word, descriptions = new_search_tasks()
+    assert search(q=f"{word} report", assignee=user_id) == descriptions[:2]
+    assert search(q=f"{word} -report") == descriptions[2:3]
+    assert search(q=word, assignee=user_id + 1) == []
+
+
+def test_search_tasks_pages():
+    """
+    Test walking through search results with a cursor.
+    """
+    _, word, _ = new_search_tasks()
+    pages, after = [], None
+    while True:
+        params = {"q": word, "limit": 1}
+        if after:
+            params["after"] = after
+        page = client.get("/tasks/search", params=params).json()
+        pages.extend(task["description"] for task in page["items"])
+        after = page["next_cursor"]
+        if after is None:
+            break
+    assert pages == search(q=word)
+
+
+def test_search_invalid_cursor():
+    """
+    Test that malformed search cursors are rejected.
+    """
+    for after in ("bad", encode_cursor(True, 1), encode_cursor(1.0, True),
+                  encode_cursor(10**400, 1), encode_cursor(1.0, 10**20)):
+        assert client.get(
+            "/tasks/search", params={"q": "report", "after": after}
+        ).status_code == 400, after
+
+
+def test_update_task():
+    """
+    Test that a partial update changes only the fields sent.
+    """
+    _, name, _ = new_user()
+    (task_id,) = new_tasks(name, project=new_project(), complexity=2)
+
+    response = client.patch(f"/tasks/{task_id}", json={"project": None})
+    assert response.status_code == 200
+    assert response.json()["project"] is None
+    assert response.json()["description"] == "task 0"
+    assert response.json()["complexity"] == 2
+    response = client.patch(
+        f"/tasks/{task_id}", json={"due_date": date.today().isoformat()}
+    )
+    assert response.status_code == 200
+    assert response.json()["due_date"] == date.today().isoformat()
+
+
+def test_update_task_errors():
+    """
+    Test that invalid updates and missing tasks or assignees are rejected.
+    """
+    _, name, _ = new_user()
+    (task_id,) = new_tasks(name)
+    yesterday = date.fromordinal(date.today().toordinal() - 1)
+    for changes in ({}, {"id": 1}, {"complexity": None},
+                    {"due_date": yesterday.isoformat()}):
+        response = client.patch(f"/tasks/{task_id}", json=changes)
+        assert response.status_code == 422, changes
+    assert client.patch("/tasks/0", json={"complexity": 3}).status_code == 404
+    assert client.patch(
+        f"/tasks/{task_id}", json={"assignee": 0}
+    ).status_code == 404
+
+
+def test_update_tasks_batch():
+    """
+    Test one partial update of a batch of tasks and its task counters.
+    """
+    first, name, _ = new_user()
+    second, _, _ = new_user()
+    project_id = new_project()
+    ids = new_tasks(name, 3, project=project_id, complexity=2)
+
+    response = client.patch(
+        "/tasks",
+        json={"ids": [ids[1], ids[2], 0], "changes": {
+            "assignee": second, "is_completed": True,
+        }},
+    )
+    assert response.json() == {"updated": ids[1:], "missing": [0]}
+    assert client.get(f"/tasks/stats/user/{first}").json()["tasks_open"] == 1
+    stats = client.get(f"/tasks/stats/user/{second}").json()
+    assert (stats["tasks_open"], stats["tasks_completed"]) == (0, 2)
+    stats = client.get(f"/tasks/stats/project/{project_id}").json()
+    assert (stats["tasks_open"], stats["tasks_completed"]) == (1, 2)
+
+
+def test_delete_tasks_by_filter():
+    """
+    Test deleting the tasks that match a filter in chunks.
+    """
+    user_id, name, headers = new_user()
+    ids = new_tasks(name, 5)
+    client.post(f"/tasks/{ids[0]}/complete", headers=headers)
+
+    assert client.delete("/tasks").status_code == 422
+    response = client.delete(
+        "/tasks",
+        params={"assignee": user_id, "is_completed": False, "chunk_size": 2},
+    )
+    assert response.json() == {"deleted": 4}
+    stats = client.get(f"/tasks/stats/user/{user_id}").json()
+    assert (stats["tasks_open"], stats["tasks_completed"]) == (0, 1)
+
+
+def test_archive_tasks():
+    """
+    Test that archiving moves completed tasks out of the task table in
+    the background.
+    """
+    user_id, name, headers = new_user()
+    ids = new_tasks(name, 3)
+    for task_id in ids[:2]:
+        client.post(f"/tasks/{task_id}/complete", headers=headers)
+
+    response = client.post("/tasks/archive", params={"older_than_days": 0})
+    assert response.status_code == 202
+    for _ in range(50):
+        stats = client.get(f"/tasks/stats/user/{user_id}").json()
+        if stats["tasks_completed"] == 0:
+            break
+        time.sleep(0.1)
+    assert (stats["tasks_open"], stats["tasks_completed"]) == (1, 0)
+    assert client.delete(f"/tasks/{ids[0]}").status_code == 404
+
+
+def test_v2_create_and_list_tasks():
+    """
+    Test creating a task and listing tasks with version 2.
+    """
+    user_id, name, _ = new_user()
+    response = client.post(
+        "/v2/async/tasks",
+        json={"description": fake.sentence(), "assignee": name,
+              "complexity": 2},
+    )
+    assert response.status_code == 201
+    task_id = response.json()["id"]
+
+    response = client.get(
+        "/v2/async/tasks", params={"assignee": user_id, "limit": 1}
+    )
+    assert [task["id"] for task in response.json()] == [task_id]
+    assert "X-Next-Cursor" not in response.headers
+    assert client.get(
+        "/v2/async/tasks", params={"assignee": user_id, "complexity": 9}
+    ).status_code == 422
+
+
+def test_v2_update_tasks():
+    """
+    Test updating one task and a batch of tasks with version 2.
+    """
+    _, name, _ = new_user()
+    (task_id,) = new_tasks(name)
+    response = client.patch(f"/v2/async/tasks/{task_id}", json={"complexity": 4})
+    assert response.json()["complexity"] == 4
+    response = client.patch(
+        "/v2/async/tasks", json={"ids": [task_id, 0], "changes": {"complexity": 5}}
+    )
+    assert response.json() == {"updated": [task_id], "missing": [0]}
+
+
+def test_v2_complete_task():
+    """
+    Test completing a task with version 2.
+    """
+    _, name, headers = new_user()
+    (task_id,) = new_tasks(name)
+    url = f"/v2/async/tasks/{task_id}/complete"
+    assert client.post(url).status_code == 401
+    assert client.post(url, headers=headers).status_code == 200
+    assert client.post(url, headers=headers).status_code == 400
+
+
+def test_v2_delete_task():
+    """
+    Test deleting a task with version 2.
+    """
+    _, name, _ = new_user()
+    (task_id,) = new_tasks(name)
+    response = client.delete(f"/v2/async/tasks/{task_id}")
+    assert response.json()["deleted task"]["id"] == task_id
+    assert client.delete(f"/v2/async/tasks/{task_id}").status_code == 404
+
+
+def test_v2_tasks_for_today(monkeypatch):
+    """
+    Test that `/v2/async/tasks-for-day` defaults to today.
+    """
+    async def is_day_off(day):
+        return day.weekday() >= 5
+
+    monkeypatch.setattr(day_off_service, "is_day_off", is_day_off)
+    _, name, _ = new_user()
+    new_tasks(name, due_date=date.today().isoformat())
+    response = client.get("/v2/async/tasks-for-day")
+    assert response.json()[0]["due_date"] == date.today().isoformat()
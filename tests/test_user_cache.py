@@ -0,0 +1,87 @@
+import asyncio
+import time
+
+import pytest
+
+from app.auth.user_cache import MemoryBackend, UserCache
+from app.schemas.task import User
+
+
+def make_user(user_id: int) -> User:
+    return User(
+        id=user_id, email=f"user{user_id}@example.com",
+        password="hash", name=f"user{user_id}",
+    )
+
+
+def test_hit_and_miss_counters():
+    """
+    Test that lookups are counted and password hashes are not cached.
+    """
+    async def scenario():
+        cache = UserCache(maxsize=10, ttl=60)
+        assert await cache.get("user1@example.com") is None
+        await cache.set(make_user(1))
+        user = await cache.get("user1@example.com")
+        assert user.id == 1
+        assert user.password is None
+        return cache.stats()
+
+    stats = asyncio.run(scenario())
+    assert stats["hits"] == 1
+    assert stats["misses"] == 1
+
+
+def test_lru_eviction_and_ttl():
+    """
+    Test that the cache is bounded and entries expire.
+    """
+    async def scenario():
+        cache = UserCache(maxsize=2, ttl=0.05)
+        for user_id in (1, 2, 3):
+            await cache.set(make_user(user_id))
+        assert await cache.get("user1@example.com") is None
+        assert await cache.get("user3@example.com") is not None
+        time.sleep(0.06)
+        assert await cache.get("user3@example.com") is None
+
+    asyncio.run(scenario())
+
+
+def test_shared_backend_and_invalidation():
+    """
+    Test that workers share entries through the backend and that
+    invalidation removes them everywhere.
+    """
+    async def scenario():
+        backend = MemoryBackend()
+        first = UserCache(maxsize=10, ttl=60, backend=backend)
+        second = UserCache(maxsize=10, ttl=60, backend=backend)
+        await first.set(make_user(1))
+        assert (await second.get("user1@example.com")).id == 1
+
+        first.invalidate("user1@example.com")
+        await asyncio.sleep(0)
+        assert await backend.get("user:user1@example.com") is None
+        assert await first.get("user1@example.com") is None
+
+    asyncio.run(scenario())
+
+
+def test_shared_backend_expiry_in_whole_seconds():
+    """
+    Test that entries are stored in the shared backend with a whole number
+    of seconds to live, which Redis requires, whatever the local TTL.
+    """
+    async def scenario():
+        backend = MemoryBackend()
+        with pytest.raises(TypeError):
+            await backend.set("key", b"value", ex=0.5)
+        first = UserCache(maxsize=10, ttl=0.05, backend=backend)
+        second = UserCache(maxsize=10, ttl=0.05, backend=backend)
+        await first.set(make_user(1))
+        time.sleep(0.06)
+        assert await first.get("user1@example.com") is not None
+        assert (await second.get("user1@example.com")).id == 1
+
+    asyncio.run(scenario())